@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+
+from uidai.anomaly import adjust, detect, rolling_scores
+
+
+def _feed(dates, totals, pincode=500001):
+    return pd.DataFrame({
+        'date': pd.to_datetime(dates),
+        'state': 'Telangana',
+        'district': 'Hyderabad',
+        'pincode': pincode,
+        'age_0_5': np.asarray(totals, dtype='int64'),
+        'age_5_17': 0,
+        'age_18_greater': 0,
+    })
+
+
+def test_window_spans_calendar_days_not_observations():
+    # One date per month: no 7-day window holds more than one observation,
+    # so none of them is compared with months far away
+    monthly = _feed(pd.date_range('2025-01-01', periods=12, freq='MS'),
+                    [10, 12, 9, 400, 11, 10, 2, 13, 10, 9, 500, 12])
+    scored = detect(monthly, 'enrolment')
+    assert scored['Score'].isna().all()
+    assert (scored['Anomaly'] == '').all()
+    assert adjust(monthly, 'enrolment', scored, 'exclude').equals(monthly)
+
+
+def test_gapped_dates_are_scored_only_against_nearby_days():
+    dates = [*pd.date_range('2025-03-01', periods=10, freq='D'), pd.Timestamp('2025-05-15')]
+    totals = [10, 11, 9, 10, 200, 10, 11, 9, 10, 10, 300]
+    scored = detect(_feed(dates, totals), 'enrolment')
+
+    assert scored['Anomaly'].tolist() == [''] * 4 + ['spike'] + [''] * 6
+    # The lone day after the gap has no neighbours within the window
+    assert np.isnan(scored['Score'].iloc[-1])
+
+
+def test_series_of_different_pincodes_are_kept_apart():
+    dates = pd.date_range('2025-03-01', periods=6, freq='D')
+    frame = pd.concat([_feed(dates, [10] * 6, 500001), _feed(dates, [1000] * 6, 500002)], ignore_index=True)
+    scored = detect(frame, 'enrolment')
+    assert (scored['Anomaly'] == '').all()
+    assert scored.groupby('pincode')['Baseline'].first().tolist() == [10, 1000]
+
+
+def test_blocks_of_series_score_like_one_block():
+    rng = np.random.default_rng(0)
+    lengths = rng.integers(1, 30, 200)
+    starts = np.r_[0, np.cumsum(lengths)[:-1]]
+    days = np.concatenate([np.cumsum(rng.integers(1, 5, n)) for n in lengths])
+    values = rng.poisson(20, lengths.sum()).astype('float64')
+    whole = rolling_scores(values, starts, days=days)
+    for block in (1, 10, 500):
+        blocked = rolling_scores(values, starts, days=days, block=block)
+        assert all(np.array_equal(a, b, equal_nan=True) for a, b in zip(whole, blocked))
@@ -0,0 +1,37 @@
+import pandas as pd
+
+from uidai.batch import build_national_rollup, run_batch
+
+ENROLMENT = """date,state,district,pincode,age_0_5,age_5_17,age_18_greater
+01-03-2025,Telangana,Hyderabad,500001,10,0,0
+01-04-2025,Telangana,Hyderabad,500001,20,0,0
+01-03-2025,Karnataka,Bengaluru Urban,560001,5,0,0
+"""
+UPDATES = """date,state,district,pincode,{a},{b}
+01-03-2025,Telangana,Hyderabad,500001,1,1
+01-04-2025,Telangana,Hyderabad,500001,1,1
+01-05-2025,Telangana,Hyderabad,500001,1,1
+01-05-2025,Karnataka,Bengaluru Urban,560001,1,1
+"""
+
+
+def test_rollup_leaves_months_without_data_out_of_averages(tmp_path):
+    feed_files = {
+        'enrolment': tmp_path / 'enrolment.csv',
+        'biometric': tmp_path / 'biometric.csv',
+        'demographic': tmp_path / 'demographic.csv',
+    }
+    feed_files['enrolment'].write_text(ENROLMENT)
+    feed_files['biometric'].write_text(UPDATES.format(a='bio_age_5_17', b='bio_age_17_'))
+    feed_files['demographic'].write_text(UPDATES.format(a='demo_age_5_17', b='demo_age_17_'))
+    out_dir = str(tmp_path / 'out')
+
+    manifest = run_batch({feed: str(path) for feed, path in feed_files.items()}, out_dir, workers=1)
+    national = build_national_rollup(out_dir, manifest)
+
+    # March 15, April 20; May has updates but no enrolments
+    assert national.total_enrolments == 35
+    assert national.avg_enrolments == 17.5
+    assert national.months_analyzed == 3
+    merged = pd.read_csv(tmp_path / 'out' / 'national' / 'monthly.csv')
+    assert merged['Enrolments'].tolist() == [15, 20, 0]
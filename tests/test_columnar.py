@@ -0,0 +1,43 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip('pyarrow')
+
+from uidai.columnar import convert_feeds, list_districts, monthly_from_dataset
+
+REPO = Path(__file__).resolve().parents[1]
+ROWS = """date,state,district,pincode,bio_age_5_17,bio_age_17_
+01-03-2025,Telangana,Hyderabad,500001,1,2
+01-03-2025,Telangana,Hyderabad,500001,1,2
+02-03-2025,Telangana,Hyderabad,500002,3,4
+15-04-2025,Karnataka,Bengaluru Urban,560001,5,6
+"""
+
+
+def test_converting_twice_gives_the_same_totals(tmp_path):
+    csv_path = tmp_path / 'biometric.csv'
+    csv_path.write_text(ROWS)
+    dataset = tmp_path / 'dataset'
+
+    assert convert_feeds({'biometric': str(csv_path)}, str(dataset)) == {'biometric': 3}
+    totals = monthly_from_dataset(str(dataset), 'biometric')
+    assert totals['Biometric_Updates'].tolist() == [10, 11]
+
+    # Again from a separate process, as when the CLI is re-run
+    subprocess.run([sys.executable, '-m', 'uidai.columnar', '--biometric', str(csv_path), '--out', str(dataset)],
+                   cwd=REPO, check=True, capture_output=True)
+    assert monthly_from_dataset(str(dataset), 'biometric').equals(totals)
+    assert list_districts(str(dataset)) == [('Karnataka', 'Bengaluru Urban'), ('Telangana', 'Hyderabad')]
+
+
+def test_ipc_dataset_is_read_without_naming_the_format(tmp_path):
+    csv_path = tmp_path / 'biometric.csv'
+    csv_path.write_text(ROWS)
+    dataset = tmp_path / 'dataset'
+
+    convert_feeds({'biometric': str(csv_path)}, str(dataset), fmt='ipc')
+    assert monthly_from_dataset(str(dataset), 'biometric')['Biometric_Updates'].tolist() == [10, 11]
+    assert len(list_districts(str(dataset))) == 2
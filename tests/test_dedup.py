@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+
+from uidai import dedup
+from uidai.dedup import Deduplicator, KeySet
+from uidai.loader import DIGEST_DTYPE
+
+
+def _digests(rng, n):
+    keys = np.empty(n, dtype=DIGEST_DTYPE)
+    keys['hi'] = rng.integers(0, 50, n)
+    keys['lo'] = rng.integers(0, 1 << 62, n) % 97
+    return keys
+
+
+def test_digest_keys_survive_spills_and_merges(monkeypatch, tmp_path):
+    monkeypatch.setattr(dedup, 'MAX_RUNS', 2)
+    monkeypatch.setattr(dedup, 'MERGE_BLOCK', 16)
+    rng = np.random.default_rng(0)
+    keys = KeySet(memory_budget=256, spill_dir=str(tmp_path), dtype=DIGEST_DTYPE)
+    seen = set()
+    try:
+        for _ in range(40):
+            batch = _digests(rng, 200)
+            expected = []
+            for key in batch.tolist():
+                expected.append(key not in seen)
+                seen.add(key)
+            assert keys.add(batch).tolist() == expected
+        assert keys.spills > dedup.MAX_RUNS
+        assert len(keys) == len(seen)
+    finally:
+        keys.close()
+
+
+def test_whole_row_keys_need_every_column_to_match():
+    frame = pd.DataFrame({'state': ['a', 'a', 'b', 'a'], 'pincode': [1, 1, 1, 2]})
+    with Deduplicator(key=None) as seen:
+        assert seen.filter(frame, 'one').index.tolist() == [0, 2, 3]
+        assert seen.filter(frame.iloc[[3, 2]], 'two').empty
+        assert seen.report()['Duplicates'].tolist() == [1, 2]
@@ -0,0 +1,19 @@
+import numpy as np
+import pandas as pd
+
+from uidai.forecast import flag_peaks, forecast_monthly
+
+
+def test_steady_trend_is_not_a_peak():
+    months = pd.date_range('2025-01-01', periods=12, freq='MS')
+    load = 5_000 + 300 * np.arange(12)
+    merged = pd.DataFrame({'Month': months, 'Enrolments': load, 'Total_Load': load})
+    forecast = forecast_monthly(merged, horizon=3)
+    # Well above the historical average, but in line with recent months
+    assert (forecast['Forecast'] > load.mean() * 1.2).all()
+    assert not forecast['Expected_Peak'].any()
+
+
+def test_jump_above_recent_level_is_a_peak():
+    history = np.array([[100, 100, 100, 100, 100, 100]])
+    assert flag_peaks(history, np.array([[110, 150, 90]])).tolist() == [[False, True, False]]
@@ -0,0 +1,26 @@
+import pandas as pd
+
+from uidai.service import Region
+
+
+def _merged():
+    return pd.DataFrame({
+        'Month': pd.to_datetime(['2025-03-01', '2025-04-01', '2025-05-01']),
+        'Enrolments': [10, 20, 0],
+        'Biometric_Updates': [1, 1, 1],
+        'Demographic_Updates': [2, 2, 2],
+        'Total_Load': [13, 23, 3],
+    })
+
+
+def test_summary_leaves_zero_filled_months_out():
+    summary = Region('x', None, 'X', _merged()).summary
+    assert summary['avg_enrolments'] == 15
+    assert summary['avg_load'] == 13
+    assert summary['months_analyzed'] == 3
+
+
+def test_stored_summary_is_served_as_is():
+    stored = {'region': 'X', 'title': 'X District', 'avg_enrolments': 15.0, 'std_enrolments': float('nan')}
+    summary = Region('x', None, 'X', _merged(), stored).summary
+    assert summary == {'avg_enrolments': 15.0, 'std_enrolments': None}
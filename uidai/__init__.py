@@ -0,0 +1,53 @@
+"""
+UIDAI Data Hackathon 2026 - Aadhaar service analysis library
+
+Reusable building blocks behind UIDAI_Analysis.py: feed schemas, streaming
+loaders, the cleaning engine, monthly aggregation, peak-month analysis,
+reporting and (optional) chart rendering.
+
+Public names are imported lazily on first access, so `import uidai` is
+cheap and matplotlib is only loaded when charts are rendered. The
+individual pipeline steps are in uidai.pipeline.
+"""
+
+import importlib
+
+_EXPORTS = {
+    'AnalysisResult': 'uidai.pipeline',
+    'CheckpointStore': 'uidai.checkpoint',
+    'CohortTensor': 'uidai.cohort',
+    'FEEDS': 'uidai.schema',
+    'FeedSchema': 'uidai.schema',
+    'PincodeCube': 'uidai.pincode',
+    'Profiler': 'uidai.profiling',
+    'ReportRecord': 'uidai.report',
+    'ReportWriter': 'uidai.report',
+    'TimeSeriesStore': 'uidai.timeseries',
+    'Validator': 'uidai.validation',
+    'clean_dataset': 'uidai.cleaning',
+    'clean_frame': 'uidai.cleaning',
+    'get_backend': 'uidai.backends',
+    'get_schema': 'uidai.schema',
+    'iter_feed_chunks': 'uidai.loader',
+    'prepare_monthly_data': 'uidai.aggregate',
+    'read_feed': 'uidai.loader',
+    'refresh_monthly': 'uidai.checkpoint',
+    'render_charts': 'uidai.render',
+    'run_analysis': 'uidai.pipeline',
+    'stream_monthly': 'uidai.loader',
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module 'uidai' has no attribute '{name}'")
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
@@ -0,0 +1,122 @@
+"""
+Monthly aggregation of cleaned feed frames, and the combined service-load
+table across feeds.
+"""
+
+import numpy as np
+import pandas as pd
+
+from uidai.loader import month_code, month_start
+from uidai.schema import FEEDS
+
+SERVICE_COLUMNS = tuple(schema.label for schema in FEEDS.values())
+
+
+def prepare_monthly_data(df, dataset_type, verbose=True):
+    """
+    Prepare monthly aggregated data from the dataset.
+    For this UIDAI data, we need to sum all age-group columns.
+    """
+    # Find date column
+    date_col = None
+    for col in df.columns:
+        if 'date' in col.lower():
+            date_col = col
+            break
+
+    if date_col is None:
+        if verbose:
+            print(f"  ⚠ Warning: Could not find date column in {dataset_type}")
+        return pd.DataFrame()
+
+    # Ensure date column is datetime. Only the dates and the row totals
+    # are needed, so the frame itself is not copied.
+    dates = df[date_col]
+    if not pd.api.types.is_datetime64_any_dtype(dates):
+        dates = pd.to_datetime(dates, format='%d-%m-%Y', errors='coerce')
+
+    # Find all numeric columns (these are the age group columns)
+    numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
+    # Remove pincode if present
+    numeric_cols = [col for col in numeric_cols if 'pincode' not in col.lower()]
+
+    if not numeric_cols:
+        if verbose:
+            print(f"  ⚠ Warning: Could not find numeric columns in {dataset_type}")
+        return pd.DataFrame()
+
+    if verbose:
+        print(f"  ℹ Summing columns for {dataset_type}: {numeric_cols}")
+
+    # Calculate total for each row (sum of all age groups) and
+    # extract year-month for grouping
+    totals = pd.DataFrame({
+        'Total': df[numeric_cols].sum(axis=1),
+        'YearMonth': dates.dt.to_period('M'),
+    })
+
+    # Aggregate by month
+    monthly_agg = totals.groupby('YearMonth')['Total'].sum().reset_index()
+    monthly_agg.columns = ['Month', dataset_type]
+    monthly_agg['Month'] = monthly_agg['Month'].dt.to_timestamp()
+
+    return monthly_agg.sort_values('Month')
+
+
+def service_load_table(partials, by=()):
+    """
+    Join per-feed totals into one service-load table in a single pass.
+
+    partials maps feed name to a Series of totals indexed by
+    ('month_code', *by), as returned by loader.partial_aggregate. The keys
+    of all feeds are factorized together onto one shared sorted index and
+    the totals are scattered into a (keys x services) array, so there is
+    no chain of outer merges however fine the keys (e.g. by=('pincode',)).
+    Keys missing from a feed count as 0.
+
+    Returns a DataFrame with 'Month', *by, one column per feed present
+    and 'Total_Load', sorted by key.
+    """
+    feeds = [feed for feed in FEEDS if feed in partials and len(partials[feed])]
+    if not feeds:
+        return pd.DataFrame()
+    levels = ('month_code', *by)
+
+    codes, uniques = [], []
+    for level in levels:
+        values = [partials[feed].index.get_level_values(level) for feed in feeds]
+        level_codes, level_uniques = values[0].append(values[1:]).factorize(sort=True, use_na_sentinel=False)
+        codes.append(level_codes)
+        uniques.append(level_uniques)
+    shape = tuple(len(level_uniques) for level_uniques in uniques)
+    keys, key_position = np.unique(np.ravel_multi_index(codes, shape), return_inverse=True)
+
+    service = np.repeat(np.arange(len(feeds)), [len(partials[feed]) for feed in feeds])
+    totals = np.concatenate([partials[feed].to_numpy(dtype='int64') for feed in feeds])
+    table = np.bincount(key_position * len(feeds) + service, weights=totals,
+                        minlength=len(keys) * len(feeds)).astype('int64').reshape(len(keys), len(feeds))
+
+    key_codes = np.unravel_index(keys, shape)
+    combined = {'Month': month_start(uniques[0].to_numpy(dtype='int64')[key_codes[0]])}
+    for level, level_uniques, level_codes in zip(by, uniques[1:], key_codes[1:]):
+        combined[level] = level_uniques[level_codes]
+    for i, feed in enumerate(feeds):
+        combined[FEEDS[feed].label] = table[:, i]
+    combined['Total_Load'] = table.sum(axis=1)
+    return pd.DataFrame(combined)
+
+
+def combine_monthly(monthly):
+    """
+    Service-load table (Month, one column per service, Total_Load) from
+    {feed: monthly frame} as returned by prepare_monthly_data.
+    """
+    partials = {}
+    for feed, frame in monthly.items():
+        if frame is None or frame.empty:
+            continue
+        label = FEEDS[feed].label
+        index = pd.Index(month_code(frame['Month']).to_numpy(dtype='int64'), name='month_code')
+        partials[feed] = pd.Series(frame[label].to_numpy(dtype='int64'), index=index)
+    return service_load_table(partials)
+
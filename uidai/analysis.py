@@ -0,0 +1,94 @@
+"""
+Peak-load identification and summary statistics over monthly aggregates.
+"""
+
+import numpy as np
+import pandas as pd
+
+from uidai.aggregate import SERVICE_COLUMNS
+
+
+def add_total_load(merged_data):
+    """
+    Add a 'Total_Load' column (sum of all services per month) in place.
+    """
+    columns = [col for col in SERVICE_COLUMNS if col in merged_data.columns]
+    merged_data['Total_Load'] = merged_data[columns].to_numpy(dtype='int64').sum(axis=1)
+    return merged_data
+
+
+def top_positions(values, n):
+    """
+    Positions of the n largest values, largest first; ties keep their
+    original order (like DataFrame.nlargest with keep='first').
+
+    Uses a partial partition instead of a full sort, so it stays linear
+    for long tables such as pincode x day loads.
+    """
+    values = np.asarray(values)
+    n = min(n, len(values))
+    if n <= 0:
+        return np.empty(0, dtype='int64')
+    threshold = np.partition(values, len(values) - n)[len(values) - n]
+    candidates = np.flatnonzero(values >= threshold)
+    return candidates[np.argsort(-values[candidates], kind='stable')[:n]]
+
+
+def find_peak_months(merged_data, n=5):
+    """
+    Top n months by total service load.
+    """
+    if merged_data.empty:
+        return pd.DataFrame()
+    if 'Total_Load' not in merged_data.columns:
+        add_total_load(merged_data)
+    return merged_data.iloc[top_positions(merged_data['Total_Load'].to_numpy(), n)]
+
+
+def peak_mask(merged_data, top_months):
+    """
+    Boolean array marking the rows of merged_data whose load equals one of
+    the peak loads.
+    """
+    return np.isin(merged_data['Total_Load'].to_numpy(), top_months['Total_Load'].to_numpy())
+
+
+def _service_stats(monthly, column):
+    if monthly.empty or column not in monthly.columns:
+        return 0, 0, 0
+    values = monthly[column]
+    # A single month has no std (NaN); kept as is, so the trend reads
+    # 'variable' and the table shows nan, as in the original report.
+    # As float64, so a nullable column gives NaN rather than pd.NA
+    return values.sum(), values.mean(), values.astype('float64').std()
+
+
+def summarize(enrolment_monthly, biometric_monthly, demographic_monthly, merged_data, top_months):
+    """
+    Collect the statistics used by the insights report into one dict.
+    """
+    stats = {}
+    for name, monthly, column in zip(('enrolments', 'biometric', 'demographic'),
+                                     (enrolment_monthly, biometric_monthly, demographic_monthly),
+                                     SERVICE_COLUMNS):
+        total, avg, std = _service_stats(monthly, column)
+        stats[f'total_{name}'] = total
+        stats[f'avg_{name}'] = avg
+        stats[f'std_{name}'] = std
+
+    # Peak month statistics
+    if not merged_data.empty and 'Total_Load' in merged_data.columns and not top_months.empty:
+        peak_month = top_months.iloc[0]
+        stats['peak_month_name'] = peak_month['Month'].strftime('%B %Y')
+        stats['peak_load'] = peak_month['Total_Load']
+        stats['avg_load'] = merged_data['Total_Load'].mean()
+        avg_load = stats['avg_load']
+        stats['peak_vs_avg'] = ((stats['peak_load'] - avg_load) / avg_load * 100) if avg_load > 0 else 0
+    else:
+        stats['peak_month_name'] = 'N/A'
+        stats['peak_load'] = 0
+        stats['avg_load'] = 0
+        stats['peak_vs_avg'] = 0
+
+    stats['months_analyzed'] = len(merged_data)
+    return stats
@@ -0,0 +1,249 @@
+"""
+Spike and drop detection on per-pincode daily series.
+
+Each feed is reduced to one total per (pincode, date). The totals are
+laid out on a flat calendar-day axis, series after series, sorted by
+pincode and date. Days without an observation are NaN, so a 7-day window
+covers 7 calendar days however sparse the series is (the enrolment feed
+has one date per month for most of the year), and NaN padding between
+consecutive series keeps a window from mixing two pincodes. The series
+are processed in blocks of whole series, each laid out and padded on
+its own: a block covers about BLOCK_ROWS calendar days (more only when
+one series alone spans longer). Rolling windows are strided views of
+the block's array (sliding_window_view), taken only at observed days,
+so memory grows with the block's days x window and not with the number
+of series or the span of the data. The returned baseline and score
+arrays hold one value per observation.
+
+Two kernels are available:
+
+- 'mad': Hampel filter. Robust z-score against the rolling median and
+  the median absolute deviation (MAD).
+- 'zscore': z-score against the mean and standard deviation of the
+  neighbouring observations. The centre is left out; otherwise a window
+  of n values could never score above (n - 1) / sqrt(n).
+
+Observations scoring above the threshold are spikes, below its negative
+are drops. Before the monthly and peak-month analysis, flagged rows can
+be excluded from the cleaned frames, or spikes can be scaled down to
+the rolling baseline.
+"""
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from uidai.loader import row_totals
+from uidai.schema import get_schema
+from uidai.timeseries import day_code
+
+METHODS = ('mad', 'zscore')
+ADJUSTMENTS = ('flag', 'exclude', 'downweight')
+DEFAULT_WINDOW = 7
+DEFAULT_THRESHOLD = 3.5
+MIN_PERIODS = 4
+# Calendar days (padding included) laid out per block of series
+BLOCK_ROWS = 1_000_000
+# Scales MAD to a standard deviation for normally distributed data
+MAD_SCALE = 1.4826
+# Smallest deviation scale, so flat series with a MAD of 0 do not flag
+# every small wobble: max(MIN_SCALE, RELATIVE_MIN_SCALE * |baseline|)
+MIN_SCALE = 1.0
+RELATIVE_MIN_SCALE = 0.1
+
+
+def _padded(values, starts, half, days=None):
+    """
+    values placed on one axis, series after series, with half NaNs before
+    each series start and after the end, and the position of every
+    original value in the padded array.
+
+    With days (integer day numbers, increasing within each series), each
+    value sits at its day's offset from the series' first day and days
+    without a value are NaN. Without days, values are consecutive.
+    """
+    lengths = np.diff(np.r_[starts, len(values)])
+    series_start = np.repeat(starts, lengths)
+    if days is None:
+        local = np.arange(len(values)) - series_start
+    else:
+        days = np.asarray(days, dtype='int64')
+        local = days - days[series_start]
+    spans = local[np.r_[starts[1:], len(values)] - 1] + 1
+    offsets = half + np.r_[0, np.cumsum(spans + half)[:-1]]
+    position = local + np.repeat(offsets, lengths)
+    padded = np.full(int(spans.sum()) + (len(starts) + 1) * half, np.nan)
+    padded[position] = values
+    return padded, position
+
+
+def _window_median(windows):
+    """
+    Median of each row of windows, ignoring NaN, and the count of valid
+    values. np.sort moves NaN to the end, so the middle of the valid
+    prefix is picked with take_along_axis.
+    """
+    ordered = np.sort(windows, axis=1)
+    count = np.isfinite(windows).sum(axis=1)
+    lo = np.clip((count - 1) // 2, 0, None)[:, None]
+    hi = np.clip(count // 2, 0, None)[:, None]
+    median = (np.take_along_axis(ordered, lo, axis=1) + np.take_along_axis(ordered, hi, axis=1))[:, 0] / 2
+    median[count == 0] = np.nan
+    return median, count
+
+
+def _mad_block(windows, centre):
+    median, count = _window_median(windows)
+    mad = _window_median(np.abs(windows - median[:, None]))[0]
+    scale = np.maximum(MAD_SCALE * mad, np.maximum(MIN_SCALE, RELATIVE_MIN_SCALE * np.abs(median)))
+    return median, (centre - median) / scale, count
+
+
+def _zscore_block(windows, centre):
+    valid = np.isfinite(windows)
+    valid[:, windows.shape[1] // 2] = False
+    count = valid.sum(axis=1)
+    filled = np.where(valid, windows, 0.0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = filled.sum(axis=1) / count
+        std = np.sqrt(np.where(valid, (filled - mean[:, None]) ** 2, 0.0).sum(axis=1) / count)
+    scale = np.maximum(std, np.maximum(MIN_SCALE, RELATIVE_MIN_SCALE * np.abs(mean)))
+    return mean, (centre - mean) / scale, count
+
+
+_KERNELS = {'mad': _mad_block, 'zscore': _zscore_block}
+
+
+def rolling_scores(values, starts, window=DEFAULT_WINDOW, method='mad',
+                   min_periods=MIN_PERIODS, block=BLOCK_ROWS, days=None):
+    """
+    Centred rolling baseline and score for many series stored back to back.
+
+    values holds all series concatenated; starts are the positions where
+    each series begins. With days (the integer day number of each value,
+    e.g. from uidai.timeseries.day_code), a window spans window calendar
+    days; without, window consecutive values. Series are scored in groups
+    covering about block padded days. Returns (baseline, score), NaN
+    where a window has fewer than min_periods observations.
+    """
+    if method not in _KERNELS:
+        raise ValueError(f"Unknown anomaly method '{method}'. Expected one of: {', '.join(METHODS)}")
+    values = np.asarray(values, dtype='float64')
+    baseline = np.full(len(values), np.nan)
+    score = np.full(len(values), np.nan)
+    if not len(values):
+        return baseline, score
+
+    half = window // 2
+    starts = np.asarray(starts)
+    ends = np.r_[starts[1:], len(values)]
+    if days is not None:
+        days = np.asarray(days, dtype='int64')
+        spans = days[ends - 1] - days[starts] + 1
+    else:
+        spans = ends - starts
+    # Series i goes to block (padded days before it) // block, so a block
+    # only exceeds block days by its last series
+    sizes = spans + half
+    group = (np.cumsum(sizes) - sizes) // block
+    bounds = np.r_[0, np.flatnonzero(np.diff(group)) + 1, len(starts)]
+    kernel = _KERNELS[method]
+    for first, last in zip(bounds[:-1], bounds[1:]):
+        lo, hi = starts[first], ends[last - 1]
+        padded, position = _padded(values[lo:hi], starts[first:last] - lo, half,
+                                   None if days is None else days[lo:hi])
+        windows = sliding_window_view(padded, 2 * half + 1)
+        centre, block_score, count = kernel(windows[position - half], values[lo:hi])
+        enough = count >= min_periods
+        baseline[lo:hi] = np.where(enough, centre, np.nan)
+        score[lo:hi] = np.where(enough, block_score, np.nan)
+    return baseline, score
+
+
+def daily_totals(df, feed, keys=('pincode',)):
+    """
+    One total per (key, date) for a cleaned feed frame, sorted by key and date.
+    """
+    schema = get_schema(feed)
+    keys = list(keys)
+    frame = df[[*keys, 'date']].copy()
+    frame['Total'] = row_totals(df, schema)
+    frame = frame[frame[keys].notna().all(axis=1) & frame['date'].notna()]
+    totals = frame.groupby([*keys, 'date'], sort=True, observed=True)['Total'].sum()
+    return totals.reset_index()
+
+
+def detect(df, feed, keys=('pincode',), window=DEFAULT_WINDOW, threshold=DEFAULT_THRESHOLD, method='mad'):
+    """
+    Score every (pincode, date) total of a cleaned feed against its own
+    pincode's totals within window calendar days around it.
+
+    Returns the daily totals with Baseline, Score and Anomaly ('spike',
+    'drop' or '').
+    """
+    totals = daily_totals(df, feed, keys)
+    if totals.empty:
+        return totals.assign(Baseline=pd.Series(dtype='float64'), Score=pd.Series(dtype='float64'),
+                             Anomaly=pd.Series(dtype='object'))
+    group = totals.groupby(list(keys), sort=False, observed=True).ngroup().to_numpy()
+    starts = np.flatnonzero(np.r_[True, group[1:] != group[:-1]])
+    baseline, score = rolling_scores(totals['Total'].to_numpy(), starts, window, method,
+                                     days=day_code(totals['date']))
+    totals['Baseline'] = baseline
+    totals['Score'] = score
+    totals['Anomaly'] = np.select([score > threshold, score < -threshold], ['spike', 'drop'], '')
+    return totals
+
+
+def detect_feeds(clean_frames, **kwargs):
+    """
+    detect() for every feed; returns {feed: scored daily totals}.
+    """
+    return {feed: detect(df, feed, **kwargs) for feed, df in clean_frames.items()}
+
+
+def adjust(df, feed, scored, mode='exclude', keys=('pincode',)):
+    """
+    Remove the effect of flagged observations from a cleaned feed frame.
+
+    'exclude' drops the rows of every anomalous (pincode, date).
+    'downweight' scales the counts of spikes so the day's total equals the
+    rolling baseline; drops are kept, since missing counts cannot be
+    restored. 'flag' returns the frame unchanged.
+    """
+    if mode not in ADJUSTMENTS:
+        raise ValueError(f"Unknown anomaly adjustment '{mode}'. Expected one of: {', '.join(ADJUSTMENTS)}")
+    flagged = scored[scored['Anomaly'] == 'spike'] if mode == 'downweight' else scored[scored['Anomaly'] != '']
+    if mode == 'flag' or flagged.empty:
+        return df
+
+    keys = [*keys, 'date']
+    rows = pd.MultiIndex.from_frame(df[keys])
+    marks = pd.MultiIndex.from_frame(flagged[keys])
+    hit = rows.isin(marks)
+    if mode == 'exclude':
+        return df[~hit]
+
+    factor = (flagged['Baseline'] / flagged['Total']).clip(0, 1)
+    row_factor = pd.Series(factor.to_numpy(), index=marks).reindex(rows[hit]).to_numpy()
+    adjusted = df.copy()
+    for col in get_schema(feed).count_columns:
+        counts = adjusted[col].to_numpy(dtype='float64', na_value=np.nan)
+        counts[hit] = np.round(counts[hit] * row_factor)
+        adjusted[col] = pd.array(counts, dtype='Float64').astype(df[col].dtype)
+    return adjusted
+
+
+def summarize_anomalies(scored):
+    """
+    Spike and drop counts per feed as a DataFrame.
+    """
+    rows = []
+    for feed, frame in scored.items():
+        rows.append({
+            'Service': get_schema(feed).label,
+            'Observations': len(frame),
+            'Spikes': int((frame['Anomaly'] == 'spike').sum()),
+            'Drops': int((frame['Anomaly'] == 'drop').sum()),
+        })
+    return pd.DataFrame(rows, columns=['Service', 'Observations', 'Spikes', 'Drops'])
@@ -0,0 +1,384 @@
+"""
+Out-of-core execution backends for cleaning plus monthly aggregation.
+
+The in-memory pipeline (read_feed -> clean_frame -> prepare_monthly_data)
+holds every feed as one DataFrame. A backend computes the same monthly
+totals straight from the CSV without that: the same rows are kept (no
+unparseable date, no exact duplicate of an earlier row) and counted per
+month, with memory bounded independently of the file size.
+
+- 'pandas': chunked reads. Each kept row is reduced to (row digest,
+  month, row total) and spilled to one of several bucket files by
+  digest, so duplicates always land in the same bucket. Buckets are de-duplicated
+  and summed one at a time. No extra dependency.
+- 'polars': a lazy scan_csv query run on the streaming engine (needs polars).
+- 'duckdb': one SQL query over the CSV; DuckDB spills to disk past its
+  memory limit (needs duckdb).
+
+Pincodes and counts are read as text and converted like uidai.loader
+does: values that are not whole numbers in the column's range become
+missing instead of failing the query.
+
+check_parity() runs backends on the same files and compares their monthly
+totals with the in-memory pipeline (or with each other, for files too big
+for the in-memory run):
+
+    python -m uidai.backends --enrolment ENROL.csv --biometric BIO.csv \\
+        --demographic DEMO.csv --backends pandas polars duckdb
+"""
+
+import abc
+import argparse
+import inspect
+import math
+import os
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from uidai.aggregate import prepare_monthly_data
+from uidai.cleaning import clean_frame
+from uidai.loader import (DEFAULT_CHUNKSIZE, DIGEST_DTYPE, iter_feed_chunks, month_code, month_start, read_feed,
+                          row_digests, row_totals)
+from uidai.schema import DATE_FORMAT, FEEDS, get_schema
+
+# Input bytes per spill bucket: a bucket of a CSV this size fits in a few
+# hundred MB once loaded back
+BUCKET_INPUT_BYTES = 256 * 1024**2
+MAX_BUCKETS = 4096
+_SPILL_DTYPE = np.dtype([('digest', DIGEST_DTYPE), ('month', '<i4'), ('total', '<i8')])
+
+
+def _numeric_ranges(schema):
+    """
+    {column: (min, max)} of the pincode and count columns' dtypes.
+    """
+    ranges = {}
+    for col in schema.numeric_columns:
+        info = np.iinfo(pd.api.types.pandas_dtype(schema.dtypes[col]).numpy_dtype)
+        ranges[col] = (int(info.min), int(info.max))
+    return ranges
+
+
+def _monthly_frame(months, totals, schema):
+    """
+    Month codes and totals -> 'Month' plus label frame, sorted by month,
+    the shape of prepare_monthly_data.
+    """
+    if not len(months):
+        return pd.DataFrame(columns=['Month', schema.label])
+    monthly = pd.DataFrame({'Month': month_start(months), schema.label: np.asarray(totals, dtype='int64')})
+    return monthly.sort_values('Month').reset_index(drop=True)
+
+
+class Backend(abc.ABC):
+    """
+    Computes {feed: monthly frame} from {feed: csv_path}.
+    """
+
+    name = None
+
+    @abc.abstractmethod
+    def monthly(self, path, feed):
+        """
+        Monthly frame ('Month' plus the feed label) of one feed CSV.
+        """
+
+    def monthly_all(self, feed_files):
+        return {feed: self.monthly(path, feed) for feed, path in feed_files.items()}
+
+
+# ============================================================================
+# PANDAS (CHUNKED, SPILLING)
+# ============================================================================
+
+class PandasBackend(Backend):
+    """
+    Chunked pandas with hash-partitioned spill files for de-duplication.
+
+    Memory holds one CSV chunk plus one bucket (28 bytes per row) at a
+    time. Rows are identified by their 128-bit digest (see
+    uidai.loader.row_digests), so distinct rows are not merged on a
+    64-bit hash collision.
+    """
+
+    name = 'pandas'
+
+    def __init__(self, chunksize=DEFAULT_CHUNKSIZE, spill_dir=None, buckets=None):
+        self.chunksize = chunksize
+        self.spill_dir = spill_dir
+        self.buckets = buckets
+
+    def _bucket_count(self, path):
+        if self.buckets:
+            return self.buckets
+        return min(MAX_BUCKETS, max(1, math.ceil(os.path.getsize(path) / BUCKET_INPUT_BYTES)))
+
+    def _spill(self, path, schema, bucket_paths):
+        files = [open(bucket_path, 'wb') for bucket_path in bucket_paths]
+        try:
+            for chunk in iter_feed_chunks(path, schema, self.chunksize):
+                chunk = chunk[chunk['date'].notna()]
+                records = np.empty(len(chunk), dtype=_SPILL_DTYPE)
+                records['digest'] = row_digests(chunk)
+                records['month'] = month_code(chunk['date']).to_numpy()
+                records['total'] = row_totals(chunk, schema)
+
+                bucket = records['digest']['hi'] % len(files)
+                order = np.argsort(bucket, kind='stable')
+                bounds = np.searchsorted(bucket[order], np.arange(len(files) + 1))
+                for number, f in enumerate(files):
+                    if bounds[number] < bounds[number + 1]:
+                        records[order[bounds[number]:bounds[number + 1]]].tofile(f)
+        finally:
+            for f in files:
+                f.close()
+
+    def monthly(self, path, feed):
+        schema = get_schema(feed)
+        totals = None
+        with tempfile.TemporaryDirectory(prefix='uidai-spill-', dir=self.spill_dir) as tmp_dir:
+            bucket_paths = [os.path.join(tmp_dir, f'{number}.bin') for number in range(self._bucket_count(path))]
+            self._spill(path, schema, bucket_paths)
+            for bucket_path in bucket_paths:
+                records = np.fromfile(bucket_path, dtype=_SPILL_DTYPE)
+                os.remove(bucket_path)
+                if not len(records):
+                    continue
+                _, first = np.unique(records['digest'], return_index=True)
+                records = records[first]
+                partial = pd.Series(records['total']).groupby(records['month']).sum()
+                totals = partial if totals is None else totals.add(partial, fill_value=0)
+        if totals is None:
+            return _monthly_frame([], [], schema)
+        return _monthly_frame(totals.index.to_numpy(), totals.to_numpy(), schema)
+
+
+# ============================================================================
+# POLARS (LAZY, STREAMING)
+# ============================================================================
+
+def _require_polars():
+    try:
+        import polars
+    except ImportError:
+        raise ImportError("The polars backend needs polars: pip install polars")
+    return polars
+
+
+class PolarsBackend(Backend):
+    """
+    Lazy polars query over the CSV, collected with the streaming engine.
+    """
+
+    name = 'polars'
+
+    def monthly(self, path, feed):
+        pl = _require_polars()
+        schema = get_schema(feed)
+        numbers = []
+        for col, (low, high) in _numeric_ranges(schema).items():
+            value = pl.col(col).str.strip_chars().cast(pl.Float64, strict=False)
+            valid = (value == value.floor()) & value.is_between(low, high)
+            numbers.append(pl.when(valid).then(value).otherwise(None).cast(pl.Int64, strict=False).alias(col))
+        total = pl.sum_horizontal([pl.col(col).fill_null(0) for col in schema.count_columns])
+        query = (
+            pl.scan_csv(path, infer_schema=False)
+            .select(list(schema.columns))
+            .with_columns(pl.col('date').str.strptime(pl.Date, DATE_FORMAT, strict=False), *numbers)
+            .filter(pl.col('date').is_not_null())
+            .unique()
+            .group_by((pl.col('date').dt.year() * 12 + pl.col('date').dt.month() - 1).alias('month'))
+            .agg(total.sum().alias('total'))
+        )
+        try:
+            result = query.collect(engine='streaming')
+        except (TypeError, ValueError):
+            # Older polars selects the streaming engine with a flag
+            result = query.collect(streaming=True)
+        return _monthly_frame(result['month'].to_numpy(), result['total'].to_numpy(), schema)
+
+
+# ============================================================================
+# DUCKDB
+# ============================================================================
+
+def _require_duckdb():
+    try:
+        import duckdb
+    except ImportError:
+        raise ImportError("The duckdb backend needs duckdb: pip install duckdb")
+    return duckdb
+
+
+def _sql_string(value):
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+class DuckDBBackend(Backend):
+    """
+    One SQL query per feed over the CSV. memory_limit (e.g. '8GB') caps
+    DuckDB's memory; beyond it, DISTINCT and GROUP BY spill to spill_dir.
+    """
+
+    name = 'duckdb'
+
+    def __init__(self, memory_limit=None, spill_dir=None, threads=None):
+        self.memory_limit = memory_limit
+        self.spill_dir = spill_dir
+        self.threads = threads
+
+    def _connect(self):
+        duckdb = _require_duckdb()
+        conn = duckdb.connect()
+        if self.memory_limit:
+            conn.execute(f'SET memory_limit = {_sql_string(self.memory_limit)}')
+        if self.spill_dir:
+            conn.execute(f'SET temp_directory = {_sql_string(self.spill_dir)}')
+        if self.threads:
+            conn.execute(f'SET threads = {int(self.threads)}')
+        return conn
+
+    def monthly(self, path, feed):
+        schema = get_schema(feed)
+        types_sql = '{' + ', '.join(f"{_sql_string(col)}: 'VARCHAR'" for col in schema.columns) + '}'
+        numbers = []
+        for col, (low, high) in _numeric_ranges(schema).items():
+            value = f'TRY_CAST(trim({col}) AS DOUBLE)'
+            numbers.append(f'CASE WHEN {value} = floor({value}) AND {value} BETWEEN {low} AND {high} '
+                           f'THEN {value}::BIGINT END AS {col}')
+        numbers = ', '.join(numbers)
+        total = ' + '.join(f'COALESCE({col}, 0)' for col in schema.count_columns)
+        query = f"""
+            WITH kept AS (
+                SELECT DISTINCT CAST(try_strptime(date, {_sql_string(DATE_FORMAT)}) AS DATE) AS date,
+                       state, district, {numbers}
+                FROM read_csv({_sql_string(path)}, header = true, types = {types_sql})
+            )
+            SELECT year(date) * 12 + month(date) - 1 AS month, SUM({total}) AS total
+            FROM kept
+            WHERE date IS NOT NULL
+            GROUP BY 1
+        """
+        conn = self._connect()
+        try:
+            rows = conn.execute(query).fetchall()
+        finally:
+            conn.close()
+        return _monthly_frame([row[0] for row in rows], [row[1] for row in rows], schema)
+
+
+BACKENDS = {backend.name: backend for backend in (PandasBackend, PolarsBackend, DuckDBBackend)}
+
+
+def get_backend(name, **options):
+    """
+    Backend instance by name ('pandas', 'polars', 'duckdb'). Options the
+    backend does not take (e.g. memory_limit for pandas) are ignored.
+    """
+    try:
+        backend = BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown backend '{name}'. Expected one of: {', '.join(BACKENDS)}")
+    accepted = inspect.signature(backend).parameters
+    return backend(**{key: value for key, value in options.items() if key in accepted and value is not None})
+
+
+# ============================================================================
+# PARITY CHECK
+# ============================================================================
+
+def reference_monthly(feed_files, chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Monthly totals from the in-memory pipeline (read, clean, aggregate).
+    """
+    monthly = {}
+    for feed, path in feed_files.items():
+        schema = get_schema(feed)
+        clean, _ = clean_frame(read_feed(path, schema, chunksize))
+        monthly[feed] = prepare_monthly_data(clean, schema.label, verbose=False)
+    return monthly
+
+
+def _as_series(frame, label):
+    if frame.empty:
+        return pd.Series(dtype='int64')
+    return pd.Series(frame[label].to_numpy(dtype='int64'),
+                     index=pd.DatetimeIndex(frame['Month']).strftime('%Y-%m'))
+
+
+def compare_monthly(expected, actual):
+    """
+    Months whose totals differ between two {feed: monthly frame} results,
+    as a DataFrame (Feed, Month, Expected, Actual); empty when identical.
+    """
+    rows = []
+    for feed in expected:
+        label = get_schema(feed).label
+        left = _as_series(expected[feed], label)
+        right = _as_series(actual.get(feed, pd.DataFrame()), label)
+        for month in left.index.union(right.index):
+            want, got = left.get(month), right.get(month)
+            if want != got:
+                rows.append({'Feed': feed, 'Month': month, 'Expected': want, 'Actual': got})
+    return pd.DataFrame(rows, columns=['Feed', 'Month', 'Expected', 'Actual'])
+
+
+def check_parity(feed_files, backends=tuple(BACKENDS), reference=True, **options):
+    """
+    Run every backend on feed_files and compare its monthly totals with
+    the in-memory pipeline (reference=True) or with the first backend.
+
+    Returns {backend name: differences DataFrame, or the ImportError
+    message when the backend's package is not installed}.
+    """
+    results = {}
+    expected = reference_monthly(feed_files) if reference else None
+    for name in backends:
+        try:
+            monthly = get_backend(name, **options).monthly_all(feed_files)
+        except ImportError as e:
+            results[name] = str(e)
+            continue
+        if expected is None:
+            expected = monthly
+        results[name] = compare_monthly(expected, monthly)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Check that the execution backends give identical monthly totals.')
+    parser.add_argument('--enrolment', help='Enrolment CSV path')
+    parser.add_argument('--biometric', help='Biometric update CSV path')
+    parser.add_argument('--demographic', help='Demographic update CSV path')
+    parser.add_argument('--backends', nargs='+', default=list(BACKENDS), choices=list(BACKENDS),
+                        help='Backends to check (default: all)')
+    parser.add_argument('--no-reference', action='store_true',
+                        help='Compare with the first backend instead of the in-memory pipeline (large files)')
+    parser.add_argument('--spill-dir', default=None, help='Directory for spill files (default: system temp)')
+    parser.add_argument('--memory-limit', default=None, help="DuckDB memory limit, e.g. '8GB'")
+    args = parser.parse_args(argv)
+
+    feed_files = {feed: getattr(args, feed) for feed in FEEDS if getattr(args, feed)}
+    if not feed_files:
+        parser.error('give at least one of --enrolment, --biometric, --demographic')
+
+    results = check_parity(feed_files, args.backends, reference=not args.no_reference,
+                           spill_dir=args.spill_dir, memory_limit=args.memory_limit)
+    failed = False
+    for name, differences in results.items():
+        if isinstance(differences, str):
+            print(f"ℹ {name}: skipped ({differences})")
+        elif differences.empty:
+            print(f"✓ {name}: monthly totals identical")
+        else:
+            failed = True
+            print(f"❌ {name}: {len(differences)} month(s) differ")
+            print(differences.to_string(index=False))
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,370 @@
+"""
+Batch runner: the district analysis for every state/district partition.
+
+The three feeds are split once into per-district CSV partitions, then the
+cleaning -> monthly aggregation -> peak months -> insights pipeline runs
+for each partition on a process pool. Each district gets its own output
+directory (names that sanitize to the same directory get a short hash of
+the raw names appended), and a national rollup is built from the
+per-district monthly tables.
+
+Progress is tracked in a JSON job manifest inside the output directory,
+so re-running after a crash only processes the districts that did not
+finish. The manifest records a SHA-256 of every input file; when an
+input changed since, the run starts over instead of resuming. Once the
+rollup is written, the manifest gets a 'completed' timestamp; readers
+such as uidai.service wait for it before reloading.
+
+Workers send back each district's report statistics as a compact
+record, kept in the manifest along with the national one. The parent renders the insights reports
+from these records and writes them in batches, skipping reports whose
+statistics did not change since they were last written.
+
+Instead of CSVs, a columnar dataset written by uidai.columnar can be
+given with --dataset; districts are then read straight from their own
+partitions and no CSV split is needed.
+
+Usage:
+    python -m uidai.batch --enrolment ENROL.csv --biometric BIO.csv \\
+        --demographic DEMO.csv --out batch_output --workers 8
+    python -m uidai.batch --dataset aadhaar_dataset --out batch_output
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import shutil
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+import pandas as pd
+
+from uidai.aggregate import prepare_monthly_data
+from uidai.cache import content_hash
+from uidai.cleaning import clean_frame
+from uidai.columnar import list_districts, monthly_from_dataset
+from uidai.loader import DEFAULT_CHUNKSIZE, iter_feed_chunks, read_feed
+from uidai.pipeline import analyze
+from uidai.report import DEFAULT_BATCH_SIZE, FORMATS, ReportRecord, ReportWriter
+from uidai.schema import DATE_FORMAT, FEEDS
+
+MANIFEST_NAME = 'manifest.json'
+PARTITION_DIR = 'partitions'
+NATIONAL_DIR = 'national'
+MONTHLY_FILENAME = 'monthly.csv'
+# One service's months only, without the zero-filled gaps of monthly.csv
+FEED_MONTHLY_FILENAME = 'monthly_{feed}.csv'
+
+# Recycle worker processes after this many districts so memory held by
+# pandas/numpy allocations does not build up over a long run
+TASKS_PER_CHILD = 25
+
+
+def safe_name(name):
+    """
+    Directory-safe version of a state or district name.
+    """
+    return re.sub(r'[^\w\-]+', '_', str(name).strip()).strip('_') or 'unknown'
+
+
+def job_key(state, district, jobs):
+    """
+    Output key '<state>/<district>' of a job, unique within jobs.
+
+    Different names can sanitize to the same key ('A&B' and 'A B'); the
+    later one gets a short hash of its raw names appended, so no two
+    districts share an output directory.
+    """
+    key = f"{safe_name(state)}/{safe_name(district)}"
+    taken = jobs.get(key)
+    if taken is not None and (taken['state'], taken['district']) != (str(state), str(district)):
+        key += '_' + hashlib.sha256(f'{state}\0{district}'.encode()).hexdigest()[:8]
+    return key
+
+
+# ============================================================================
+# MANIFEST
+# ============================================================================
+
+def load_manifest(out_dir):
+    path = os.path.join(out_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {'partitioned': False, 'jobs': {}}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def input_hashes(feed_files=None, dataset=None):
+    """
+    SHA-256 of every input file: {feed: sha} for CSVs, or {relative path:
+    sha} for every file of a columnar dataset.
+    """
+    if dataset is None:
+        return {feed: content_hash(path) for feed, path in sorted(feed_files.items())}
+    hashes = {}
+    for root, _, files in os.walk(dataset):
+        for name in files:
+            path = os.path.join(root, name)
+            hashes[os.path.relpath(path, dataset).replace(os.sep, '/')] = content_hash(path)
+    return dict(sorted(hashes.items()))
+
+
+def save_manifest(out_dir, manifest):
+    """
+    Write the manifest atomically (write to a temp file, then rename).
+    """
+    path = os.path.join(out_dir, MANIFEST_NAME)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+# ============================================================================
+# PARTITIONING
+# ============================================================================
+
+def partition_feeds(feed_files, out_dir, chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Split each feed CSV into partitions/<state>/<district>/<feed>.csv.
+
+    Files are streamed chunk by chunk and appended to, so memory stays
+    bounded by the chunk size. Rows without a state or district belong to
+    no partition. Returns ({job_key: job} for the manifest, {feed: rows
+    left out}).
+    """
+    partition_root = os.path.join(out_dir, PARTITION_DIR)
+    # A partial split from a crashed run cannot be trusted, start over
+    shutil.rmtree(partition_root, ignore_errors=True)
+
+    jobs = {}
+    keys = {}
+    unassigned = {}
+    for feed, path in feed_files.items():
+        schema = FEEDS[feed]
+        for chunk in iter_feed_chunks(path, schema, chunksize):
+            unassigned[feed] = unassigned.get(feed, 0) + int(
+                (chunk['state'].isna() | chunk['district'].isna()).sum())
+            for (state, district), rows in chunk.groupby(['state', 'district'], observed=True, sort=False):
+                key = keys.get((state, district))
+                if key is None:
+                    key = keys[state, district] = job_key(state, district, jobs)
+                    os.makedirs(os.path.join(partition_root, key), exist_ok=True)
+                    jobs[key] = {'state': str(state), 'district': str(district), 'status': 'pending'}
+                part_path = os.path.join(partition_root, key, schema.filename)
+                rows.to_csv(part_path, mode='a', index=False, header=not os.path.exists(part_path),
+                            date_format=DATE_FORMAT)
+    return jobs, unassigned
+
+
+# ============================================================================
+# PER-DISTRICT PIPELINE (runs in worker processes)
+# ============================================================================
+
+def run_district(key, job, out_dir, chunksize=DEFAULT_CHUNKSIZE, dataset=None):
+    """
+    Clean, aggregate and analyze one district; write its outputs.
+
+    Outputs go to <out_dir>/<state>/<district>/: monthly.csv (merged
+    monthly services with Total_Load), monthly_<feed>.csv per service
+    and peak_months.csv. With a columnar dataset, only the district's
+    partitions and count columns are read. Returns the district's
+    ReportRecord as a dict; the insights report is written from it by
+    the parent process.
+    """
+    partition_dir = os.path.join(out_dir, PARTITION_DIR, key)
+    district_dir = os.path.join(out_dir, key)
+    os.makedirs(district_dir, exist_ok=True)
+
+    monthly = {}
+    for feed, schema in FEEDS.items():
+        if dataset is not None:
+            if os.path.isdir(os.path.join(dataset, feed)):
+                monthly[feed] = monthly_from_dataset(dataset, feed, job['state'], job['district'])
+            continue
+        part_path = os.path.join(partition_dir, schema.filename)
+        if not os.path.exists(part_path):
+            continue
+        clean, _ = clean_frame(read_feed(part_path, schema, chunksize))
+        monthly[feed] = prepare_monthly_data(clean, schema.label, verbose=False)
+
+    record = write_district_outputs(district_dir, monthly, job['district'], f"{job['district']} District")
+    return record.values()
+
+
+def write_district_outputs(target_dir, monthly, region, title):
+    """
+    Merge monthly frames, find peaks and write the monthly, per-service
+    and peak-month tables. monthly maps feed name to its monthly frame.
+    Returns the ReportRecord for the insights report.
+    """
+    merged_data, top_months, stats = analyze(monthly)
+    merged_data.to_csv(os.path.join(target_dir, MONTHLY_FILENAME), index=False)
+    for feed, frame in monthly.items():
+        frame.to_csv(os.path.join(target_dir, FEED_MONTHLY_FILENAME.format(feed=feed)), index=False)
+    top_months.to_csv(os.path.join(target_dir, 'peak_months.csv'), index=False)
+    return ReportRecord.from_stats(stats, region, title)
+
+
+# ============================================================================
+# NATIONAL ROLLUP
+# ============================================================================
+
+def build_national_rollup(out_dir, manifest):
+    """
+    Sum every finished district's per-service monthly tables into
+    national ones, then merge and analyze them like a single district.
+
+    The per-service tables hold only the months a service has data for,
+    so a district's gap months do not enter the national averages as 0.
+    Returns the national ReportRecord, or None when no district has
+    finished.
+    """
+    frames = {}
+    for key, job in manifest['jobs'].items():
+        if job['status'] != 'done':
+            continue
+        for feed in FEEDS:
+            path = os.path.join(out_dir, key, FEED_MONTHLY_FILENAME.format(feed=feed))
+            if os.path.exists(path):
+                frames.setdefault(feed, []).append(pd.read_csv(path, parse_dates=['Month']))
+
+    national_dir = os.path.join(out_dir, NATIONAL_DIR)
+    os.makedirs(national_dir, exist_ok=True)
+    if not frames:
+        return None
+
+    monthly = {feed: pd.concat(feed_frames, ignore_index=True).groupby('Month', as_index=False).sum()
+               for feed, feed_frames in frames.items()}
+    return write_district_outputs(national_dir, monthly, 'India', 'National Rollup')
+
+
+# ============================================================================
+# ENTRY POINT
+# ============================================================================
+
+def run_batch(feed_files, out_dir, workers=None, chunksize=DEFAULT_CHUNKSIZE, dataset=None,
+              report_formats=('text',), report_batch=DEFAULT_BATCH_SIZE):
+    """
+    Run (or resume) the batch over all districts and build the rollup.
+
+    feed_files maps feed name ('enrolment', 'biometric', 'demographic')
+    to a CSV path; alternatively dataset points at a columnar dataset from
+    uidai.columnar. Insights reports are written in report_formats,
+    report_batch files at a time. Returns the final manifest.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    manifest = load_manifest(out_dir)
+    inputs = input_hashes(feed_files, dataset)
+
+    if manifest['partitioned'] and manifest.get('inputs') != inputs:
+        print("ℹ Input files changed since the last run; starting over")
+        manifest = {'partitioned': False, 'jobs': {}}
+
+    if not manifest['partitioned']:
+        if dataset is not None:
+            print("Listing districts in columnar dataset...")
+            jobs = {}
+            for state, district in list_districts(dataset):
+                jobs[job_key(state, district, jobs)] = {'state': state, 'district': district, 'status': 'pending'}
+            unassigned = {}
+        else:
+            print("Partitioning input by state/district...")
+            jobs, unassigned = partition_feeds(feed_files, out_dir, chunksize)
+        manifest = {'partitioned': True, 'inputs': inputs, 'unassigned': unassigned, 'jobs': jobs}
+        save_manifest(out_dir, manifest)
+    elif manifest.pop('completed', None):
+        # Outputs are about to change; readers must not pick them up halfway
+        save_manifest(out_dir, manifest)
+
+    for key, job in manifest['jobs'].items():
+        # Every district has at least one service; without any per-service
+        # table its outputs predate them and cannot enter the rollup
+        if job['status'] == 'done' and not any(
+                os.path.exists(os.path.join(out_dir, key, FEED_MONTHLY_FILENAME.format(feed=feed))) for feed in FEEDS):
+            job['status'] = 'pending'
+
+    pending = {key: job for key, job in manifest['jobs'].items() if job['status'] != 'done'}
+    print(f"Districts: {len(manifest['jobs'])} total, {len(pending)} to run")
+    for feed, rows in manifest.get('unassigned', {}).items():
+        if rows:
+            print(f"⚠ {FEEDS[feed].title}: {rows:,} row(s) without a state or district left out of every district")
+
+    writer = ReportWriter(out_dir, report_formats, report_batch)
+    # Finished districts from an earlier run: only reports that are missing
+    # or out of date (e.g. a new format) are written
+    for key, job in manifest['jobs'].items():
+        if job['status'] == 'done' and 'report' in job:
+            writer.add(os.path.join(out_dir, key), ReportRecord(**job['report']))
+
+    pool_kwargs = {'max_workers': workers}
+    if sys.version_info >= (3, 11):
+        pool_kwargs['max_tasks_per_child'] = TASKS_PER_CHILD
+
+    if pending:
+        with ProcessPoolExecutor(**pool_kwargs) as executor:
+            futures = {executor.submit(run_district, key, job, out_dir, chunksize, dataset): key
+                       for key, job in pending.items()}
+            for future in as_completed(futures):
+                key = futures[future]
+                job = manifest['jobs'][key]
+                try:
+                    job['report'] = future.result()
+                    job['status'] = 'done'
+                    job.pop('error', None)
+                    print(f"  ✓ {job['state']} / {job['district']}")
+                except Exception as e:
+                    job['status'] = 'failed'
+                    job['error'] = repr(e)
+                    print(f"  ❌ {job['state']} / {job['district']}: {e}")
+                save_manifest(out_dir, manifest)
+                if job['status'] == 'done':
+                    writer.add(os.path.join(out_dir, key), ReportRecord(**job['report']))
+
+    national = build_national_rollup(out_dir, manifest)
+    if national is not None:
+        writer.add(os.path.join(out_dir, NATIONAL_DIR), national)
+        manifest['national'] = national.values()
+    writer.flush()
+    print(f"✓ Reports: {writer.written} written, {writer.skipped} unchanged")
+    manifest['completed'] = datetime.now().isoformat(timespec='milliseconds')
+    save_manifest(out_dir, manifest)
+    failed = sum(job['status'] == 'failed' for job in manifest['jobs'].values())
+    print(f"✓ National rollup written to '{os.path.join(out_dir, NATIONAL_DIR)}'")
+    if failed:
+        print(f"⚠ {failed} district(s) failed; re-run the same command to retry them")
+    return manifest
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run the Aadhaar analysis for every state/district.')
+    parser.add_argument('--enrolment', help='Enrolment CSV path')
+    parser.add_argument('--biometric', help='Biometric update CSV path')
+    parser.add_argument('--demographic', help='Demographic update CSV path')
+    parser.add_argument('--dataset', help='Columnar dataset from uidai.columnar (instead of the CSVs)')
+    parser.add_argument('--out', default='batch_output', help='Output directory (default: batch_output)')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: CPU count)')
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE, help='Rows per CSV chunk')
+    parser.add_argument('--report-formats', nargs='+', default=['text'], choices=FORMATS,
+                        help='Insights report formats to write (default: text)')
+    parser.add_argument('--report-batch', type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f'Report files rendered and written together (default: {DEFAULT_BATCH_SIZE})')
+    args = parser.parse_args(argv)
+
+    feed_files = {
+        'enrolment': args.enrolment,
+        'biometric': args.biometric,
+        'demographic': args.demographic,
+    }
+    if args.dataset is None and not all(feed_files.values()):
+        parser.error('give --enrolment, --biometric and --demographic, or --dataset')
+    manifest = run_batch(feed_files, args.out, args.workers, args.chunksize, args.dataset,
+                         args.report_formats, args.report_batch)
+    return 1 if any(job['status'] == 'failed' for job in manifest['jobs'].values()) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
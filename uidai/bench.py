@@ -0,0 +1,345 @@
+"""
+Reproducible benchmarks on synthetic national-scale feeds.
+
+The generator writes CSVs with the exact layout of the real extracts
+(date,state,district,pincode + the feed's age-bucket columns) for a
+synthetic geography of states, districts and pincodes. It can write
+anything from 10^5 to 10^9 rows in constant memory. Output is
+deterministic for a given row count and seed. A small share of rows is
+deliberately dirty (blank counts, unparseable dates, exact duplicates),
+so the cleaning stage does real work.
+
+The runner times every pipeline stage with uidai.profiling and saves the
+result as JSON. A saved result can serve as the baseline that later
+runs are compared against.
+
+    python -m uidai.bench generate --rows 1000000 --out bench_data
+    python -m uidai.bench run --rows 1000000 --save-baseline bench_baseline.json
+    python -m uidai.bench run --rows 1000000 --compare bench_baseline.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from uidai.profiling import Profiler, StageRecord
+from uidai.schema import DATE_FORMAT, FEEDS, get_schema
+
+# Share of generated rows per feed, roughly as in the real extracts
+FEED_WEIGHTS = {'enrolment': 0.15, 'biometric': 0.60, 'demographic': 0.25}
+# Mean count per row and age bucket
+COUNT_MEANS = {
+    'age_0_5': 6.0, 'age_5_17': 3.0, 'age_18_greater': 0.5,
+    'bio_age_5_17': 12.0, 'bio_age_17_': 14.0,
+    'demo_age_5_17': 2.0, 'demo_age_17_': 14.0,
+}
+DEFAULT_STATES = 36
+DEFAULT_DISTRICTS = 780
+DEFAULT_PINCODES = 19_000
+DEFAULT_MONTHS = 12
+DEFAULT_START = '2025-01-01'
+DIRTY_FRACTION = 0.001
+WRITE_CHUNK_ROWS = 1_000_000
+MODES = ('full', 'checkpoint')
+REGRESSION_TOLERANCE = 0.10
+# Stages faster than this are too noisy to flag as time regressions
+MIN_COMPARE_SECONDS = 0.05
+_MARKER = 'generated.json'
+
+
+class Geography:
+    """
+    Synthetic states, districts and pincodes.
+
+    Every pincode belongs to one district and every district to one state.
+    Pincodes get a lognormal activity weight, so a few are much busier than
+    the rest, as in the real data.
+    """
+
+    def __init__(self, seed=0, states=DEFAULT_STATES, districts=DEFAULT_DISTRICTS, pincodes=DEFAULT_PINCODES):
+        rng = np.random.default_rng([seed, 0])
+        self.state_names = np.array([f'State {i:02d}' for i in range(1, states + 1)], dtype=object)
+        self.district_names = np.array([f'District {i:03d}' for i in range(1, districts + 1)], dtype=object)
+        # every state has at least one district and every district one pincode
+        self.district_state = _assign(rng, states, districts)
+        self.pincode_district = _assign(rng, districts, pincodes)
+        # 6-digit codes, consecutive within a district like real postal circles
+        rank = _rank_within(self.pincode_district)
+        self.pincodes = 110_000 + self.pincode_district * (rank.max() + 1) + rank
+        weights = rng.lognormal(0.0, 1.0, len(self.pincodes))
+        self.pincode_weights = weights / weights.sum()
+
+    def sample(self, rng, n):
+        """
+        Positions of n pincodes drawn by activity weight.
+        """
+        return rng.choice(len(self.pincodes), size=n, p=self.pincode_weights)
+
+
+def _assign(rng, groups, n):
+    """
+    Sorted group number for each of n items, every group used at least once.
+    """
+    return np.sort(np.concatenate([np.arange(groups), rng.integers(0, groups, max(n - groups, 0))]))
+
+
+def _rank_within(groups):
+    """
+    0, 1, 2, ... within each run of equal values of a sorted array.
+    """
+    starts = np.flatnonzero(np.r_[True, groups[1:] != groups[:-1]])
+    return np.arange(len(groups)) - np.repeat(starts, np.diff(np.r_[starts, len(groups)]))
+
+
+def _feed_chunk(rng, schema, geography, rows, dates, dirty_fraction):
+    """
+    One chunk of synthetic rows for a feed as a DataFrame of strings and ints.
+    """
+    pincode = geography.sample(rng, rows)
+    district = geography.pincode_district[pincode]
+    scale = 0.5 + geography.pincode_weights[pincode] * len(geography.pincodes)
+
+    frame = pd.DataFrame({
+        'date': dates[rng.integers(0, len(dates), rows)],
+        'state': geography.state_names[geography.district_state[district]],
+        'district': geography.district_names[district],
+        'pincode': geography.pincodes[pincode],
+    })
+    for col in schema.count_columns:
+        frame[col] = rng.poisson(COUNT_MEANS.get(col, 5.0) * scale)
+
+    n_dirty = int(rows * dirty_fraction)
+    if n_dirty:
+        frame = frame.astype({col: 'object' for col in ('date', *schema.count_columns)})
+        blank = rng.choice(rows, n_dirty, replace=False)
+        frame.iloc[blank, frame.columns.get_loc(schema.count_columns[-1])] = ''
+        bad_date = rng.choice(rows, n_dirty, replace=False)
+        frame.iloc[bad_date, frame.columns.get_loc('date')] = '31-02-2025'
+        duplicates = frame.iloc[rng.choice(rows, n_dirty, replace=False)]
+        frame = pd.concat([frame.iloc[:rows - n_dirty], duplicates], ignore_index=True)
+    return frame
+
+
+def generate_feed(path, feed, rows, seed=0, geography=None, months=DEFAULT_MONTHS, start=DEFAULT_START,
+                  dirty_fraction=DIRTY_FRACTION, chunk_rows=WRITE_CHUNK_ROWS):
+    """
+    Write rows synthetic rows of one feed to path. Returns the row count.
+    """
+    schema = get_schema(feed)
+    geography = geography or Geography(seed)
+    rng = np.random.default_rng([seed, 1 + list(FEEDS).index(schema.name)])
+    dates = pd.date_range(start, periods=months, freq='MS')
+    dates = pd.date_range(dates[0], dates[-1] + pd.offsets.MonthEnd(0)).strftime(DATE_FORMAT).to_numpy(dtype=object)
+
+    written = 0
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        f.write(','.join(schema.columns) + '\n')
+        while written < rows:
+            n = min(chunk_rows, rows - written)
+            _feed_chunk(rng, schema, geography, n, dates, dirty_fraction).to_csv(f, header=False, index=False)
+            written += n
+    return written
+
+
+def feed_rows(rows):
+    """
+    Split a total row count across the feeds by FEED_WEIGHTS.
+    """
+    return {feed: max(1, int(rows * weight)) for feed, weight in FEED_WEIGHTS.items()}
+
+
+def generate_feeds(out_dir, rows, seed=0, verbose=False, **kwargs):
+    """
+    Write the three feeds for a total of rows rows into out_dir and return
+    {feed: csv_path}.
+
+    A marker file records the parameters. A directory that already holds
+    feeds with the same parameters is reused instead of regenerated.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    params = {'rows': int(rows), 'seed': seed, **kwargs}
+    marker = os.path.join(out_dir, _MARKER)
+    feed_files = {feed: os.path.join(out_dir, FEEDS[feed].filename) for feed in FEEDS}
+    try:
+        with open(marker, encoding='utf-8') as f:
+            if json.load(f) == params and all(os.path.exists(path) for path in feed_files.values()):
+                return feed_files
+    except (OSError, ValueError):
+        pass
+
+    geography = Geography(seed)
+    for feed, n in feed_rows(rows).items():
+        started = time.perf_counter()
+        generate_feed(feed_files[feed], feed, n, seed, geography, **kwargs)
+        if verbose:
+            print(f"✓ Generated {n:,} {FEEDS[feed].title.lower()} rows in {time.perf_counter() - started:.1f}s")
+    with open(marker, 'w', encoding='utf-8') as f:
+        json.dump(params, f)
+    return feed_files
+
+
+def _run_once(feed_files, mode, charts, chunksize):
+    from uidai.loader import DEFAULT_CHUNKSIZE
+    from uidai.pipeline import run_analysis
+
+    profiler = Profiler()
+    with tempfile.TemporaryDirectory() as tmp:
+        checkpoint = os.path.join(tmp, 'checkpoint.sqlite') if mode == 'checkpoint' else None
+        # Timed outside the profiler so every pipeline stage stays top-level
+        # and gets its own memory peak
+        wall, cpu = time.perf_counter(), time.process_time()
+        run_analysis(feed_files, out_dir=tmp, charts=charts, checkpoint=checkpoint,
+                     chunksize=chunksize or DEFAULT_CHUNKSIZE, profiler=profiler)
+        peak = max((record.peak_rss_bytes or 0 for record in profiler.records), default=0)
+        profiler.add(StageRecord('total', time.perf_counter() - wall, time.process_time() - cpu, peak or None))
+    return profiler.records
+
+
+def run_benchmark(feed_files, mode='full', repeat=3, charts=False, chunksize=None):
+    """
+    Run the pipeline repeat times and return per-stage medians as a dict.
+
+    Throughput is rows per second through each stage (rows in, or rows
+    out for stages that have no input rows, such as load). The 'total'
+    stage covers the whole run over all input rows.
+    """
+    if mode not in MODES:
+        raise ValueError(f"Unsupported mode '{mode}'. Expected one of: {', '.join(MODES)}")
+    input_rows = 0
+    for path in feed_files.values():
+        with open(path, 'rb') as f:
+            input_rows += sum(block.count(b'\n') for block in iter(lambda: f.read(1 << 20), b'')) - 1
+
+    runs = [_run_once(feed_files, mode, charts, chunksize) for _ in range(repeat)]
+    stages = {}
+    for name in dict.fromkeys(record.name for record in runs[0]):
+        records = [record for run in runs for record in run if record.name == name]
+        rows = records[0].rows_in if records[0].rows_in is not None else records[0].rows_out
+        if name == 'total':
+            rows = input_rows
+        wall = statistics.median(record.wall_s for record in records)
+        peaks = [record.peak_rss_bytes for record in records if record.peak_rss_bytes]
+        stages[name] = {
+            'wall_s': wall,
+            'cpu_s': statistics.median(record.cpu_s for record in records),
+            'peak_rss_bytes': max(peaks) if peaks else None,
+            'rows': rows,
+            'rows_per_s': rows / wall if rows is not None and wall > 0 else None,
+        }
+    return {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'mode': mode,
+        'charts': charts,
+        'repeat': repeat,
+        'input_rows': input_rows,
+        'stages': stages,
+    }
+
+
+def compare(result, baseline, tolerance=REGRESSION_TOLERANCE):
+    """
+    Per-stage wall time and peak memory against a baseline result.
+
+    Returns (table, regressions). table is a DataFrame with the ratio of
+    current to baseline values. regressions lists the stages that got
+    slower or bigger by more than tolerance. Time is only compared for
+    stages that took at least MIN_COMPARE_SECONDS in the baseline.
+    """
+    rows = []
+    for name, current in result['stages'].items():
+        before = baseline['stages'].get(name)
+        if before is None:
+            continue
+        wall_ratio = (current['wall_s'] / before['wall_s']
+                      if before['wall_s'] >= MIN_COMPARE_SECONDS else float('nan'))
+        rss_ratio = (current['peak_rss_bytes'] / before['peak_rss_bytes']
+                     if current['peak_rss_bytes'] and before['peak_rss_bytes'] else float('nan'))
+        rows.append({'Stage': name, 'Baseline (s)': before['wall_s'], 'Current (s)': current['wall_s'],
+                     'Time ratio': wall_ratio, 'Memory ratio': rss_ratio})
+    table = pd.DataFrame(rows, columns=['Stage', 'Baseline (s)', 'Current (s)', 'Time ratio', 'Memory ratio'])
+    regressions = table.loc[(table['Time ratio'] > 1 + tolerance) | (table['Memory ratio'] > 1 + tolerance),
+                            'Stage'].tolist()
+    return table, regressions
+
+
+def format_result(result):
+    """
+    Stage table of a benchmark result as text.
+    """
+    lines = [f"{'Stage':<32}{'Wall (s)':>10}{'CPU (s)':>10}{'Peak RSS (MB)':>15}{'Rows/s':>14}"]
+    for name, stage in result['stages'].items():
+        rss = f"{stage['peak_rss_bytes'] / 1024**2:,.1f}" if stage['peak_rss_bytes'] else '-'
+        rate = f"{stage['rows_per_s']:,.0f}" if stage['rows_per_s'] else '-'
+        lines.append(f"{name:<32}{stage['wall_s']:>10.3f}{stage['cpu_s']:>10.3f}{rss:>15}{rate:>14}")
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Synthetic data generator and pipeline benchmark.')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    generate = commands.add_parser('generate', help='Write synthetic feeds')
+    generate.add_argument('--rows', type=float, required=True, help='Total rows across the three feeds (e.g. 1e6)')
+    generate.add_argument('--out', required=True, help='Output directory')
+    generate.add_argument('--seed', type=int, default=0)
+
+    run = commands.add_parser('run', help='Benchmark the pipeline on synthetic feeds')
+    run.add_argument('--rows', type=float, default=1e5, help='Total rows across the three feeds (default: 1e5)')
+    run.add_argument('--seed', type=int, default=0)
+    run.add_argument('--data', default='bench_data', help='Where generated feeds are kept (default: bench_data)')
+    run.add_argument('--mode', default='full', choices=MODES,
+                     help='full: in-memory load/clean/aggregate; checkpoint: streaming aggregation')
+    run.add_argument('--repeat', type=int, default=3, help='Runs per benchmark; medians are reported')
+    run.add_argument('--charts', action='store_true', help='Include chart rendering')
+    run.add_argument('--chunksize', type=int, default=None, help='Rows per CSV chunk')
+    run.add_argument('--save-baseline', default=None, metavar='PATH', help='Save the result as a baseline')
+    run.add_argument('--compare', default=None, metavar='PATH', help='Compare against a saved baseline')
+    run.add_argument('--tolerance', type=float, default=REGRESSION_TOLERANCE,
+                     help='Allowed slowdown before a stage counts as a regression (default: 0.10)')
+    args = parser.parse_args(argv)
+
+    rows = int(args.rows)
+    if args.command == 'generate':
+        generate_feeds(args.out, rows, args.seed, verbose=True)
+        return 0
+
+    data_dir = os.path.join(args.data, f'rows={rows}-seed={args.seed}')
+    feed_files = generate_feeds(data_dir, rows, args.seed, verbose=True)
+    result = run_benchmark(feed_files, args.mode, args.repeat, args.charts, args.chunksize)
+    print(format_result(result))
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2)
+        print(f"\n✓ Baseline saved to '{args.save_baseline}'")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        if any(baseline.get(key) != result[key] for key in ('input_rows', 'mode', 'charts')):
+            print("⚠ Warning: baseline was measured on a different row count, mode or chart setting")
+        table, regressions = compare(result, baseline, args.tolerance)
+        print()
+        print(table.to_string(index=False, float_format=lambda x: f'{x:.3f}'))
+        if regressions:
+            print(f"\n⚠ Regressions beyond {args.tolerance:.0%}: {', '.join(regressions)}")
+            return 1
+        print("\n✓ No regressions against the baseline")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
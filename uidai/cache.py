@@ -0,0 +1,204 @@
+"""
+Content-addressed cache for pipeline results.
+
+Every input CSV is fingerprinted (size, mtime and a SHA-256 of its
+content). Each stage result is stored under a key derived from the keys
+of the stages it depends on, so changing one feed only invalidates that
+feed's cleaned frame and monthly aggregate plus the combined stages
+downstream of it; the other feeds are served from the cache.
+
+Entries are pickled files in the cache directory. An index tracks their
+size and last access time, and the least recently used entries are
+evicted once the cache grows past its size budget. Access times are
+updated in memory and the index is written on put() and close().
+
+The bookkeeping of incremental outputs (which charts and reports are up
+to date) lives under the cache directory as well, in one small JSON
+file per output directory (state_path), so nothing but the outputs
+themselves is written to the output directories.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import time
+
+# Bump when a change to the pipeline alters results, so old entries are
+# no longer matched
+PIPELINE_VERSION = 1
+
+DEFAULT_CACHE_DIR = '.uidai_cache'
+DEFAULT_MAX_BYTES = 2 * 1024**3
+STATE_DIR = 'state'
+INDEX_NAME = 'index.json'
+FINGERPRINTS_NAME = 'fingerprints.json'
+_HASH_BLOCK = 1024 * 1024
+
+
+def _read_json(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_json(path, data):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def content_hash(path):
+    """
+    SHA-256 of a file's bytes, read in 1 MB blocks.
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(_HASH_BLOCK), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def make_key(*parts):
+    """
+    Stable cache key from JSON-serialisable parts.
+    """
+    payload = json.dumps([PIPELINE_VERSION, *parts], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def state_path(kind, target_dir, cache_dir=None):
+    """
+    JSON file under cache_dir (default: DEFAULT_CACHE_DIR) that tracks the
+    outputs of one kind ('render', 'reports') written to target_dir.
+    """
+    tag = hashlib.sha256(os.path.abspath(target_dir).encode()).hexdigest()[:16]
+    return os.path.join(cache_dir or DEFAULT_CACHE_DIR, STATE_DIR, f'{kind}-{tag}.json')
+
+
+class ResultCache:
+    """
+    On-disk LRU cache of pickled stage results.
+    """
+
+    def __init__(self, cache_dir, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+        self._index_path = os.path.join(cache_dir, INDEX_NAME)
+        self._fingerprints_path = os.path.join(cache_dir, FINGERPRINTS_NAME)
+        self.index = _read_json(self._index_path)
+        self.hits = 0
+        self.misses = 0
+        self._dirty = False
+
+    def _entry_path(self, key):
+        return os.path.join(self.cache_dir, f'{key}.pkl')
+
+    def fingerprint(self, path):
+        """
+        Fingerprint of an input file: {'size', 'mtime_ns', 'sha256'}.
+
+        The content hash is reused when size and mtime match the last
+        fingerprint of the same path, so unchanged inputs are not re-read.
+        """
+        stat = os.stat(path)
+        known = _read_json(self._fingerprints_path)
+        abs_path = os.path.abspath(path)
+        previous = known.get(abs_path)
+        if previous and previous['size'] == stat.st_size and previous['mtime_ns'] == stat.st_mtime_ns:
+            return previous
+
+        fingerprint = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': content_hash(path)}
+        known[abs_path] = fingerprint
+        _write_json(self._fingerprints_path, known)
+        return fingerprint
+
+    def get(self, key):
+        """
+        Cached value for key, or None.
+        """
+        entry = self.index.get(key)
+        path = self._entry_path(key)
+        if entry is None or not os.path.exists(path):
+            self.misses += 1
+            return None
+        try:
+            with open(path, 'rb') as f:
+                value = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            self.misses += 1
+            return None
+        entry['last_access'] = time.time()
+        self._dirty = True
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        """
+        Store value under key and evict old entries if over budget.
+        """
+        path = self._entry_path(key)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        self.index[key] = {'size': os.path.getsize(path), 'last_access': time.time()}
+        self.evict()
+        self._save_index()
+        return value
+
+    def _save_index(self):
+        _write_json(self._index_path, self.index)
+        self._dirty = False
+
+    def close(self):
+        """
+        Write the access times of entries read since the last put().
+        """
+        if self._dirty:
+            self._save_index()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def get_or_compute(self, key, compute):
+        """
+        Return the cached value for key, computing and storing it on a miss.
+        """
+        value = self.get(key)
+        if value is None:
+            value = self.put(key, compute())
+        return value
+
+    def size(self):
+        return sum(entry['size'] for entry in self.index.values())
+
+    def evict(self):
+        """
+        Drop least recently used entries until the cache fits max_bytes.
+        """
+        total = self.size()
+        for key in sorted(self.index, key=lambda k: self.index[k]['last_access']):
+            if total <= self.max_bytes:
+                break
+            total -= self.index.pop(key)['size']
+            try:
+                os.remove(self._entry_path(key))
+            except OSError:
+                pass
+
+    def clear(self):
+        for key in list(self.index):
+            try:
+                os.remove(self._entry_path(key))
+            except OSError:
+                pass
+        self.index = {}
+        self._save_index()
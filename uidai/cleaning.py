@@ -0,0 +1,123 @@
+"""
+Cleaning engine for the Aadhaar feeds.
+
+Column roles (date, count, pincode) are resolved once per column layout,
+dates are parsed with the fixed dd-mm-yyyy format once per distinct
+string, and duplicate / missing-value filtering is fused into a single
+boolean mask applied with one row selection.
+"""
+
+import time
+from collections import namedtuple
+from functools import lru_cache
+
+import pandas as pd
+from pandas.api.types import is_datetime64_any_dtype, is_numeric_dtype
+
+from uidai.schema import DATE_FORMAT, FEEDS
+
+ColumnRoles = namedtuple('ColumnRoles', ['date', 'count', 'pincode'])
+
+CleanStats = namedtuple('CleanStats', [
+    'rows_in', 'rows_out', 'duplicates_removed', 'invalid_removed',
+    'missing_before', 'missing_after', 'seconds',
+])
+
+
+@lru_cache(maxsize=None)
+def resolve_roles(columns):
+    """
+    Work out which columns hold dates, counts and pincodes.
+
+    Known feed layouts use their declared schema; anything else falls back
+    to a keyword scan of the column names. Cached per column tuple, so a
+    stream of chunks with the same header resolves it only once.
+    """
+    present = set(columns)
+    for schema in FEEDS.values():
+        if present.issuperset(schema.columns):
+            return ColumnRoles(('date',), schema.count_columns, ('pincode',))
+
+    date_cols = tuple(col for col in columns
+                      if any(keyword in col.lower() for keyword in ['date', 'month', 'year']))
+    pincode_cols = tuple(col for col in columns if 'pincode' in col.lower())
+    count_cols = tuple(col for col in columns
+                       if col not in date_cols and col not in pincode_cols
+                       and any(keyword in col.lower() for keyword in ['age_', 'count', 'total', 'number']))
+    return ColumnRoles(date_cols, count_cols, pincode_cols)
+
+
+def parse_dates(values, date_format=DATE_FORMAT):
+    """
+    Parse a column of date strings with an explicit format.
+
+    Each distinct string is parsed once and mapped back to the rows, which
+    is much cheaper than per-element parsing since extracts repeat the same
+    few hundred dates. Unparseable values become NaT.
+    """
+    if is_datetime64_any_dtype(values):
+        return values
+    codes, uniques = pd.factorize(values)
+    parsed = pd.to_datetime(pd.Series(uniques, dtype=object), format=date_format, errors='coerce')
+    return pd.Series(parsed.array.take(codes, allow_fill=True), index=values.index, name=values.name)
+
+
+def clean_frame(df, date_format=DATE_FORMAT):
+    """
+    Clean a feed frame and return (clean_df, CleanStats).
+
+    Rows are dropped when they duplicate an earlier row, are entirely
+    empty, or have a missing/unparseable date. All three conditions are
+    combined into one mask so the frame is copied only once.
+    """
+    start = time.perf_counter()
+    rows_in = len(df)
+    roles = resolve_roles(tuple(df.columns))
+    missing_before = int(df.isna().to_numpy().sum())
+
+    parsed = {col: parse_dates(df[col], date_format) for col in roles.date}
+
+    duplicated = df.duplicated().to_numpy()
+    keep = ~duplicated & df.notna().to_numpy().any(axis=1)
+    for values in parsed.values():
+        keep &= values.notna().to_numpy()
+
+    clean = df[keep]
+    for col, values in parsed.items():
+        if not is_datetime64_any_dtype(df[col]):
+            clean[col] = values[keep]
+    for col in roles.count:
+        if not is_numeric_dtype(clean[col]):
+            clean[col] = pd.to_numeric(clean[col], errors='coerce')
+
+    duplicates_removed = int(duplicated.sum())
+    stats = CleanStats(
+        rows_in=rows_in,
+        rows_out=len(clean),
+        duplicates_removed=duplicates_removed,
+        invalid_removed=rows_in - len(clean) - duplicates_removed,
+        missing_before=missing_before,
+        missing_after=int(clean.isna().to_numpy().sum()),
+        seconds=time.perf_counter() - start,
+    )
+    return clean, stats
+
+
+def clean_dataset(df, dataset_name):
+    """
+    Clean dataset by removing duplicates, handling missing values,
+    and standardizing date formats. Prints a short report including
+    throughput in rows per second.
+    """
+    print(f"\nCleaning {dataset_name}...")
+
+    clean, stats = clean_frame(df)
+    rows_per_second = stats.rows_in / stats.seconds if stats.seconds > 0 else float('inf')
+
+    print(f"  ✓ Duplicates removed: {stats.duplicates_removed}")
+    print(f"  ✓ Invalid rows removed: {stats.invalid_removed}")
+    print(f"  ✓ Missing values before: {stats.missing_before}, after: {stats.missing_after}")
+    print(f"  ✓ Final rows: {stats.rows_out}")
+    print(f"  ✓ Throughput: {rows_per_second:,.0f} rows/s")
+
+    return clean
@@ -0,0 +1,244 @@
+"""
+Age-cohort analytics on a dense month x pincode x cohort x service tensor.
+
+The feeds bucket ages differently. Each count column is mapped to one
+of the cohorts shared by all feeds (uidai.schema.COHORTS), so the
+tensor can compare, say, the 5-17 enrolments with the 5-17 biometric
+updates. It is filled in one pass over each feed, all cohorts at once.
+Shares, enrolment-to-update transitions and peak months are then NumPy
+reductions over its axes.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from uidai.dedup import Deduplicator
+from uidai.loader import DEFAULT_CHUNKSIZE, iter_feed_chunks, month_code, month_start
+from uidai.schema import COHORTS, FEEDS, get_schema
+
+SERVICES = tuple(FEEDS)
+
+Transition = namedtuple('Transition', ['name', 'source', 'target'])
+
+# Update volume of a cohort against the enrolment base it comes from.
+# Children enrolled before 5 owe mandatory biometric updates at 5 and 15.
+TRANSITIONS = (
+    Transition('Enrolment 0-5 -> Biometric 5-17', ('enrolment', '0-5'), ('biometric', '5-17')),
+    Transition('Enrolment 5-17 -> Biometric 5-17', ('enrolment', '5-17'), ('biometric', '5-17')),
+    Transition('Enrolment 18+ -> Demographic 18+', ('enrolment', '18+'), ('demographic', '18+')),
+)
+
+
+def cohort_partial(chunk, feed):
+    """
+    One chunk's counts summed per (month_code, pincode), one column per
+    count column. Fold partials with DataFrame.add(..., fill_value=0).
+    """
+    schema = get_schema(feed)
+    valid = (chunk['date'].notna() & chunk['pincode'].notna()).to_numpy()
+    frame = pd.DataFrame({
+        'month_code': month_code(chunk['date'])[valid].astype('int64').to_numpy(),
+        'pincode': chunk['pincode'][valid].to_numpy(dtype='int64'),
+    })
+    for col in schema.count_columns:
+        frame[col] = chunk[col][valid].to_numpy(dtype='int64', na_value=0)
+    return frame.groupby(['month_code', 'pincode'], sort=False).sum()
+
+
+def _ratio(numerator, denominator):
+    return np.divide(numerator, denominator, out=np.full(np.shape(numerator), np.nan), where=denominator > 0)
+
+
+class CohortTensor:
+    """
+    Counts as a dense int64 array of shape (months, pincodes, cohorts, services).
+    """
+
+    def __init__(self, values, pincodes, first_month):
+        self.values = values
+        self.pincodes = np.asarray(pincodes)
+        self.first_month = int(first_month)
+        self.months = month_start(np.arange(self.first_month, self.first_month + values.shape[0]))
+
+    # ------------------------------------------------------------------
+    # Construction
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def from_partials(cls, partials):
+        """
+        Build from {feed: DataFrame indexed by (month_code, pincode)} with
+        the feed's count columns, as returned by cohort_partial.
+        """
+        partials = {feed: frame for feed, frame in partials.items() if len(frame)}
+        if not partials:
+            return cls(np.zeros((0, 0, len(COHORTS), len(SERVICES)), dtype='int64'), [], 0)
+
+        pincodes = np.unique(np.concatenate([
+            frame.index.get_level_values('pincode').to_numpy(dtype='int64') for frame in partials.values()
+        ]))
+        codes = np.concatenate([
+            frame.index.get_level_values('month_code').to_numpy(dtype='int64') for frame in partials.values()
+        ])
+        first_month, n_months = codes.min(), codes.max() - codes.min() + 1
+
+        shape = (n_months, len(pincodes), len(COHORTS), len(SERVICES))
+        flat = np.zeros(int(np.prod(shape)), dtype='int64')
+        for feed, frame in partials.items():
+            schema = get_schema(feed)
+            m = frame.index.get_level_values('month_code').to_numpy(dtype='int64') - first_month
+            p = np.searchsorted(pincodes, frame.index.get_level_values('pincode').to_numpy(dtype='int64'))
+            s = np.full_like(m, SERVICES.index(schema.name))
+            for col, cohort in zip(schema.count_columns, schema.cohorts):
+                c = np.full_like(m, COHORTS.index(cohort))
+                flat += np.bincount(np.ravel_multi_index((m, p, c, s), shape),
+                                    weights=frame[col].to_numpy(dtype='int64'), minlength=flat.size).astype('int64')
+        return cls(flat.reshape(shape), pincodes, first_month)
+
+    @classmethod
+    def from_clean(cls, clean_frames):
+        """
+        Build from {feed: cleaned DataFrame}.
+        """
+        return cls.from_partials({feed: cohort_partial(df, feed) for feed, df in clean_frames.items()})
+
+    @classmethod
+    def from_files(cls, feed_files, chunksize=DEFAULT_CHUNKSIZE):
+        """
+        Build from {feed: csv_path} in one streaming pass per feed. Rows
+        without a date and exact duplicate rows are dropped, as in cleaning.
+        """
+        partials = {}
+        for feed, path in feed_files.items():
+            schema = get_schema(feed)
+            total = None
+            with Deduplicator(key=None) as seen:
+                for chunk in iter_feed_chunks(path, schema, chunksize):
+                    chunk = seen.filter(chunk[chunk['date'].notna()])
+                    partial = cohort_partial(chunk, schema)
+                    total = partial if total is None else total.add(partial, fill_value=0)
+            if total is not None:
+                partials[feed] = total
+        return cls.from_partials(partials)
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def _present(self):
+        """
+        Positions of the services with any counts.
+        """
+        return [i for i in range(len(SERVICES)) if self.values[..., i].any()]
+
+    def totals(self, service):
+        """
+        Monthly counts of one service per cohort (Month plus one column per cohort).
+        """
+        network = self.values[..., SERVICES.index(get_schema(service).name)].sum(axis=1)
+        frame = pd.DataFrame(network, columns=list(COHORTS))
+        frame.insert(0, 'Month', self.months)
+        return frame
+
+    def shares(self):
+        """
+        Each cohort's share of every service's monthly volume, one row per
+        (service, month). Months without volume have NaN shares.
+        """
+        present = self._present()
+        # (months, cohorts, services) -> (services, months, cohorts)
+        network = self.values.sum(axis=1)[..., present].transpose(2, 0, 1)
+        shares = _ratio(network, network.sum(axis=2, keepdims=True))
+        frame = pd.DataFrame(shares.reshape(-1, len(COHORTS)), columns=list(COHORTS))
+        frame.insert(0, 'Month', np.tile(self.months.to_numpy(), len(present)))
+        frame.insert(0, 'Service', np.repeat([FEEDS[SERVICES[i]].label for i in present], len(self.months)))
+        return frame
+
+    def pincode_shares(self, service):
+        """
+        Each cohort's share of one service's volume per pincode over all months.
+        """
+        totals = self.values[..., SERVICES.index(get_schema(service).name)].sum(axis=0)
+        frame = pd.DataFrame(_ratio(totals, totals.sum(axis=1, keepdims=True)), columns=list(COHORTS))
+        frame.insert(0, 'pincode', self.pincodes)
+        return frame
+
+    def _transition_counts(self, counts, transitions):
+        """
+        counts[..., cohort, service] -> (source, target) arrays of shape
+        (..., transitions).
+        """
+        def positions(ends):
+            cohorts = [COHORTS.index(cohort) for _, cohort in ends]
+            services = [SERVICES.index(get_schema(service).name) for service, _ in ends]
+            return (Ellipsis, np.array(cohorts, dtype='int64'), np.array(services, dtype='int64'))
+        return (counts[positions([t.source for t in transitions])],
+                counts[positions([t.target for t in transitions])])
+
+    def transitions(self, transitions=TRANSITIONS):
+        """
+        Monthly update volume of each target cohort against its source
+        (enrolment) cohort: Ratio per month and Cumulative_Ratio of the
+        running totals, one row per (transition, month).
+        """
+        source, target = self._transition_counts(self.values.sum(axis=1), transitions)
+        cumulative = _ratio(target.cumsum(axis=0), source.cumsum(axis=0))
+        # (months, transitions) -> one row per transition and month
+        return pd.DataFrame({
+            'Transition': np.repeat([t.name for t in transitions], len(self.months)),
+            'Month': np.tile(self.months.to_numpy(), len(transitions)),
+            'Source': source.T.ravel(),
+            'Target': target.T.ravel(),
+            'Ratio': _ratio(target, source).T.ravel(),
+            'Cumulative_Ratio': cumulative.T.ravel(),
+        })
+
+    def pincode_transitions(self, transitions=TRANSITIONS):
+        """
+        Target/source ratio of every transition per pincode over all months.
+        """
+        source, target = self._transition_counts(self.values.sum(axis=0), transitions)
+        frame = pd.DataFrame(_ratio(target, source), columns=[t.name for t in transitions])
+        frame.insert(0, 'pincode', self.pincodes)
+        return frame
+
+    def peaks(self):
+        """
+        Busiest month of every (service, cohort) across all pincodes, with
+        its volume and share of the cohort's total.
+        """
+        network = self.values.sum(axis=1)
+        if not len(network):
+            return pd.DataFrame(columns=['Service', 'Cohort', 'Peak_Month', 'Peak_Load', 'Peak_Share'])
+        peak = network.argmax(axis=0)
+        peak_load = np.take_along_axis(network, peak[None], axis=0)[0]
+        share = _ratio(peak_load, network.sum(axis=0))
+        services, cohorts = np.nonzero((network.sum(axis=0) > 0).T)
+        return pd.DataFrame({
+            'Service': [FEEDS[SERVICES[s]].label for s in services],
+            'Cohort': [COHORTS[c] for c in cohorts],
+            'Peak_Month': self.months.to_numpy()[peak[cohorts, services]],
+            'Peak_Load': peak_load[cohorts, services],
+            'Peak_Share': share[cohorts, services],
+        })
+
+    def pincode_peaks(self):
+        """
+        Busiest month of every (pincode, service, cohort) with any volume.
+        """
+        if not len(self.values):
+            return pd.DataFrame(columns=['pincode', 'Service', 'Cohort', 'Peak_Month', 'Peak_Load', 'Peak_Share'])
+        peak = self.values.argmax(axis=0)
+        peak_load = np.take_along_axis(self.values, peak[None], axis=0)[0]
+        totals = self.values.sum(axis=0)
+        pincodes, cohorts, services = np.nonzero(totals > 0)
+        return pd.DataFrame({
+            'pincode': self.pincodes[pincodes],
+            'Service': np.array([FEEDS[feed].label for feed in SERVICES])[services],
+            'Cohort': np.array(COHORTS)[cohorts],
+            'Peak_Month': self.months.to_numpy()[peak[pincodes, cohorts, services]],
+            'Peak_Load': peak_load[pincodes, cohorts, services],
+            'Peak_Share': peak_load[pincodes, cohorts, services] / totals[pincodes, cohorts, services],
+        })
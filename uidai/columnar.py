@@ -0,0 +1,215 @@
+"""
+Columnar (Parquet / Arrow IPC) intermediate format for the Aadhaar feeds.
+
+The CSV extracts are converted once into a hive-partitioned dataset:
+
+    <dataset>/<feed>/state=<state>/district=<district>/month=<YYYY-MM>/*.parquet
+
+with the typed schema from uidai.schema (one sub-dataset per feed, since
+the feeds have different count columns). Later stages read it through
+memory-mapped files with partition and column pruning, so computing one
+district's biometric monthly totals touches only that district's files
+and only its two bio_age columns. Readers tell the format of each feed
+from its files' extension, so a dataset written as Arrow IPC needs no
+extra option to be read back.
+
+Requires pyarrow (optional dependency).
+"""
+
+import argparse
+import os
+import shutil
+import sys
+
+import pandas as pd
+
+from uidai.dedup import Deduplicator
+from uidai.loader import iter_feed_chunks, month_start
+from uidai.schema import FEEDS, get_schema
+
+FORMATS = ('parquet', 'ipc')
+CONVERT_CHUNKSIZE = 1_000_000
+PARTITION_COLUMNS = ('state', 'district', 'month')
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.dataset
+    except ImportError:
+        raise ImportError("The columnar format needs pyarrow: pip install pyarrow")
+    return pyarrow
+
+
+def convert_feed(path, feed, dataset_dir, fmt='parquet', chunksize=CONVERT_CHUNKSIZE):
+    """
+    Write one feed CSV as the feed's partitioned dataset, replacing any
+    earlier conversion of that feed. Returns rows written.
+
+    Rows with an unparseable date and exact duplicate rows are dropped, so
+    the dataset holds the cleaned rows and can be aggregated column by
+    column without another cleaning pass.
+    """
+    pa = _require_pyarrow()
+    import pyarrow.dataset as pds
+
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported format '{fmt}'. Expected one of: {', '.join(FORMATS)}")
+
+    schema = get_schema(feed)
+    feed_dir = os.path.join(dataset_dir, schema.name)
+    # Files of an earlier conversion would otherwise be read alongside the
+    # new ones and count every row twice
+    shutil.rmtree(feed_dir, ignore_errors=True)
+    written = 0
+    with Deduplicator(key=None) as seen:
+        for number, chunk in enumerate(iter_feed_chunks(path, schema, chunksize)):
+            chunk = seen.filter(chunk[chunk['date'].notna()])
+            if chunk.empty:
+                continue
+            chunk = chunk.assign(
+                state=chunk['state'].astype(str),
+                district=chunk['district'].astype(str),
+                month=chunk['date'].dt.strftime('%Y-%m'),
+            )
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            pds.write_dataset(
+                table, feed_dir,
+                format='ipc' if fmt == 'ipc' else 'parquet',
+                partitioning=list(PARTITION_COLUMNS), partitioning_flavor='hive',
+                basename_template=f'{schema.name}-{number}-{{i}}.{fmt}',
+                existing_data_behavior='overwrite_or_ignore',
+            )
+            written += len(chunk)
+    return written
+
+
+def convert_feeds(feed_files, dataset_dir, fmt='parquet', chunksize=CONVERT_CHUNKSIZE):
+    """
+    Convert {feed: csv_path} into the dataset. Returns {feed: rows written}.
+    """
+    return {feed: convert_feed(path, feed, dataset_dir, fmt, chunksize)
+            for feed, path in feed_files.items()}
+
+
+def dataset_format(dataset_dir, feed):
+    """
+    Format ('parquet' or 'ipc') one feed was converted to, from the
+    extension of its files; 'parquet' when it has none.
+    """
+    for _, _, files in os.walk(os.path.join(dataset_dir, get_schema(feed).name)):
+        for name in files:
+            extension = os.path.splitext(name)[1][1:]
+            if extension in FORMATS:
+                return extension
+    return 'parquet'
+
+
+def open_dataset(dataset_dir, feed, fmt=None):
+    """
+    Open one feed's partitioned dataset with memory-mapped file access.
+    fmt defaults to the format the feed was converted to.
+    """
+    _require_pyarrow()
+    import pyarrow.dataset as pds
+    import pyarrow.fs
+
+    if fmt is None:
+        fmt = dataset_format(dataset_dir, feed)
+    return pds.dataset(os.path.join(dataset_dir, get_schema(feed).name),
+                       format='ipc' if fmt == 'ipc' else 'parquet', partitioning='hive',
+                       filesystem=pyarrow.fs.LocalFileSystem(use_mmap=True))
+
+
+def _partition_filter(state=None, district=None, months=None):
+    import pyarrow.dataset as pds
+
+    expression = pds.scalar(True)
+    if state is not None:
+        expression &= pds.field('state') == state
+    if district is not None:
+        expression &= pds.field('district') == district
+    if months is not None:
+        expression &= pds.field('month').isin(list(months))
+    return expression
+
+
+def read_slice(dataset_dir, feed, state=None, district=None, months=None, columns=None, fmt=None):
+    """
+    Read the rows of one feed, optionally for one state/district and a set
+    of 'YYYY-MM' months, returning only the requested columns.
+
+    Filters on partition keys prune whole directories, so files outside
+    the slice are never opened.
+    """
+    schema = get_schema(feed)
+    dataset = open_dataset(dataset_dir, schema, fmt)
+    columns = list(columns) if columns is not None else list(schema.columns)
+    table = dataset.to_table(columns=columns, filter=_partition_filter(state, district, months))
+    frame = table.to_pandas()
+    for col in ('state', 'district'):
+        if col in frame.columns:
+            frame[col] = frame[col].astype('category')
+    return frame
+
+
+def monthly_from_dataset(dataset_dir, feed, state=None, district=None, fmt=None):
+    """
+    Monthly totals of a feed for one slice, shaped like prepare_monthly_data.
+
+    Only the month partition key and the feed's count columns are read.
+    """
+    schema = get_schema(feed)
+    frame = read_slice(dataset_dir, schema, state, district,
+                       columns=['month', *schema.count_columns], fmt=fmt)
+    if frame.empty:
+        return pd.DataFrame(columns=['Month', schema.label])
+
+    totals = frame[list(schema.count_columns)].to_numpy(dtype='int64', na_value=0).sum(axis=1)
+    months = frame['month'].astype(str)
+    monthly = pd.Series(totals).groupby(months.to_numpy()).sum()
+    codes = [int(month[:4]) * 12 + int(month[5:7]) - 1 for month in monthly.index]
+    result = pd.DataFrame({'Month': month_start(codes), schema.label: monthly.to_numpy()})
+    return result.sort_values('Month').reset_index(drop=True)
+
+
+def list_districts(dataset_dir, fmt=None):
+    """
+    Distinct (state, district) pairs present in any feed of the dataset,
+    read from the partition directories only.
+    """
+    _require_pyarrow()
+    import pyarrow.dataset as pds
+
+    pairs = set()
+    for feed in FEEDS:
+        if not os.path.isdir(os.path.join(dataset_dir, feed)):
+            continue
+        for fragment in open_dataset(dataset_dir, feed, fmt).get_fragments():
+            keys = pds.get_partition_keys(fragment.partition_expression)
+            pairs.add((keys['state'], keys['district']))
+    return sorted(pairs)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Convert the Aadhaar CSV feeds into a partitioned columnar dataset.')
+    parser.add_argument('--enrolment', help='Enrolment CSV path')
+    parser.add_argument('--biometric', help='Biometric update CSV path')
+    parser.add_argument('--demographic', help='Demographic update CSV path')
+    parser.add_argument('--out', required=True, help='Dataset directory')
+    parser.add_argument('--format', dest='fmt', default='parquet', choices=FORMATS,
+                        help='parquet (compressed) or ipc (Arrow IPC, zero-copy reads)')
+    parser.add_argument('--chunksize', type=int, default=CONVERT_CHUNKSIZE, help='Rows per CSV chunk')
+    args = parser.parse_args(argv)
+
+    feed_files = {feed: getattr(args, feed) for feed in FEEDS if getattr(args, feed)}
+    if not feed_files:
+        parser.error('give at least one of --enrolment, --biometric, --demographic')
+
+    for feed, rows in convert_feeds(feed_files, args.out, args.fmt, args.chunksize).items():
+        print(f"✓ {FEEDS[feed].title}: {rows:,} rows written to '{args.out}'")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,307 @@
+"""
+Streaming, memory-bounded de-duplication of feed rows.
+
+Overlapping extracts repeat the same daily rows. A Deduplicator drops
+every row whose key was already seen, earlier in the stream or in an
+earlier file, and counts the duplicates per source file. Only the keys
+are kept, not the rows.
+
+The default key, (date, pincode) within a feed, is packed exactly into
+one uint64: the day number goes in the high 32 bits and the pincode in
+the low 32. Any other key, or key=None for whole rows, is reduced to a
+128-bit digest of its columns (uidai.loader.row_digests: two
+independently keyed 64-bit hashes). Matches are not re-checked against
+the rows, which are not kept: over a billion distinct keys the chance
+that any two share a digest is below 1e-20, where a single 64-bit hash
+would collide with a chance of about 3%.
+
+The key set (KeySet) lives in memory as a few sorted arrays of
+geometrically growing size, so inserts stay cheap. Past the memory
+budget it is written out as a sorted run and memory-mapped; lookups
+binary-search every run. When there are too many runs they are merged
+into one in bounded slices (an external merge), so neither memory nor
+lookup cost grows without limit.
+
+Usage:
+    python -m uidai.dedup --feed biometric --out biometric_merged.csv \\
+        dump_2025_06.csv dump_2025_07.csv
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from uidai.loader import DEFAULT_CHUNKSIZE, DIGEST_DTYPE, iter_feed_chunks, row_digests
+from uidai.schema import DATE_FORMAT, FEEDS, get_schema
+from uidai.timeseries import day_code
+
+DEFAULT_KEY = ('date', 'pincode')
+DEFAULT_MEMORY_BUDGET = 512 * 1024**2
+# Sorted runs on disk before they are merged into one
+MAX_RUNS = 8
+# Keys taken from each run per slice of an external merge
+MERGE_BLOCK = 1 << 20
+# Packed in place of a missing pincode
+MISSING_PINCODE = 0xFFFFFFFF
+_LOW_32 = np.uint64(0xFFFFFFFF)
+
+
+def parse_size(value):
+    """
+    '512MB', '2GB', '1048576' -> bytes.
+    """
+    text = str(value).strip().upper()
+    for suffix, factor in (('GB', 1024**3), ('MB', 1024**2), ('KB', 1024), ('B', 1)):
+        if text.endswith(suffix):
+            return int(float(text[:-len(suffix)]) * factor)
+    return int(float(text))
+
+
+def key_dtype(key=DEFAULT_KEY):
+    """
+    dtype of key_codes(chunk, key): uint64 for (date, pincode), else DIGEST_DTYPE.
+    """
+    if key is not None and tuple(key) == DEFAULT_KEY:
+        return np.dtype('uint64')
+    return DIGEST_DTYPE
+
+
+def key_codes(chunk, key=DEFAULT_KEY):
+    """
+    One code per row identifying its key.
+
+    (date, pincode) is packed exactly into a uint64; rows must have a
+    date. Any other key (None: all columns) is a 128-bit row digest.
+    """
+    if key is not None and tuple(key) == DEFAULT_KEY:
+        days = day_code(chunk['date']).astype('uint64') & _LOW_32
+        pincodes = chunk['pincode'].to_numpy(dtype='int64', na_value=MISSING_PINCODE).astype('uint64') & _LOW_32
+        return (days << np.uint64(32)) | pincodes
+    columns = chunk if key is None else chunk[list(key)]
+    return row_digests(columns)
+
+
+def _merged(*arrays):
+    """
+    Disjoint sorted arrays -> one sorted array.
+    """
+    merged = np.concatenate(arrays)
+    # Timsort finds the pre-sorted runs, so this is close to a linear merge
+    merged.sort(kind='stable')
+    return merged
+
+
+class KeySet:
+    """
+    Set of keys of one dtype (uint64 or DIGEST_DTYPE) bounded to
+    memory_budget bytes in memory; the rest is kept in sorted,
+    memory-mapped run files under spill_dir.
+    """
+
+    def __init__(self, memory_budget=DEFAULT_MEMORY_BUDGET, spill_dir=None, dtype='uint64'):
+        self.memory_budget = memory_budget
+        self.spill_dir = spill_dir
+        self.dtype = np.dtype(dtype)
+        self.levels = []
+        self.runs = []
+        self.spills = 0
+        self._tmp = None
+        self._files = 0
+
+    def __len__(self):
+        return sum(len(array) for array in self.levels) + sum(len(run) for run in self.runs)
+
+    @property
+    def nbytes(self):
+        """
+        Bytes of keys held in memory (runs on disk not included).
+        """
+        return sum(array.nbytes for array in self.levels)
+
+    def contains(self, keys):
+        """
+        Boolean mask: which of keys (sorted for cache-friendly lookups) are
+        in the set.
+        """
+        found = np.zeros(len(keys), dtype=bool)
+        for array in (*self.levels, *self.runs):
+            position = np.minimum(np.searchsorted(array, keys), len(array) - 1)
+            found |= array[position] == keys
+        return found
+
+    def add(self, keys):
+        """
+        Add keys. Returns a mask over keys that is True for the first
+        occurrence of every key not already in the set.
+        """
+        keys = np.asarray(keys, dtype=self.dtype)
+        unique, first = np.unique(keys, return_index=True)
+        fresh = ~self.contains(unique)
+        mask = np.zeros(len(keys), dtype=bool)
+        mask[first[fresh]] = True
+        if fresh.any():
+            self._insert(unique[fresh])
+        return mask
+
+    def _insert(self, new):
+        # Each level is at least twice the next one, so there are only
+        # log2(n) levels and every key is re-merged log2(n) times
+        self.levels.append(new)
+        while len(self.levels) > 1 and len(self.levels[-2]) <= 2 * len(self.levels[-1]):
+            newest = self.levels.pop()
+            self.levels.append(_merged(self.levels.pop(), newest))
+        if self.nbytes > self.memory_budget:
+            self._spill()
+
+    def _new_path(self):
+        if self._tmp is None:
+            self._tmp = tempfile.TemporaryDirectory(prefix='uidai-keys-', dir=self.spill_dir)
+        self._files += 1
+        return os.path.join(self._tmp.name, f'run-{self._files}.keys')
+
+    def _open_run(self, path):
+        return np.memmap(path, dtype=self.dtype, mode='r')
+
+    def _spill(self):
+        """
+        Write the in-memory keys out as one sorted run.
+        """
+        path = self._new_path()
+        _merged(*self.levels).tofile(path)
+        self.levels = []
+        self.runs.append(self._open_run(path))
+        self.spills += 1
+        if len(self.runs) > MAX_RUNS:
+            self._merge_runs()
+
+    def _merge_runs(self):
+        """
+        External merge of all runs into one, in slices bounded by
+        MERGE_BLOCK keys per run.
+        """
+        # Every MERGE_BLOCK-th key of each run as splitters: between two
+        # consecutive splitters no run has more than MERGE_BLOCK keys
+        splitters = np.unique(np.concatenate([np.asarray(run[::MERGE_BLOCK]) for run in self.runs]))
+        path = self._new_path()
+        starts = [0] * len(self.runs)
+        with open(path, 'wb') as f:
+            for bound in [*splitters[1:], None]:
+                ends = [len(run) if bound is None else int(np.searchsorted(run, bound)) for run in self.runs]
+                _merged(*(np.asarray(run[start:end]) for run, start, end in zip(self.runs, starts, ends))).tofile(f)
+                starts = ends
+        old_paths = [run.filename for run in self.runs]
+        self.runs = [self._open_run(path)]
+        for old_path in old_paths:
+            os.remove(old_path)
+
+    def close(self):
+        self.levels = []
+        self.runs = []
+        if self._tmp is not None:
+            self._tmp.cleanup()
+            self._tmp = None
+
+
+class Deduplicator:
+    """
+    Drops rows whose key was already seen and counts, per source, the
+    rows read and the duplicates dropped. The first occurrence is kept,
+    so list the most authoritative extract first.
+    """
+
+    def __init__(self, key=DEFAULT_KEY, memory_budget=DEFAULT_MEMORY_BUDGET, spill_dir=None):
+        self.key = tuple(key) if key is not None else None
+        self.keys = KeySet(memory_budget, spill_dir, key_dtype(self.key))
+        self.counts = {}
+
+    def filter(self, chunk, source=None):
+        """
+        The rows of chunk whose key is new.
+        """
+        fresh = self.keys.add(key_codes(chunk, self.key))
+        counts = self.counts.setdefault(source, [0, 0])
+        counts[0] += len(chunk)
+        counts[1] += len(chunk) - int(fresh.sum())
+        return chunk[fresh]
+
+    @property
+    def duplicates(self):
+        return sum(dropped for _, dropped in self.counts.values())
+
+    def report(self):
+        """
+        Rows read, duplicates dropped and rows kept per source as a DataFrame.
+        """
+        rows = [{'Source': source, 'Rows': read, 'Duplicates': dropped, 'Kept': read - dropped}
+                for source, (read, dropped) in self.counts.items()]
+        return pd.DataFrame(rows, columns=['Source', 'Rows', 'Duplicates', 'Kept'])
+
+    def close(self):
+        self.keys.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def iter_unique_chunks(paths, feed, dedup, chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Yield the typed chunks of several extracts of one feed, in order,
+    without duplicate keys. Rows without a valid date are dropped first,
+    as cleaning would drop them anyway.
+    """
+    schema = get_schema(feed)
+    for path in paths:
+        for chunk in iter_feed_chunks(path, schema, chunksize):
+            chunk = dedup.filter(chunk[chunk['date'].notna()], path)
+            if len(chunk):
+                yield chunk
+
+
+def merge_extracts(paths, feed, out_path, key=DEFAULT_KEY, memory_budget=DEFAULT_MEMORY_BUDGET,
+                   spill_dir=None, chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Write the union of several extracts of one feed to out_path (same CSV
+    layout, duplicates removed). Returns the per-file report.
+    """
+    schema = get_schema(feed)
+    with Deduplicator(key, memory_budget, spill_dir) as dedup:
+        header = True
+        with open(out_path, 'w', newline='', encoding='utf-8') as f:
+            for chunk in iter_unique_chunks(paths, schema, dedup, chunksize):
+                chunk.to_csv(f, index=False, header=header, date_format=DATE_FORMAT)
+                header = False
+            if header:
+                f.write(','.join(schema.columns) + '\n')
+        return dedup.report()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Merge overlapping extracts of one feed without duplicate rows.')
+    parser.add_argument('paths', nargs='+', help='Extract CSVs, most authoritative first')
+    parser.add_argument('--feed', required=True, choices=list(FEEDS), help='Feed of the extracts')
+    parser.add_argument('--out', required=True, help='Merged CSV path')
+    parser.add_argument('--key', nargs='+', default=list(DEFAULT_KEY),
+                        help="Key columns (default: date pincode); 'all' for whole rows")
+    parser.add_argument('--memory-budget', default='512MB', help='Memory for the key set before spilling (default: 512MB)')
+    parser.add_argument('--spill-dir', default=None, help='Directory for spilled key runs (default: system temp)')
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE, help='Rows per CSV chunk')
+    args = parser.parse_args(argv)
+
+    key = None if args.key == ['all'] else args.key
+    report = merge_extracts(args.paths, args.feed, args.out, key, parse_size(args.memory_budget),
+                            args.spill_dir, args.chunksize)
+    print(report.to_string(index=False))
+    print(f"✓ {report['Kept'].sum():,} rows written to '{args.out}' "
+          f"({report['Duplicates'].sum():,} duplicates dropped)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
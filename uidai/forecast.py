@@ -0,0 +1,354 @@
+"""
+Vectorized demand forecasts for peak-load planning.
+
+Every method works on a matrix of series, shape (series, periods), and
+fits all rows at once with NumPy. One call therefore forecasts the
+monthly services of a district, every pincode of the country, or the
+daily series, without looping over series:
+
+- seasonal naive: repeat the last season,
+- Holt's linear exponential smoothing: smoothing constants chosen per
+  series from a small grid by one-step-ahead error,
+- least-squares regression on a trend plus seasonal dummies: one shared
+  design matrix, whose pseudo-inverse fits all series in one matrix
+  product.
+
+forecast() backtests each method on a holdout at the end of every series
+and keeps the best one per series. Forecast periods whose load is
+clearly above the series' recent level (the mean of its last few
+periods) are flagged as expected peaks, with the date by which temporary
+staff should be hired. A steady trend therefore flags only the periods
+that have grown well past today's load, not every forecast period.
+
+Monthly service totals are fitted on complete months only: a month with
+no rows for a service is a gap in the extract and is interpolated, and a
+last month that the data stops partway through is left out and
+forecast instead.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from uidai.aggregate import SERVICE_COLUMNS
+
+METHODS = ('seasonal_naive', 'holt', 'regression')
+HOLT_ALPHAS = (0.2, 0.4, 0.6, 0.8)
+HOLT_BETAS = (0.05, 0.2)
+# A forecast period counts as an expected peak when it is this much above
+# the mean of the last BASELINE_PERIODS observed periods
+PEAK_THRESHOLD = 0.2
+BASELINE_PERIODS = {'MS': 3, 'W-MON': 4, 'D': 7}
+# INSIGHT 2: hire temporary staff 2-3 weeks before anticipated peaks
+STAFFING_LEAD_DAYS = 21
+FREQUENCIES = {'MS': 12, 'W-MON': 52, 'D': 7}
+
+Forecast = namedtuple('Forecast', ['values', 'method', 'errors'])
+
+
+def seasonal_naive(history, horizon, season):
+    """
+    Repeat the last full season of each series. None when the series are
+    shorter than one season.
+    """
+    if not season or history.shape[1] < season:
+        return None
+    repeats = -(-horizon // season)
+    return np.tile(history[:, -season:], repeats)[:, :horizon].astype('float64')
+
+
+def _holt_fit(history, horizon, alphas, betas, split=None):
+    """
+    One pass of Holt's method over all series and grid points.
+
+    Returns the forecast from the end of the history and, with split set,
+    the forecast made from the first split periods (for backtesting),
+    each using the grid point with the lowest one-step-ahead error up to
+    that point.
+    """
+    n, periods = history.shape
+    grid = [(alpha, beta) for alpha in alphas for beta in betas]
+    alpha = np.array([a for a, _ in grid])[:, None]
+    beta = np.array([b for _, b in grid])[:, None]
+    # Time-major copy, so each step reads one contiguous row; the grid is a
+    # leading axis broadcast against it instead of tiled copies of the data
+    values = np.ascontiguousarray(history.T, dtype='float64')
+
+    level = np.broadcast_to(values[0], (len(grid), n)).copy()
+    trend = np.broadcast_to(values[1] - values[0], (len(grid), n)).copy()
+    sse = np.zeros((len(grid), n))
+    predicted = np.empty_like(level)
+    error = np.empty_like(level)
+    new_level = np.empty_like(level)
+    snapshot = None
+    for t in range(1, periods):
+        if t == split:
+            snapshot = (level.copy(), trend.copy(), sse.copy())
+        np.add(level, trend, out=predicted)
+        np.subtract(values[t], predicted, out=error)
+        sse += error * error
+        # level_t = alpha * y_t + (1 - alpha) * (level + trend) = predicted + alpha * error
+        np.multiply(alpha, error, out=new_level)
+        new_level += predicted
+        # trend_t = beta * (level_t - level) + (1 - beta) * trend
+        level -= new_level
+        level *= -beta
+        trend *= 1 - beta
+        trend += level
+        level, new_level = new_level, level
+
+    def extrapolate(level, trend, sse, steps):
+        best = sse.argmin(axis=0)
+        columns = np.arange(n)
+        return level[best, columns][:, None] + trend[best, columns][:, None] * np.arange(1, steps + 1)
+
+    final = extrapolate(level, trend, sse, horizon)
+    backtest = extrapolate(*snapshot, periods - split) if snapshot is not None else None
+    return final, backtest
+
+
+def holt(history, horizon, alphas=HOLT_ALPHAS, betas=HOLT_BETAS):
+    """
+    Holt's linear trend method for every series. All (alpha, beta) pairs
+    of the grid are run side by side; each series keeps the pair with the
+    smallest one-step-ahead squared error.
+    """
+    if history.shape[1] < 2:
+        return None
+    return _holt_fit(history, horizon, alphas, betas)[0]
+
+
+def _design(periods, offset, season):
+    t = np.arange(offset, offset + periods, dtype='float64')
+    columns = [np.ones(periods), t]
+    if season:
+        phase = t.astype('int64') % season
+        columns += [(phase == k).astype('float64') for k in range(1, season)]
+    return np.column_stack(columns)
+
+
+def regression(history, horizon, season=None):
+    """
+    Least-squares fit of a linear trend plus seasonal dummies. Seasonal
+    terms are used only with at least two full seasons of history.
+    """
+    periods = history.shape[1]
+    if periods < 2:
+        return None
+    if season and periods < 2 * season:
+        season = None
+    # The pseudo-inverse of the small shared design matrix turns the fit of
+    # every series into one matrix product
+    coefficients = np.linalg.pinv(_design(periods, 0, season)) @ history.T.astype('float64')
+    return (_design(horizon, periods, season) @ coefficients).T
+
+
+def _predict(method, history, horizon, season):
+    if method == 'seasonal_naive':
+        return seasonal_naive(history, horizon, season)
+    if method == 'holt':
+        return holt(history, horizon)
+    if method == 'regression':
+        return regression(history, horizon, season)
+    raise ValueError(f"Unknown forecast method '{method}'. Expected one of: {', '.join(METHODS)}")
+
+
+def forecast(history, horizon, season=None, methods=METHODS, holdout=None):
+    """
+    Forecast horizon periods for every row of history (series x periods).
+
+    Each method is backtested on the last holdout periods (default: the
+    horizon, at most a quarter of the history) and every series uses the
+    method with the lowest mean absolute error there. Returns a Forecast
+    of (values, method, errors): the non-negative forecasts, the chosen
+    method name per series and the backtest MAE per method.
+    """
+    history = np.asarray(history, dtype='float64')
+    if history.ndim == 1:
+        history = history[None, :]
+    n, periods = history.shape
+    holdout = holdout or max(1, min(horizon, periods // 4))
+    train, test = history[:, :-holdout], history[:, -holdout:]
+
+    errors = {}
+    predictions = {}
+    for method in methods:
+        if method == 'holt' and train.shape[1] >= 2:
+            # One smoothing pass yields both the backtest and the forecast
+            predictions[method], backtest = _holt_fit(history, horizon, HOLT_ALPHAS, HOLT_BETAS,
+                                                      split=train.shape[1])
+        else:
+            backtest = _predict(method, train, holdout, season) if train.shape[1] else None
+        errors[method] = (np.abs(backtest - test).mean(axis=1) if backtest is not None
+                          else np.full(n, np.inf))
+    usable = [method for method in methods if np.isfinite(errors[method]).any()]
+    if not usable:
+        # Too short to backtest anything: carry the last value forward
+        return Forecast(np.repeat(history[:, -1:], horizon, axis=1), np.full(n, 'last_value'), errors)
+
+    stacked = np.stack([errors[method] for method in usable])
+    choice = stacked.argmin(axis=0)
+    predictions = np.stack([predictions[method] if method in predictions
+                            else _predict(method, history, horizon, season) for method in usable])
+    values = np.clip(predictions[choice, np.arange(n)], 0, None)
+    return Forecast(values, np.asarray(usable)[choice], errors)
+
+
+def flag_peaks(history, predicted, threshold=PEAK_THRESHOLD, recent=BASELINE_PERIODS['MS']):
+    """
+    Boolean mask over predicted: periods more than threshold above the
+    mean of each series' last recent periods.
+    """
+    baseline = np.asarray(history, dtype='float64')[:, -recent:].mean(axis=1, keepdims=True)
+    return predicted > baseline * (1 + threshold)
+
+
+def interpolate_gaps(history):
+    """
+    Fill the zero periods of every series (gaps in the extract) by linear
+    interpolation between the nearest non-zero periods. Leading and
+    trailing gaps take the nearest non-zero value; all-zero series stay 0.
+    """
+    history = np.asarray(history, dtype='float64')
+    if history.ndim == 1:
+        history = history[None, :]
+    periods = history.shape[1]
+    position = np.arange(periods)
+    valid = history != 0
+    before = np.maximum.accumulate(np.where(valid, position, -1), axis=1)
+    after = np.minimum.accumulate(np.where(valid, position, periods)[:, ::-1], axis=1)[:, ::-1]
+    low = np.take_along_axis(history, np.clip(before, 0, None), axis=1)
+    high = np.take_along_axis(history, np.clip(after, None, periods - 1), axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        filled = low + (high - low) * (position - before) / (after - before)
+    filled = np.where(before < 0, high, np.where(after == periods, low, filled))
+    return np.where(valid | ((before < 0) & (after == periods)), history, filled)
+
+
+def series_matrix(frame, time_col, value_cols, keys=(), freq='MS'):
+    """
+    Pivot a long frame into a dense (key x value column) x period matrix.
+
+    Returns (matrix, index, periods). index is a DataFrame with the key
+    columns and a 'Service' column, one row per matrix row. periods is the
+    complete date range at freq; periods without rows are 0.
+    """
+    keys = list(keys)
+    value_cols = list(value_cols)
+    periods = pd.date_range(frame[time_col].min(), frame[time_col].max(), freq=freq)
+    position = periods.get_indexer(frame[time_col])
+    if keys:
+        group = frame.groupby(keys, sort=True, observed=True).ngroup().to_numpy()
+        key_frame = frame[keys].drop_duplicates().sort_values(keys).reset_index(drop=True)
+    else:
+        group = np.zeros(len(frame), dtype='int64')
+        key_frame = pd.DataFrame(index=[0])
+
+    matrix = np.zeros((len(key_frame), len(value_cols), len(periods)))
+    for i, col in enumerate(value_cols):
+        np.add.at(matrix[:, i], (group, position), frame[col].to_numpy(dtype='float64'))
+    index = key_frame.loc[key_frame.index.repeat(len(value_cols))].reset_index(drop=True)
+    index['Service'] = value_cols * len(key_frame)
+    return matrix.reshape(-1, len(periods)), index, periods
+
+
+def forecast_frame(frame, time_col, value_cols, keys=(), horizon=3, freq='MS', season=None,
+                   threshold=PEAK_THRESHOLD, lead_days=STAFFING_LEAD_DAYS, fill_gaps=False):
+    """
+    Forecast every (key, value column) series of a long frame at once.
+    With fill_gaps, zero periods are gaps (interpolate_gaps) rather than
+    observations, for fitting and for the peak threshold.
+
+    Returns a long DataFrame: the key columns, Service, the forecast
+    period (named time_col), Forecast, Method, Expected_Peak and Hire_By
+    (period start minus lead_days, for expected peaks only).
+    """
+    if frame.empty:
+        return pd.DataFrame(columns=[*keys, 'Service', time_col, 'Forecast', 'Method',
+                                     'Expected_Peak', 'Hire_By'])
+    season = season if season is not None else FREQUENCIES.get(freq)
+    history, index, periods = series_matrix(frame, time_col, value_cols, keys, freq)
+    if fill_gaps:
+        history = interpolate_gaps(history)
+    result = forecast(history, horizon, season)
+    peaks = flag_peaks(history, result.values, threshold, BASELINE_PERIODS.get(freq, 3))
+
+    future = pd.date_range(periods[-1], periods=horizon + 1, freq=freq)[1:]
+    out = index.loc[index.index.repeat(horizon)].reset_index(drop=True)
+    out[time_col] = np.tile(future.to_numpy(), len(index))
+    out['Forecast'] = result.values.round().astype('int64').ravel()
+    out['Method'] = np.repeat(result.method, horizon)
+    out['Expected_Peak'] = peaks.ravel()
+    out['Hire_By'] = out[time_col].where(out['Expected_Peak']) - pd.Timedelta(days=lead_days)
+    return out
+
+
+def complete_months(merged_data, last_date=None):
+    """
+    merged_data without its last month when the data ends partway through
+    it: last_date (the latest date observed) is not a month end.
+    """
+    if last_date is None or merged_data.empty:
+        return merged_data
+    last_date = pd.Timestamp(last_date).normalize()
+    if last_date == last_date + pd.offsets.MonthEnd(0):
+        return merged_data
+    return merged_data[merged_data['Month'] < last_date.to_period('M').to_timestamp()]
+
+
+def forecast_monthly(merged_data, horizon=3, threshold=PEAK_THRESHOLD, last_date=None):
+    """
+    Forecast each service of the combined monthly table. Total_Load is the
+    sum of the service forecasts, so the rows add up, and is flagged
+    against the recent total load.
+
+    Months without a service's rows are interpolated for that service.
+    With last_date (the latest date in the data) inside the last month,
+    that partial month is not fitted; it is the first month forecast.
+    """
+    merged_data = complete_months(merged_data, last_date)
+    columns = [col for col in SERVICE_COLUMNS if col in merged_data.columns]
+    services = forecast_frame(merged_data, 'Month', columns, horizon=horizon, freq='MS', threshold=threshold,
+                              fill_gaps=True)
+    if services.empty or 'Total_Load' not in merged_data.columns:
+        return services
+
+    total = services.groupby('Month', sort=True)['Forecast'].sum().reset_index()
+    # The services' gap-filled histories, so the total is not pulled down by gaps either
+    history = interpolate_gaps(series_matrix(merged_data, 'Month', columns, freq='MS')[0])
+    history = history.sum(axis=0, keepdims=True)
+    total.insert(0, 'Service', 'Total_Load')
+    total['Method'] = 'sum'
+    total['Expected_Peak'] = flag_peaks(history, total['Forecast'].to_numpy()[None, :], threshold)[0]
+    total['Hire_By'] = total['Month'].where(total['Expected_Peak']) - pd.Timedelta(days=STAFFING_LEAD_DAYS)
+    return pd.concat([services, total], ignore_index=True)
+
+
+def forecast_daily(store, horizon=28, threshold=PEAK_THRESHOLD):
+    """
+    Forecast the daily series of a TimeSeriesStore with a weekly season.
+    """
+    daily = store.daily()
+    columns = [col for col in daily.columns if col != 'Date']
+    return forecast_frame(daily, 'Date', columns, horizon=horizon, freq='D', threshold=threshold)
+
+
+def forecast_cube(cube, horizon=3, service=None, threshold=PEAK_THRESHOLD):
+    """
+    Forecast the monthly load of every pincode of a PincodeCube at once
+    (all services combined, or one service).
+    """
+    if not len(cube.pincodes) or not len(cube.months):
+        return pd.DataFrame(columns=['pincode', 'Month', 'Forecast', 'Method', 'Expected_Peak'])
+    history = cube._select(service)
+    result = forecast(history, horizon, season=12)
+    peaks = flag_peaks(history, result.values, threshold, BASELINE_PERIODS['MS'])
+    future = pd.date_range(cube.months.iloc[-1], periods=horizon + 1, freq='MS')[1:]
+    return pd.DataFrame({
+        'pincode': np.repeat(cube.pincodes, horizon),
+        'Month': np.tile(future.to_numpy(), len(cube.pincodes)),
+        'Forecast': result.values.round().astype('int64').ravel(),
+        'Method': np.repeat(result.method, horizon),
+        'Expected_Peak': peaks.ravel(),
+    })
@@ -0,0 +1,190 @@
+"""
+Streaming, schema-typed readers for the Aadhaar CSV feeds.
+
+Files are read in fixed-size chunks with the dtypes declared in
+uidai.schema, so peak memory depends on the chunk size rather than on the
+size of the extract.
+"""
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from uidai.schema import DATE_FORMAT, get_schema
+
+DEFAULT_CHUNKSIZE = 250_000
+CATEGORICAL_COLUMNS = ('state', 'district')
+# 128-bit row identity: two 64-bit hashes, compared field by field
+DIGEST_DTYPE = np.dtype([('hi', '<u8'), ('lo', '<u8')])
+# Seeds the text hashes of the low half (pandas' hash_key, 16 characters)
+_DIGEST_KEY = 'uidai.row.digest'
+_DIGEST_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+
+
+def parse_numbers(values):
+    """
+    Text column -> float64 array, NaN where blank or not a number.
+
+    Each distinct string is parsed once and mapped back to the rows:
+    counts and pincodes repeat a few thousand values across millions of
+    rows.
+    """
+    codes, uniques = pd.factorize(values)
+    parsed = pd.to_numeric(pd.Series(uniques, dtype=object), errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+    # Code -1 (missing) picks the trailing NaN
+    return np.append(parsed, np.nan)[codes]
+
+
+def to_nullable_int(values, dtype):
+    """
+    float64 array -> nullable integer array of dtype. NaN, fractions and
+    values outside the dtype's range become missing.
+    """
+    info = np.iinfo(pd.api.types.pandas_dtype(dtype).numpy_dtype)
+    valid = (values >= info.min) & (values <= info.max) & (values == np.floor(values))
+    return pd.arrays.IntegerArray(np.where(valid, values, 0).astype(info.dtype), ~valid)
+
+
+def iter_feed_chunks(path, feed, chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Yield typed DataFrame chunks of a feed CSV.
+
+    The date column is parsed with the fixed dd-mm-yyyy format as each
+    chunk is read; unparseable dates become NaT and are left for cleaning.
+    Pincodes and counts that are not valid numbers for their dtype (text,
+    negative counts, fractions) become missing rather than failing the read.
+    """
+    schema = get_schema(feed)
+    dtypes = schema.dtypes
+    with pd.read_csv(path, usecols=list(schema.columns), dtype=schema.csv_dtypes,
+                     chunksize=chunksize) as reader:
+        for chunk in reader:
+            chunk['date'] = pd.to_datetime(chunk['date'], format=DATE_FORMAT, errors='coerce')
+            for col in schema.numeric_columns:
+                chunk[col] = to_nullable_int(parse_numbers(chunk[col]), dtypes[col])
+            yield chunk
+
+
+def concat_chunks(chunks, schema=None):
+    """
+    Concatenate typed chunks while keeping state/district categorical.
+
+    Each chunk carries its own category set, and a plain pd.concat would
+    fall back to object strings when they differ.
+    """
+    chunks = list(chunks)
+    if not chunks:
+        if schema is None:
+            return pd.DataFrame()
+        return empty_feed_frame(schema)
+    if len(chunks) == 1:
+        return chunks[0]
+
+    for col in CATEGORICAL_COLUMNS:
+        if col not in chunks[0].columns:
+            continue
+        categories = union_categoricals([chunk[col] for chunk in chunks]).categories
+        for chunk in chunks:
+            chunk[col] = chunk[col].cat.set_categories(categories)
+    return pd.concat(chunks, ignore_index=True)
+
+
+def empty_feed_frame(feed):
+    """
+    Zero-row DataFrame with the columns and dtypes of a feed.
+    """
+    schema = get_schema(feed)
+    frame = pd.DataFrame({col: pd.Series(dtype=dtype) for col, dtype in schema.dtypes.items()})
+    frame['date'] = pd.Series(dtype='datetime64[ns]')
+    return frame
+
+
+def read_feed(path, feed, chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Read a whole feed into one typed DataFrame.
+    """
+    schema = get_schema(feed)
+    return concat_chunks(iter_feed_chunks(path, schema, chunksize), schema)
+
+
+def month_code(dates):
+    """
+    Encode datetimes as integer months since year 0 (year * 12 + month - 1).
+    """
+    return dates.dt.year * 12 + dates.dt.month - 1
+
+
+def month_start(codes):
+    """
+    Turn integer month codes back into month-start timestamps.
+    """
+    codes = np.asarray(codes, dtype='int64')
+    return pd.to_datetime(pd.DataFrame({'year': codes // 12, 'month': codes % 12 + 1, 'day': 1}))
+
+
+def row_totals(chunk, schema):
+    """
+    Sum the age-bucket count columns of each row (missing counts as 0).
+    """
+    return chunk[list(schema.count_columns)].to_numpy(dtype='int64', na_value=0).sum(axis=1)
+
+
+def row_digests(frame):
+    """
+    One 128-bit digest (DIGEST_DTYPE) per row of frame, equal for rows
+    with equal values.
+
+    The high half is pandas' row hash. The low half hashes every column
+    again, text with a different key, and folds the column hashes in
+    order with another mixing step, so two different rows share a digest
+    only if both independent 64-bit hashes collide (a chance below 1e-20
+    over a billion rows). Numbers and dates hash one-to-one in both halves.
+    """
+    digests = np.empty(len(frame), dtype=DIGEST_DTYPE)
+    digests['hi'] = pd.util.hash_pandas_object(frame, index=False).to_numpy()
+    lo = np.zeros(len(frame), dtype='uint64')
+    for _, column in frame.items():
+        lo = lo * _DIGEST_MULTIPLIER + pd.util.hash_pandas_object(column, index=False, hash_key=_DIGEST_KEY).to_numpy()
+    digests['lo'] = pd.util.hash_array(lo)
+    return digests
+
+
+def partial_aggregate(chunk, schema, by=()):
+    """
+    Sum one chunk's row totals per month (and per extra key columns).
+
+    Returns a Series indexed by ('month_code', *by), which can be folded
+    into a running total with Series.add(..., fill_value=0).
+    """
+    valid = chunk['date'].notna().to_numpy()
+    keys = {'month_code': month_code(chunk['date'])[valid].astype('int64').to_numpy()}
+    for col in by:
+        keys[col] = chunk[col][valid].to_numpy()
+    frame = pd.DataFrame(keys)
+    frame['Total'] = row_totals(chunk, schema)[valid]
+    return frame.groupby(list(keys), sort=False, observed=True, dropna=False)['Total'].sum()
+
+
+def stream_monthly(path, feed, chunksize=DEFAULT_CHUNKSIZE, by=()):
+    """
+    Monthly totals of a feed computed chunk by chunk.
+
+    Only the running per-month partial sums are kept between chunks, so
+    memory stays bounded by the chunk size. The result has the same shape
+    as prepare_monthly_data: a 'Month' column plus one column named after
+    the feed label, with optional extra key columns (e.g. by=('pincode',)).
+    Rows are aggregated as read; duplicates are not removed.
+    """
+    schema = get_schema(feed)
+    by = tuple(by)
+    totals = None
+    for chunk in iter_feed_chunks(path, schema, chunksize):
+        partial = partial_aggregate(chunk, schema, by)
+        totals = partial if totals is None else totals.add(partial, fill_value=0)
+
+    if totals is None or totals.empty:
+        return pd.DataFrame(columns=['Month', *by, schema.label])
+
+    monthly = totals.astype('int64').rename(schema.label).reset_index()
+    monthly.insert(0, 'Month', month_start(monthly.pop('month_code')))
+    return monthly.sort_values(['Month', *by]).reset_index(drop=True)
@@ -0,0 +1,164 @@
+"""
+Pincode-level analytics on a dense pincode x month x service cube.
+
+The cube is built once from the feeds. Pincodes and months are mapped to
+array positions (a sorted pincode index and a contiguous month range).
+Queries are then NumPy reductions over the cube instead of fresh
+DataFrame groupbys. That matters at national scale, with ~19k pincodes.
+"""
+
+import numpy as np
+import pandas as pd
+
+from uidai.cleaning import clean_frame
+from uidai.loader import DEFAULT_CHUNKSIZE, month_code, month_start, partial_aggregate, read_feed
+from uidai.schema import FEEDS, get_schema
+
+SERVICES = tuple(FEEDS)
+
+
+class PincodeCube:
+    """
+    Service counts as a dense int64 array of shape (pincodes, months, services).
+    """
+
+    def __init__(self, values, pincodes, first_month):
+        self.values = values
+        self.pincodes = np.asarray(pincodes)
+        self.first_month = int(first_month)
+        self.months = month_start(np.arange(self.first_month, self.first_month + values.shape[1]))
+        self._position = {int(pincode): i for i, pincode in enumerate(self.pincodes)}
+
+    # ------------------------------------------------------------------
+    # Construction
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def from_partials(cls, partials):
+        """
+        Build from {feed: Series indexed by (month_code, pincode)} of totals.
+        """
+        partials = {feed: series[series.index.get_level_values('pincode').notna()]
+                    for feed, series in partials.items() if len(series)}
+        if not partials:
+            return cls(np.zeros((0, 0, len(SERVICES)), dtype='int64'), [], 0)
+
+        pincodes = np.unique(np.concatenate([
+            series.index.get_level_values('pincode').to_numpy(dtype='int64') for series in partials.values()
+        ]))
+        codes = np.concatenate([
+            series.index.get_level_values('month_code').to_numpy(dtype='int64') for series in partials.values()
+        ])
+        first_month, n_months = codes.min(), codes.max() - codes.min() + 1
+
+        shape = (len(pincodes), n_months, len(SERVICES))
+        flat = np.zeros(int(np.prod(shape)), dtype='int64')
+        for feed, series in partials.items():
+            p = np.searchsorted(pincodes, series.index.get_level_values('pincode').to_numpy(dtype='int64'))
+            m = series.index.get_level_values('month_code').to_numpy(dtype='int64') - first_month
+            s = SERVICES.index(get_schema(feed).name)
+            flat += np.bincount(np.ravel_multi_index((p, m, np.full_like(p, s)), shape),
+                                weights=series.to_numpy(dtype='int64'), minlength=flat.size).astype('int64')
+        return cls(flat.reshape(shape), pincodes, first_month)
+
+    @classmethod
+    def from_clean(cls, clean_frames):
+        """
+        Build from {feed: cleaned DataFrame}.
+        """
+        return cls.from_partials({feed: partial_aggregate(df, get_schema(feed), by=('pincode',))
+                                  for feed, df in clean_frames.items()})
+
+    @classmethod
+    def from_files(cls, feed_files, chunksize=DEFAULT_CHUNKSIZE):
+        """
+        Build from {feed: csv_path}, loading and cleaning one feed at a time.
+        """
+        partials = {}
+        for feed, path in feed_files.items():
+            schema = get_schema(feed)
+            clean, _ = clean_frame(read_feed(path, schema, chunksize))
+            partials[feed] = partial_aggregate(clean, schema, by=('pincode',))
+        return cls.from_partials(partials)
+
+    @classmethod
+    def from_monthly(cls, monthly_by_pincode):
+        """
+        Build from {feed: DataFrame[Month, pincode, <label>]}, e.g. the
+        output of CheckpointStore.monthly(feed, by_pincode=True).
+        """
+        partials = {}
+        for feed, frame in monthly_by_pincode.items():
+            schema = get_schema(feed)
+            index = pd.MultiIndex.from_arrays(
+                [month_code(frame['Month']).to_numpy(), frame['pincode'].to_numpy()],
+                names=['month_code', 'pincode'])
+            partials[feed] = pd.Series(frame[schema.label].to_numpy(), index=index)
+        return cls.from_partials(partials)
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def _select(self, service=None):
+        """
+        (pincodes, months) load for one service, or all services combined.
+        """
+        if service is None:
+            return self.values.sum(axis=2)
+        return self.values[:, :, SERVICES.index(get_schema(service).name)]
+
+    def index_of(self, pincode):
+        return self._position[int(pincode)]
+
+    def series(self, pincode, service=None):
+        """
+        Monthly load of one pincode as a DataFrame (Month, Load).
+        """
+        return pd.DataFrame({'Month': self.months, 'Load': self._select(service)[self.index_of(pincode)]})
+
+    def top_pincodes(self, n=10, service=None, months=None):
+        """
+        The n busiest pincodes by total load, optionally over a slice of
+        months (a slice or index array into self.months).
+        """
+        load = self._select(service)
+        if months is not None:
+            load = load[:, months]
+        totals = load.sum(axis=1)
+        n = min(n, len(totals))
+        if n == 0:
+            return pd.DataFrame(columns=['pincode', 'Load'])
+        top = np.argpartition(-totals, n - 1)[:n]
+        top = top[np.argsort(-totals[top], kind='stable')]
+        return pd.DataFrame({'pincode': self.pincodes[top], 'Load': totals[top]})
+
+    def peak_months(self, service=None):
+        """
+        Busiest month of every pincode with its load and share of the
+        pincode's total.
+        """
+        load = self._select(service)
+        peak = load.argmax(axis=1)
+        peak_load = load[np.arange(len(load)), peak]
+        totals = load.sum(axis=1)
+        share = np.divide(peak_load, totals, out=np.zeros(len(load)), where=totals > 0)
+        return pd.DataFrame({
+            'pincode': self.pincodes,
+            'Peak_Month': self.months.to_numpy()[peak] if len(load) else self.months.to_numpy()[:0],
+            'Peak_Load': peak_load,
+            'Peak_Share': share,
+        })
+
+    def growth(self, service=None):
+        """
+        Month-over-month growth (fraction) per pincode, as a DataFrame
+        indexed by pincode with one column per month from the second month
+        on. Growth from a zero month is NaN.
+        """
+        load = self._select(service).astype('float64')
+        previous, current = load[:, :-1], load[:, 1:]
+        growth = np.divide(current - previous, previous,
+                           out=np.full(current.shape, np.nan), where=previous > 0)
+        return pd.DataFrame(growth, index=pd.Index(self.pincodes, name='pincode'),
+                            columns=self.months[1:])
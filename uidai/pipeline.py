@@ -0,0 +1,534 @@
+"""
+End-to-end analysis pipeline: load, clean, aggregate, analyze, render, report.
+
+Each stage is a plain function so it can be reused on its own from a
+service or a notebook; run_analysis chains them. Rendering is optional
+and is the only stage that imports matplotlib.
+
+Passing a uidai.cache.ResultCache makes the stages reuse results from
+earlier runs with identical inputs and settings. Passing a
+uidai.profiling.Profiler records time, memory and row counts per stage.
+"""
+
+import os
+from dataclasses import dataclass, field
+
+import pandas as pd
+
+from uidai import anomaly
+from uidai.cache import ResultCache, make_key, state_path
+from uidai.aggregate import combine_monthly, prepare_monthly_data
+from uidai.analysis import find_peak_months, summarize
+from uidai.backends import get_backend
+from uidai.checkpoint import CheckpointStore, refresh_monthly
+from uidai.cohort import CohortTensor
+from uidai.cleaning import clean_dataset, clean_frame
+from uidai.dedup import DEFAULT_KEY, DEFAULT_MEMORY_BUDGET, merge_extracts
+from uidai.forecast import forecast_monthly
+from uidai.loader import DEFAULT_CHUNKSIZE, concat_chunks, read_feed
+from uidai.pincode import PincodeCube
+from uidai.profiling import stage
+from uidai.report import REPORT_FILENAMES, ReportRecord, ReportWriter, build_summary_table, render_insights
+from uidai.schema import FEEDS
+from uidai.timeseries import TimeSeriesStore
+from uidai.validation import QuarantineSink, Validator, default_rules, iter_validated_chunks
+
+INSIGHTS_FILENAME = REPORT_FILENAMES['text']
+TOP_PINCODES_FILENAME = 'top_pincodes.csv'
+PINCODE_PEAKS_FILENAME = 'pincode_peak_months.csv'
+FORECAST_FILENAME = 'forecast.csv'
+ANOMALIES_FILENAME = 'anomalies.csv'
+QUARANTINE_FILENAME = 'quarantine_{feed}.csv'
+COHORT_FILENAMES = {
+    'shares': 'cohort_shares.csv',
+    'transitions': 'cohort_transitions.csv',
+    'peaks': 'cohort_peaks.csv',
+    'pincode_peaks': 'cohort_pincode_peaks.csv',
+}
+TIME_PROFILE_FILENAMES = {
+    'daily': 'daily_load.csv',
+    'weekly': 'weekly_load.csv',
+    'day_of_week': 'weekday_profile.csv',
+}
+
+
+@dataclass
+class AnalysisResult:
+    """
+    Everything produced by one pipeline run, keyed by feed name where
+    the stage is per feed.
+    """
+    raw: dict = field(default_factory=dict)
+    clean: dict = field(default_factory=dict)
+    monthly: dict = field(default_factory=dict)
+    merged_data: pd.DataFrame = field(default_factory=pd.DataFrame)
+    top_months: pd.DataFrame = field(default_factory=pd.DataFrame)
+    stats: dict = field(default_factory=dict)
+    validation: pd.DataFrame = field(default_factory=pd.DataFrame)
+    insights: str = ''
+    summary_stats: pd.DataFrame = field(default_factory=pd.DataFrame)
+    charts: list = field(default_factory=list)
+
+
+def load(feed_files, chunksize=DEFAULT_CHUNKSIZE, profiler=None):
+    """
+    Read {feed: csv_path} into {feed: typed DataFrame}.
+    """
+    frames = {}
+    for feed, path in feed_files.items():
+        with stage(profiler, f'load:{feed}') as record:
+            frames[feed] = read_feed(path, feed, chunksize)
+            record.rows_out = len(frames[feed])
+    return frames
+
+
+def merge_feed_extracts(feed_paths, work_dir, key=DEFAULT_KEY, memory_budget=DEFAULT_MEMORY_BUDGET,
+                        spill_dir=None, chunksize=DEFAULT_CHUNKSIZE, profiler=None):
+    """
+    Merge {feed: [csv_path, ...]} of overlapping extracts into one CSV per
+    feed in work_dir, dropping rows whose key (default: date and pincode)
+    was already read. A feed with a single path is passed through as is.
+
+    Returns ({feed: csv_path}, report) where report counts the rows read
+    and duplicates dropped per source file.
+    """
+    feed_files = {}
+    reports = []
+    for feed, paths in feed_paths.items():
+        paths = [paths] if isinstance(paths, str) else list(paths)
+        if len(paths) == 1:
+            feed_files[feed] = paths[0]
+            continue
+        schema = FEEDS[feed]
+        os.makedirs(work_dir, exist_ok=True)
+        feed_files[feed] = os.path.join(work_dir, schema.filename)
+        with stage(profiler, f'dedup:{feed}') as record:
+            merged = merge_extracts(paths, schema, feed_files[feed], key, memory_budget, spill_dir, chunksize)
+            record.rows_in = int(merged['Rows'].sum())
+            record.rows_out = int(merged['Kept'].sum())
+        reports.append(merged.assign(Service=schema.label))
+    columns = ['Service', 'Source', 'Rows', 'Duplicates', 'Kept']
+    report = pd.concat(reports, ignore_index=True)[columns] if reports else pd.DataFrame(columns=columns)
+    return feed_files, report
+
+
+def load_validated(feed_files, out_dir=None, rules=None, chunksize=DEFAULT_CHUNKSIZE, profiler=None):
+    """
+    Read {feed: csv_path} like load(), keeping only rows that pass the
+    validation rules (uidai.validation.default_rules() unless given).
+
+    Returns (frames, report) where report counts the failures per feed
+    and rule. With out_dir, failing rows are written to one quarantine
+    CSV per feed (QUARANTINE_FILENAME).
+    """
+    frames = {}
+    reports = []
+    for feed, path in feed_files.items():
+        schema = FEEDS[feed]
+        sink = None
+        if out_dir is not None:
+            os.makedirs(out_dir, exist_ok=True)
+            sink = QuarantineSink(os.path.join(out_dir, QUARANTINE_FILENAME.format(feed=feed)), schema)
+        validator = Validator(schema, default_rules() if rules is None else rules, sink)
+        try:
+            with stage(profiler, f'validate:{feed}') as record:
+                frames[feed] = concat_chunks(iter_validated_chunks(path, schema, validator, chunksize), schema)
+                record.rows_in = validator.rows_in
+                record.rows_out = len(frames[feed])
+        finally:
+            if sink is not None:
+                sink.close()
+        reports.append(validator.report().assign(Service=schema.label))
+    report = pd.concat(reports, ignore_index=True)[['Service', 'Rule', 'Description', 'Failed']]
+    return frames, report
+
+
+def clean(frames, verbose=False, profiler=None):
+    """
+    Clean every loaded feed. With verbose, prints the per-feed report.
+    """
+    clean_frames = {}
+    for feed, df in frames.items():
+        with stage(profiler, f'clean:{feed}', rows_in=len(df)) as record:
+            if verbose:
+                clean_frames[feed] = clean_dataset(df, f"{FEEDS[feed].title} Data")
+            else:
+                clean_frames[feed] = clean_frame(df)[0]
+            record.rows_out = len(clean_frames[feed])
+    return clean_frames
+
+
+def detect_anomalies(clean_frames, mode='flag', method='mad', out_dir=None, profiler=None):
+    """
+    Score every pincode's daily totals for spikes and drops and apply the
+    adjustment mode ('flag', 'exclude' or 'downweight') to the cleaned frames.
+
+    Returns (adjusted_frames, scored) where scored maps feed to its scored
+    daily totals. With out_dir, the flagged observations are written as CSV.
+    """
+    adjusted, scored = {}, {}
+    for feed, df in clean_frames.items():
+        with stage(profiler, f'anomalies:{feed}', rows_in=len(df)) as record:
+            scored[feed] = anomaly.detect(df, feed, method=method)
+            adjusted[feed] = anomaly.adjust(df, feed, scored[feed], mode)
+            record.rows_out = len(adjusted[feed])
+    if out_dir is not None:
+        os.makedirs(out_dir, exist_ok=True)
+        flagged = pd.concat([frame[frame['Anomaly'] != ''].assign(Service=FEEDS[feed].label)
+                             for feed, frame in scored.items()], ignore_index=True)
+        flagged.to_csv(os.path.join(out_dir, ANOMALIES_FILENAME), index=False)
+    return adjusted, scored
+
+
+def aggregate(clean_frames, verbose=False, profiler=None):
+    """
+    Monthly totals for every cleaned feed.
+    """
+    monthly = {}
+    for feed, df in clean_frames.items():
+        with stage(profiler, f'aggregate:{feed}', rows_in=len(df)) as record:
+            monthly[feed] = prepare_monthly_data(df, FEEDS[feed].label, verbose=verbose)
+            record.rows_out = len(monthly[feed])
+    return monthly
+
+
+def cached_monthly(feed_files, cache, chunksize=DEFAULT_CHUNKSIZE, profiler=None, backend=None):
+    """
+    Monthly totals for {feed: csv_path}, served from the result cache.
+
+    Each feed's cleaned frame and monthly aggregate are keyed on that
+    feed's content fingerprint plus the options they are computed with
+    (chunksize, backend), so a changed feed or option is recomputed while
+    the other feeds are not. With backend (a uidai.backends.Backend or its
+    name) the monthly totals are computed out of core and no cleaned frame
+    is cached. Returns (monthly, key) where key identifies the combined
+    monthly inputs for the downstream cached stages.
+    """
+    if isinstance(backend, str):
+        backend = get_backend(backend)
+    options = {'chunksize': chunksize, 'backend': None if backend is None else backend.name}
+    monthly = {}
+    monthly_keys = {}
+    for feed, path in feed_files.items():
+        schema = FEEDS[feed]
+        with stage(profiler, f'cached_monthly:{feed}') as record:
+            clean_key = make_key('clean', feed, cache.fingerprint(path)['sha256'], options)
+            monthly_key = make_key('monthly', clean_key)
+            frame = cache.get(monthly_key)
+            if frame is None and backend is not None:
+                frame = cache.put(monthly_key, backend.monthly(path, feed))
+            elif frame is None:
+                clean_df = cache.get_or_compute(
+                    clean_key, lambda: clean_frame(read_feed(path, schema, chunksize))[0])
+                frame = cache.put(monthly_key, prepare_monthly_data(clean_df, schema.label, verbose=False))
+            record.rows_out = len(frame)
+        monthly[feed] = frame
+        monthly_keys[feed] = monthly_key
+    return monthly, make_key('monthly-set', monthly_keys)
+
+
+def backend_monthly(feed_files, backend, profiler=None):
+    """
+    Monthly totals for {feed: csv_path} from an out-of-core execution
+    backend (a uidai.backends.Backend or its name). The feeds are never
+    loaded whole, so no raw/clean frames are produced.
+    """
+    if isinstance(backend, str):
+        backend = get_backend(backend)
+    monthly = {}
+    for feed, path in feed_files.items():
+        with stage(profiler, f'{backend.name}:{feed}') as record:
+            monthly[feed] = backend.monthly(path, feed)
+            record.rows_out = len(monthly[feed])
+    return monthly
+
+
+def analyze(monthly, n_peaks=5, cache=None, key=None, profiler=None):
+    """
+    Merge the monthly services, find peak months and collect statistics.
+
+    Returns (merged_data, top_months, stats). With a cache and the key
+    from cached_monthly, the result is reused across runs.
+    """
+    if cache is not None and key is not None:
+        return cache.get_or_compute(make_key('analysis', key, n_peaks),
+                                    lambda: analyze(monthly, n_peaks, profiler=profiler))
+
+    empty = pd.DataFrame()
+    enrolment_monthly = monthly.get('enrolment', empty)
+    biometric_monthly = monthly.get('biometric', empty)
+    demographic_monthly = monthly.get('demographic', empty)
+
+    rows_in = sum(len(frame) for frame in monthly.values())
+    with stage(profiler, 'merge', rows_in=rows_in) as record:
+        merged_data = combine_monthly(monthly)
+        record.rows_out = len(merged_data)
+    with stage(profiler, 'summarize', rows_in=len(merged_data)) as record:
+        top_months = find_peak_months(merged_data, n=n_peaks)
+        stats = summarize(enrolment_monthly, biometric_monthly, demographic_monthly, merged_data, top_months)
+        record.rows_out = len(top_months)
+    return merged_data, top_months, stats
+
+
+def pincode_cube(feed_files, clean_frames=None, checkpoint=None, chunksize=DEFAULT_CHUNKSIZE, profiler=None):
+    """
+    Build the pincode x month x service cube from whatever is at hand:
+    cleaned frames, the incremental checkpoint, or the CSV files.
+    """
+    with stage(profiler, 'pincode_cube') as record:
+        cube = _pincode_cube(feed_files, clean_frames, checkpoint, chunksize)
+        record.rows_out = len(cube.pincodes)
+    return cube
+
+
+def _pincode_cube(feed_files, clean_frames, checkpoint, chunksize):
+    if clean_frames:
+        return PincodeCube.from_clean(clean_frames)
+    if checkpoint:
+        with CheckpointStore(checkpoint) as store:
+            return PincodeCube.from_monthly({feed: store.monthly(feed, by_pincode=True)
+                                             for feed in feed_files})
+    return PincodeCube.from_files(feed_files, chunksize)
+
+
+def pincode_report(cube, out_dir=None, n=10):
+    """
+    Top n pincodes by total load. With out_dir, also writes the top-n
+    table and every pincode's peak month as CSV files.
+    """
+    top = cube.top_pincodes(n)
+    if out_dir is not None:
+        os.makedirs(out_dir, exist_ok=True)
+        top.to_csv(os.path.join(out_dir, TOP_PINCODES_FILENAME), index=False)
+        cube.peak_months().to_csv(os.path.join(out_dir, PINCODE_PEAKS_FILENAME), index=False)
+    return top
+
+
+def timeseries_store(feed_files, clean_frames=None, chunksize=DEFAULT_CHUNKSIZE, profiler=None):
+    """
+    Build the daily TimeSeriesStore from cleaned frames, or from the CSV
+    files when none are at hand (the checkpoint keeps monthly totals only).
+    """
+    with stage(profiler, 'timeseries') as record:
+        if clean_frames:
+            store = TimeSeriesStore.from_clean(clean_frames)
+        else:
+            store = TimeSeriesStore.from_files(feed_files, chunksize)
+        record.rows_out = len(store.values)
+    return store
+
+
+def time_profile_report(store, out_dir=None):
+    """
+    Day-of-week profile of the store. With out_dir, also writes the daily,
+    weekly and day-of-week series as CSV files.
+    """
+    if out_dir is not None:
+        os.makedirs(out_dir, exist_ok=True)
+        for resolution, filename in TIME_PROFILE_FILENAMES.items():
+            store.series(resolution).to_csv(os.path.join(out_dir, filename), index=False)
+    return store.day_of_week()
+
+
+def cohort_tensor(feed_files, clean_frames=None, chunksize=DEFAULT_CHUNKSIZE, profiler=None):
+    """
+    Build the month x pincode x cohort x service tensor from cleaned
+    frames, or from the CSV files when none are at hand (the checkpoint
+    keeps no age buckets).
+    """
+    with stage(profiler, 'cohorts') as record:
+        if clean_frames:
+            tensor = CohortTensor.from_clean(clean_frames)
+        else:
+            tensor = CohortTensor.from_files(feed_files, chunksize)
+        record.rows_out = len(tensor.pincodes)
+    return tensor
+
+
+def cohort_report(tensor, out_dir=None):
+    """
+    Peak month of every (service, cohort). With out_dir, also writes the
+    monthly cohort shares, the enrolment-to-update transitions and the
+    network and per-pincode cohort peaks as CSV files.
+    """
+    peaks = tensor.peaks()
+    if out_dir is not None:
+        os.makedirs(out_dir, exist_ok=True)
+        tables = {'shares': tensor.shares(), 'transitions': tensor.transitions(),
+                  'peaks': peaks, 'pincode_peaks': tensor.pincode_peaks()}
+        for name, filename in COHORT_FILENAMES.items():
+            tables[name].to_csv(os.path.join(out_dir, filename), index=False)
+    return peaks
+
+
+def last_observed(clean_frames=None, checkpoint=None):
+    """
+    Latest date in the cleaned frames or the checkpoint, or None.
+    """
+    dates = []
+    if clean_frames is not None:
+        dates = [df['date'].max() for df in clean_frames.values() if len(df)]
+    elif checkpoint:
+        with CheckpointStore(checkpoint) as store:
+            dates = [store.watermark(feed) for feed in FEEDS]
+    dates = [date for date in dates if date is not None and not pd.isna(date)]
+    return max(dates) if dates else None
+
+
+def forecast_report(merged_data, out_dir=None, horizon=3, profiler=None, last_date=None):
+    """
+    Forecast each service and the total load for the next horizon months,
+    flagging expected peaks. last_date (see last_observed) marks a partial
+    last month, which is then forecast rather than fitted. With out_dir,
+    also writes the forecast as CSV.
+    """
+    with stage(profiler, 'forecast', rows_in=len(merged_data)) as record:
+        forecast = forecast_monthly(merged_data, horizon=horizon, last_date=last_date)
+        record.rows_out = len(forecast)
+    if out_dir is not None:
+        os.makedirs(out_dir, exist_ok=True)
+        forecast.to_csv(os.path.join(out_dir, FORECAST_FILENAME), index=False)
+    return forecast
+
+
+def report(stats, region='Hyderabad', out_dir=None, profiler=None, formats=('text',), state_dir=None):
+    """
+    Build the insights text and summary table. When out_dir is given, save
+    the report in each of formats ('text', 'markdown', 'html', 'json');
+    files whose statistics have not changed since the last run are kept.
+    Which ones those are is tracked under state_dir (default:
+    uidai.cache.DEFAULT_CACHE_DIR), not in out_dir.
+
+    Returns (insights, summary_stats).
+    """
+    with stage(profiler, 'insights'):
+        record = ReportRecord.from_stats(stats, region)
+        insights = render_insights(record)
+        if out_dir is not None:
+            with ReportWriter(out_dir, formats, index_path=state_path('reports', out_dir, state_dir)) as writer:
+                writer.add(out_dir, record)
+        summary_stats = build_summary_table(stats)
+    return insights, summary_stats
+
+
+def render(monthly, merged_data, top_months, out_dir='visualizations', region='Hyderabad',
+           show=False, verbose=False, dpi=None, fmt=None, workers=None, cache=None, key=None,
+           profiler=None, state_dir=None):
+    """
+    Draw visualizations 1-5. Imports the rendering backend on demand.
+    Which charts are up to date is tracked under state_dir (default:
+    uidai.cache.DEFAULT_CACHE_DIR).
+
+    With a cache and the key from cached_monthly, the rendered files are
+    stored in the cache and written back out on later runs instead of
+    being drawn again.
+    """
+    with stage(profiler, 'render'):
+        return _render(monthly, merged_data, top_months, out_dir, region, show, verbose,
+                       dpi, fmt, workers, cache, key, profiler, state_dir)
+
+
+def _render(monthly, merged_data, top_months, out_dir, region, show, verbose,
+            dpi, fmt, workers, cache, key, profiler, state_dir):
+    from uidai.render import DEFAULT_DPI, DEFAULT_FORMAT, render_charts
+
+    dpi = dpi or DEFAULT_DPI
+    fmt = fmt or DEFAULT_FORMAT
+    chart_key = None
+    if cache is not None and key is not None and not show:
+        chart_key = make_key('charts', key, region, dpi, fmt)
+        artifacts = cache.get(chart_key)
+        if artifacts is not None:
+            os.makedirs(out_dir, exist_ok=True)
+            paths = []
+            for filename, content in artifacts.items():
+                path = os.path.join(out_dir, filename)
+                with open(path, 'wb') as f:
+                    f.write(content)
+                paths.append(path)
+            if verbose:
+                print(f"✓ {len(paths)} visualizations restored from cache")
+            return paths
+
+    paths = render_charts(monthly, merged_data, top_months, out_dir=out_dir,
+                          region=region, show=show, verbose=verbose,
+                          dpi=dpi, fmt=fmt, workers=workers, profiler=profiler, state_dir=state_dir)
+    if chart_key is not None:
+        artifacts = {}
+        for path in paths:
+            with open(path, 'rb') as f:
+                artifacts[os.path.basename(path)] = f.read()
+        cache.put(chart_key, artifacts)
+    return paths
+
+
+def run_analysis(feed_files, out_dir=None, region='Hyderabad', charts=True,
+                 checkpoint=None, cache=None, chunksize=DEFAULT_CHUNKSIZE, profiler=None,
+                 anomalies=None, report_formats=('text',), backend=None, validate=False):
+    """
+    Run the whole pipeline for {feed: csv_path} and return an AnalysisResult.
+
+    With checkpoint set, monthly totals come from the incremental SQLite
+    checkpoint and the full load/clean stages are skipped. With backend
+    (a uidai.backends.Backend or its name: 'pandas', 'polars', 'duckdb'),
+    they are computed out of core instead. With cache (a
+    ResultCache or a cache directory), stage results are reused from
+    earlier runs, keyed on the inputs and on chunksize and backend;
+    raw/clean frames are then not kept on the result. Runs with anomalies
+    or validate do not use the cached results, as those steps write their
+    own outputs from the full load/clean stages. The
+    record of which charts and reports are up to date is kept in the
+    cache directory, or uidai.cache.DEFAULT_CACHE_DIR without a cache.
+    Nothing is written unless out_dir is given; charts are drawn only
+    when charts is True and out_dir is set. With a
+    uidai.profiling.Profiler, every stage is recorded on it.
+
+    anomalies ('flag', 'exclude' or 'downweight') runs spike/drop
+    detection on the cleaned frames before aggregation; it needs the full
+    load/clean stages and is ignored with checkpoint or backend.
+
+    report_formats selects the insights report files written to out_dir
+    (any of 'text', 'markdown', 'html', 'json').
+
+    validate loads through the row validation rules (True for the default
+    rules, or a list of uidai.validation.Rule); failing rows are left out
+    and, with out_dir, quarantined. Like anomalies it needs the full
+    load/clean stages.
+    """
+    result = AnalysisResult()
+    own_cache = isinstance(cache, str)
+    if own_cache:
+        cache = ResultCache(cache)
+    state_dir = cache.cache_dir if cache is not None else None
+    key = None
+
+    if checkpoint:
+        with stage(profiler, 'checkpoint'):
+            result.monthly = refresh_monthly(checkpoint, feed_files, chunksize)
+    elif cache is not None and not validate and not anomalies:
+        result.monthly, key = cached_monthly(feed_files, cache, chunksize, profiler, backend)
+    elif backend is not None:
+        result.monthly = backend_monthly(feed_files, backend, profiler)
+    else:
+        if validate:
+            rules = None if validate is True else validate
+            result.raw, result.validation = load_validated(feed_files, out_dir, rules, chunksize, profiler)
+        else:
+            result.raw = load(feed_files, chunksize, profiler)
+        result.clean = clean(result.raw, profiler=profiler)
+        if anomalies:
+            result.clean, _ = detect_anomalies(result.clean, anomalies, out_dir=out_dir, profiler=profiler)
+        result.monthly = aggregate(result.clean, profiler=profiler)
+
+    result.merged_data, result.top_months, result.stats = analyze(result.monthly, cache=cache, key=key,
+                                                                  profiler=profiler)
+    result.insights, result.summary_stats = report(result.stats, region, out_dir, profiler, report_formats,
+                                                   state_dir)
+
+    if charts and out_dir is not None:
+        result.charts = render(result.monthly, result.merged_data, result.top_months,
+                               out_dir=out_dir, region=region, cache=cache, key=key, profiler=profiler,
+                               state_dir=state_dir)
+    if own_cache:
+        cache.close()
+    return result
@@ -0,0 +1,334 @@
+"""
+Stage-level instrumentation for the pipeline.
+
+A Profiler records one StageRecord per pipeline stage (load, clean,
+aggregate, merge, each visualization, insights). Each record holds wall
+time, CPU time, peak resident memory and rows in/out. Records can be
+written as JSON or as a Prometheus text-format file, so runs on growing
+data can be compared over time.
+
+Peak RSS is per stage on Linux: the kernel's high-water mark is reset
+when the outermost stage running in the process starts (a Profiler stage
+or a measure() call) and read when each stage ends, so a nested stage
+never clears the peak its enclosing stage is still measuring. On other
+platforms it falls back to the process-lifetime peak from getrusage.
+
+In the Prometheus export, records that share a stage name are combined
+into one sample: times and rows are summed, peak RSS is the maximum.
+
+Optionally every top-level stage also runs under cProfile (or
+pyinstrument, if installed). Only the profile of the slowest stage is
+kept for dumping.
+"""
+
+import json
+import os
+import platform
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+
+PROFILE_TOOLS = ('cprofile', 'pyinstrument')
+METRIC_PREFIX = 'uidai_stage'
+
+_METRICS = [
+    ('wall_seconds', 'wall_s', 'Wall-clock time per pipeline stage.'),
+    ('cpu_seconds', 'cpu_s', 'CPU time (user + system) per pipeline stage.'),
+    ('peak_rss_bytes', 'peak_rss_bytes', 'Peak resident memory during the stage.'),
+    ('rows_in', 'rows_in', 'Rows entering the stage.'),
+    ('rows_out', 'rows_out', 'Rows leaving the stage.'),
+]
+
+# Stages currently running in this process. Only the outermost one
+# resets the RSS high-water mark.
+_depth = 0
+
+
+@dataclass
+class StageRecord:
+    name: str
+    wall_s: float = 0.0
+    cpu_s: float = 0.0
+    peak_rss_bytes: int = None
+    rows_in: int = None
+    rows_out: int = None
+
+
+def _reset_peak_rss():
+    """
+    Reset the kernel's RSS high-water mark (Linux only). Returns True on success.
+    """
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss():
+    """
+    Peak resident memory of this process in bytes, or None if unknown.
+    """
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+@contextmanager
+def _peak_scope():
+    """
+    Mark a stage as running; reset the RSS high-water mark if it is the
+    outermost one.
+    """
+    global _depth
+    if _depth == 0:
+        _reset_peak_rss()
+    _depth += 1
+    try:
+        yield
+    finally:
+        _depth -= 1
+
+
+def measure(name, func, *args, rows_in=None, **kwargs):
+    """
+    Call func(*args, **kwargs) and return (result, StageRecord).
+
+    Has no Profiler state, so it can run inside a worker process and its
+    record can be sent back and added with Profiler.add. Called inside
+    a running stage, it leaves that stage's memory peak intact.
+    """
+    wall, cpu = time.perf_counter(), time.process_time()
+    with _peak_scope():
+        result = func(*args, **kwargs)
+    record = StageRecord(name, time.perf_counter() - wall, time.process_time() - cpu,
+                         peak_rss(), rows_in)
+    return result, record
+
+
+class _Session:
+    """
+    One cProfile or pyinstrument run around a single stage.
+    """
+
+    def __init__(self, tool):
+        if tool == 'pyinstrument':
+            try:
+                import pyinstrument
+            except ImportError:
+                raise ImportError("The pyinstrument profile needs pyinstrument: pip install pyinstrument")
+            self.profiler = pyinstrument.Profiler()
+        else:
+            import cProfile
+
+            self.profiler = cProfile.Profile()
+        self.tool = tool
+
+    def start(self):
+        if self.tool == 'pyinstrument':
+            self.profiler.start()
+        else:
+            self.profiler.enable()
+
+    def stop(self):
+        if self.tool == 'pyinstrument':
+            self.profiler.stop()
+        else:
+            self.profiler.disable()
+
+    def dump(self, path):
+        if self.tool == 'pyinstrument':
+            output = self.profiler.output_html() if path.endswith('.html') else self.profiler.output_text()
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(output)
+        else:
+            self.profiler.dump_stats(path)
+
+
+class Profiler:
+    """
+    Collects StageRecords for one pipeline run.
+
+    tool is None (timings only), 'cprofile' or 'pyinstrument'. With a
+    tool set, each top-level stage is profiled and the slowest stage's
+    profile can be saved with dump_slowest.
+    """
+
+    def __init__(self, tool=None):
+        if tool is not None and tool not in PROFILE_TOOLS:
+            raise ValueError(f"Unsupported profile tool '{tool}'. Expected one of: {', '.join(PROFILE_TOOLS)}")
+        self.tool = tool
+        self.records = []
+        self.started = time.time()
+        self._open = []
+        self._slowest = None
+
+    @contextmanager
+    def stage(self, name, rows_in=None):
+        """
+        Time the enclosed block as one stage. Yields its StageRecord so
+        the block can fill in rows_out.
+
+        Stages may nest. Only the outermost stage resets the memory peak
+        and only top-level stages run under the profile tool; an outer
+        stage's peak includes its inner stages.
+        """
+        record = StageRecord(name, rows_in=rows_in)
+        top_level = not self._open
+        session = _Session(self.tool) if self.tool and top_level else None
+        self._open.append(record)
+        wall, cpu = time.perf_counter(), time.process_time()
+        if session is not None:
+            session.start()
+        try:
+            with _peak_scope():
+                yield record
+        finally:
+            if session is not None:
+                session.stop()
+            record.wall_s = time.perf_counter() - wall
+            record.cpu_s = time.process_time() - cpu
+            record.peak_rss_bytes = max(peak_rss() or 0, record.peak_rss_bytes or 0) or None
+            self._open.pop()
+            if self._open and record.peak_rss_bytes:
+                parent = self._open[-1]
+                parent.peak_rss_bytes = max(parent.peak_rss_bytes or 0, record.peak_rss_bytes)
+            self.records.append(record)
+            if session is not None and (self._slowest is None or record.wall_s > self._slowest[0].wall_s):
+                self._slowest = (record, session)
+
+    def add(self, record):
+        """
+        Add a record measured elsewhere, e.g. by measure() in a worker process.
+        """
+        self.records.append(record)
+        return record
+
+    def slowest(self):
+        """
+        Record of the slowest top-level profiled stage, or of any stage
+        when no profile tool is set.
+        """
+        if self._slowest is not None:
+            return self._slowest[0]
+        return max(self.records, key=lambda record: record.wall_s, default=None)
+
+    def to_dict(self):
+        slowest = self.slowest()
+        return {
+            'started': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(self.started)),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'slowest_stage': slowest.name if slowest else None,
+            'stages': [asdict(record) for record in self.records],
+        }
+
+    def write_json(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2)
+        return path
+
+    def combined(self):
+        """
+        One record per stage name, in order of first appearance: times and
+        rows summed over repeats, peak RSS the maximum.
+        """
+        def total(a, b):
+            return b if a is None else a if b is None else a + b
+
+        stages = {}
+        for record in self.records:
+            seen = stages.get(record.name)
+            if seen is None:
+                stages[record.name] = StageRecord(**asdict(record))
+                continue
+            seen.wall_s += record.wall_s
+            seen.cpu_s += record.cpu_s
+            seen.peak_rss_bytes = max(seen.peak_rss_bytes or 0, record.peak_rss_bytes or 0) or None
+            seen.rows_in = total(seen.rows_in, record.rows_in)
+            seen.rows_out = total(seen.rows_out, record.rows_out)
+        return list(stages.values())
+
+    def to_prometheus(self):
+        """
+        Records as Prometheus text exposition format, one gauge per metric
+        labelled by stage. Repeated stage names are combined (see combined),
+        so every series appears once.
+        """
+        lines = []
+        records = self.combined()
+        for metric, attribute, help_text in _METRICS:
+            samples = [(record.name, getattr(record, attribute)) for record in records
+                       if getattr(record, attribute) is not None]
+            if not samples:
+                continue
+            lines.append(f'# HELP {METRIC_PREFIX}_{metric} {help_text}')
+            lines.append(f'# TYPE {METRIC_PREFIX}_{metric} gauge')
+            for name, value in samples:
+                label = name.replace('\\', '\\\\').replace('"', '\\"')
+                lines.append(f'{METRIC_PREFIX}_{metric}{{stage="{label}"}} {value}')
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(self.to_prometheus())
+        return path
+
+    def write(self, path):
+        """
+        Write the records to path: Prometheus text for .prom files, JSON otherwise.
+        """
+        if os.path.splitext(path)[1] == '.prom':
+            return self.write_prometheus(path)
+        return self.write_json(path)
+
+    def dump_slowest(self, path):
+        """
+        Save the profile of the slowest stage (pstats file for cProfile,
+        text or .html for pyinstrument). Returns the stage name, or None
+        when no stage was profiled.
+        """
+        if self._slowest is None:
+            return None
+        record, session = self._slowest
+        session.dump(path)
+        return record.name
+
+    def summary(self):
+        """
+        Stage table sorted by wall time, slowest first, as text.
+        """
+        lines = [f"{'Stage':<32}{'Wall (s)':>10}{'CPU (s)':>10}{'Peak RSS (MB)':>15}{'Rows in':>12}{'Rows out':>12}"]
+        for record in sorted(self.records, key=lambda record: record.wall_s, reverse=True):
+            rss = f'{record.peak_rss_bytes / 1024**2:,.1f}' if record.peak_rss_bytes else '-'
+            rows_in = f'{record.rows_in:,}' if record.rows_in is not None else '-'
+            rows_out = f'{record.rows_out:,}' if record.rows_out is not None else '-'
+            lines.append(f'{record.name:<32}{record.wall_s:>10.3f}{record.cpu_s:>10.3f}'
+                         f'{rss:>15}{rows_in:>12}{rows_out:>12}')
+        return '\n'.join(lines)
+
+
+@contextmanager
+def stage(profiler, name, rows_in=None):
+    """
+    profiler.stage(name) when a Profiler is given, otherwise a no-op that
+    still yields a StageRecord, so callers need not check for None.
+    """
+    if profiler is None:
+        yield StageRecord(name, rows_in=rows_in)
+    else:
+        with profiler.stage(name, rows_in) as record:
+            yield record
@@ -0,0 +1,272 @@
+"""
+Chart rendering for visualizations 1-5.
+
+Charts are drawn with the non-interactive Agg backend in parallel worker
+processes. Each worker keeps one figure per size and clears it between
+charts instead of building new figure state every time. A small manifest
+in the cache directory (uidai.cache.state_path) records a hash of each
+chart's input series and settings, so a chart whose data has not changed
+is not rendered again.
+
+matplotlib is imported only when a chart is actually drawn, so callers
+that just need the numbers never pay for it.
+"""
+
+import hashlib
+import json
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from uidai.analysis import peak_mask
+from uidai.cache import state_path
+from uidai.profiling import measure
+
+FORMATS = ('png', 'svg', 'webp')
+DEFAULT_DPI = 300
+DEFAULT_FORMAT = 'png'
+
+ChartJob = namedtuple('ChartJob', ['number', 'name', 'label', 'kind', 'figsize', 'data', 'options'])
+
+_pyplot = None
+_templates = {}
+
+
+def _apply_style():
+    import matplotlib
+    import matplotlib.style
+
+    # Set plotting style for better visualizations
+    matplotlib.style.use('seaborn-v0_8-darkgrid')
+    matplotlib.rcParams['figure.figsize'] = (12, 6)
+    matplotlib.rcParams['font.size'] = 10
+
+
+def get_pyplot():
+    """
+    Import matplotlib.pyplot on first use (interactive display only).
+    """
+    global _pyplot
+    if _pyplot is None:
+        import matplotlib.pyplot as plt
+
+        _apply_style()
+        _pyplot = plt
+    return _pyplot
+
+
+def _template(figsize):
+    """
+    Reusable Agg figure for one size, cleared before each chart.
+    """
+    fig = _templates.get(figsize)
+    if fig is None:
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+
+        if not _templates:
+            _apply_style()
+        fig = Figure(figsize=figsize)
+        FigureCanvasAgg(fig)
+        fig.add_subplot()
+        _templates[figsize] = fig
+    fig.axes[0].clear()
+    return fig
+
+
+def _rotate_xticks(ax):
+    for label in ax.get_xticklabels():
+        label.set_rotation(45)
+        label.set_ha('right')
+
+
+def _draw_trend(ax, data, options):
+    monthly = data['monthly']
+    ax.plot(monthly['Month'], monthly[options['column']],
+            marker=options['marker'], linewidth=2, markersize=6, color=options['color'])
+    ax.set_xlabel('Month', fontsize=12)
+    ax.set_ylabel(options['ylabel'], fontsize=12)
+    ax.grid(True, alpha=0.3)
+
+
+def _draw_comparison(ax, data, options):
+    merged_data = data['merged_data']
+    for column, marker, label, color in [
+        ('Enrolments', 'o', 'Enrolments', '#2E86AB'),
+        ('Biometric_Updates', 's', 'Biometric Updates', '#A23B72'),
+        ('Demographic_Updates', '^', 'Demographic Updates', '#F18F01'),
+    ]:
+        if column in merged_data.columns:
+            ax.plot(merged_data['Month'], merged_data[column],
+                    marker=marker, linewidth=2, label=label, color=color)
+    ax.set_xlabel('Month', fontsize=12)
+    ax.set_ylabel('Count', fontsize=12)
+    ax.legend(loc='best', fontsize=11)
+    ax.grid(True, alpha=0.3)
+
+
+def _draw_peaks(ax, data, options):
+    merged_data = data['merged_data']
+    colors = np.where(peak_mask(merged_data, data['top_months']), '#C1121F', '#669BBC')
+    ax.bar(range(len(merged_data)), merged_data['Total_Load'], color=colors)
+    ax.set_xlabel('Month Index', fontsize=12)
+    ax.set_ylabel('Total Service Load (All Services Combined)', fontsize=12)
+    ax.set_xticks(range(len(merged_data)))
+    ax.set_xticklabels(merged_data['Month'].dt.strftime('%b %Y'))
+    ax.grid(True, alpha=0.3, axis='y')
+
+
+_DRAW = {
+    'trend': _draw_trend,
+    'comparison': _draw_comparison,
+    'peaks': _draw_peaks,
+}
+
+
+def render_job(job, path, dpi=DEFAULT_DPI, fmt=DEFAULT_FORMAT, show=False):
+    """
+    Draw one chart and save it to path. Runs in a worker process.
+    """
+    if show:
+        plt = get_pyplot()
+        fig = plt.figure(figsize=job.figsize)
+        ax = fig.add_subplot()
+    else:
+        fig = _template(job.figsize)
+        ax = fig.axes[0]
+
+    _DRAW[job.kind](ax, job.data, job.options)
+    ax.set_title(job.options['title'], fontsize=14, fontweight='bold', pad=20)
+    _rotate_xticks(ax)
+    fig.tight_layout()
+    fig.savefig(path, dpi=dpi, format=fmt, bbox_inches='tight')
+
+    if show:
+        plt.show()
+        plt.close(fig)
+    return path
+
+
+def chart_jobs(monthly, merged_data, top_months, region='Hyderabad'):
+    """
+    Describe visualizations 1-5 as ChartJobs; charts with no data are left out.
+    """
+    jobs = []
+    trends = [
+        (1, 'enrolment', 'Enrolments', '1_enrolment_trend', 'Monthly Enrolment Trend',
+         f'Monthly Aadhaar Enrolment Trend - {region} District',
+         'Number of Enrolments', 'o', '#2E86AB'),
+        (2, 'biometric', 'Biometric_Updates', '2_biometric_trend', 'Biometric Update Trend',
+         f'Monthly Biometric Update Trend - {region} District',
+         'Number of Biometric Updates', 's', '#A23B72'),
+        (3, 'demographic', 'Demographic_Updates', '3_demographic_trend', 'Demographic Update Trend',
+         f'Monthly Demographic Update Trend - {region} District',
+         'Number of Demographic Updates', '^', '#F18F01'),
+    ]
+    for number, feed, column, name, label, title, ylabel, marker, color in trends:
+        frame = monthly.get(feed)
+        if frame is None or frame.empty:
+            continue
+        jobs.append(ChartJob(number, name, label, 'trend', (14, 6), {'monthly': frame[['Month', column]]},
+                             {'column': column, 'title': title, 'ylabel': ylabel,
+                              'marker': marker, 'color': color}))
+
+    if not merged_data.empty:
+        jobs.append(ChartJob(4, '4_comparison_all_services', 'Service Comparison', 'comparison', (14, 7),
+                             {'merged_data': merged_data},
+                             {'title': f'Comparison: Enrolments vs Updates - {region} District'}))
+
+    if not merged_data.empty and not top_months.empty:
+        jobs.append(ChartJob(5, '5_peak_months', 'Peak Month Identification', 'peaks', (12, 6),
+                             {'merged_data': merged_data[['Month', 'Total_Load']],
+                              'top_months': top_months[['Total_Load']]},
+                             {'title': f'Peak Service Load Months - {region} District'}))
+    return jobs
+
+
+def job_hash(job, dpi, fmt):
+    """
+    Hash of a chart's input series plus everything that affects its pixels.
+    """
+    digest = hashlib.sha256()
+    digest.update(json.dumps([job.kind, job.figsize, job.options, dpi, fmt], sort_keys=True).encode())
+    for key in sorted(job.data):
+        digest.update(key.encode())
+        digest.update(pd.util.hash_pandas_object(job.data[key], index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def _load_manifest(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_manifest(path, manifest):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+
+def render_charts(monthly, merged_data, top_months, out_dir='visualizations',
+                  region='Hyderabad', show=False, verbose=True,
+                  dpi=DEFAULT_DPI, fmt=DEFAULT_FORMAT, workers=None, force=False, profiler=None,
+                  state_dir=None):
+    """
+    Draw visualizations 1-5 into out_dir and return the chart paths.
+
+    monthly maps feed name ('enrolment', 'biometric', 'demographic') to
+    its monthly frame. Charts are rendered in parallel processes unless
+    workers is 1 or show is set (interactive display runs in-process).
+    Charts whose inputs and settings are unchanged since the last run are
+    skipped unless force is True; that record is kept under state_dir
+    (default: uidai.cache.DEFAULT_CACHE_DIR). With a uidai.profiling.Profiler, each
+    rendered chart adds a 'render:<chart>' record, measured in the
+    process that drew it.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported chart format '{fmt}'. Expected one of: {', '.join(FORMATS)}")
+    os.makedirs(out_dir, exist_ok=True)
+
+    jobs = chart_jobs(monthly, merged_data, top_months, region)
+    manifest_path = state_path('render', out_dir, state_dir)
+    manifest = _load_manifest(manifest_path)
+    paths = []
+    todo = []
+    for job in jobs:
+        filename = f'{job.name}.{fmt}'
+        path = os.path.join(out_dir, filename)
+        paths.append(path)
+        digest = job_hash(job, dpi, fmt)
+        if not force and not show and manifest.get(filename) == digest and os.path.exists(path):
+            if verbose:
+                print(f"✓ Visualization {job.number} unchanged: {job.label}")
+            continue
+        todo.append((job, path, digest))
+
+    calls = [(f'render:{job.name}', render_job, job, path, dpi, fmt, show) for job, path, _ in todo]
+    rows = [sum(len(frame) for frame in job.data.values()) for job, _, _ in todo]
+    if show or workers == 1 or len(todo) <= 1:
+        results = [measure(*call, rows_in=n) for call, n in zip(calls, rows)]
+    else:
+        with ProcessPoolExecutor(max_workers=min(len(todo), workers or os.cpu_count() or 1)) as executor:
+            futures = [executor.submit(measure, *call, rows_in=n) for call, n in zip(calls, rows)]
+            results = [future.result() for future in futures]
+    if profiler is not None:
+        for _, record in results:
+            profiler.add(record)
+
+    for job, path, digest in todo:
+        manifest[os.path.basename(path)] = digest
+        if verbose:
+            print(f"✓ Visualization {job.number} saved: {job.label}")
+    if (merged_data.empty or top_months.empty) and verbose:
+        print("⚠ Warning: No merged data available for peak month analysis")
+
+    _save_manifest(manifest_path, manifest)
+    return paths
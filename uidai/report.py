@@ -0,0 +1,418 @@
+"""
+Insights and summary statistics report for one district (or rollup).
+
+The statistics from summarize() are reduced once to a compact
+ReportRecord. The four insights are declared as data: title, finding
+lines, insight paragraph and recommendations, with str.format templates
+filled from the record. From these the report is rendered as text (the
+original insights_and_recommendations.txt), Markdown, HTML or JSON.
+
+ReportWriter renders records in batches and writes the files of a batch
+together. It keeps a fingerprint of every written report in an index
+file, so a report is only regenerated when its record changes.
+"""
+
+import hashlib
+import html
+import json
+import os
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, fields
+from functools import cached_property
+
+import pandas as pd
+
+FORMATS = ('text', 'markdown', 'html', 'json')
+REPORT_FILENAMES = {
+    'text': 'insights_and_recommendations.txt',
+    'markdown': 'insights_and_recommendations.md',
+    'html': 'insights_and_recommendations.html',
+    'json': 'insights_and_recommendations.json',
+}
+REPORT_INDEX_NAME = 'report_index.json'
+# Bump when a template changes, so every report is written again
+REPORT_VERSION = 1
+DEFAULT_BATCH_SIZE = 256
+WRITE_WORKERS = 8
+
+HEADER = 'UIDAI DATA HACKATHON 2026'
+SUBTITLE = 'AADHAAR ENROLMENT AND UPDATE BEHAVIOR ANALYSIS'
+RULE = '━' * 68
+
+
+# ============================================================================
+# RECORD
+# ============================================================================
+
+@dataclass
+class ReportRecord:
+    region: str
+    title: str
+    total_enrolments: float = 0
+    total_biometric: float = 0
+    total_demographic: float = 0
+    avg_enrolments: float = 0
+    avg_biometric: float = 0
+    avg_demographic: float = 0
+    std_enrolments: float = 0
+    std_biometric: float = 0
+    std_demographic: float = 0
+    peak_month_name: str = 'N/A'
+    peak_load: float = 0
+    avg_load: float = 0
+    peak_vs_avg: float = 0
+    months_analyzed: int = 0
+
+    def values(self):
+        """
+        The fields as a dict (a flat, faster dataclasses.asdict).
+        """
+        return {name: getattr(self, name) for name in _RECORD_FIELDS}
+
+    @classmethod
+    def from_stats(cls, stats, region='Hyderabad', title=None):
+        """
+        Record from summarize() stats. title defaults to '<region> District'.
+        """
+        values = {}
+        for field in fields(cls)[2:]:
+            value = stats.get(field.name, field.default)
+            # numpy scalars -> plain Python numbers, so records pickle small
+            # and serialize as JSON
+            values[field.name] = value.item() if hasattr(value, 'item') else value
+        return cls(region, title or f'{region} District', **values)
+
+    def fingerprint(self):
+        """
+        Hash of the record and the template version.
+        """
+        payload = json.dumps([REPORT_VERSION, self.values()], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+    @cached_property
+    def context(self):
+        """
+        Template values: the record's fields plus the derived comparisons.
+        """
+        context = self.values()
+        updates_lead = (self.total_biometric + self.total_demographic) > self.total_enrolments
+        context.update(
+            update_volume='higher' if updates_lead else 'lower',
+            update_awareness='strong' if updates_lead else 'developing',
+            biometric_trend='consistent' if self.std_biometric < self.avg_biometric else 'variable',
+            demographic_trend='consistent' if self.std_demographic < self.avg_demographic else 'variable',
+            combined_avg=self.avg_enrolments + self.avg_biometric + self.avg_demographic,
+        )
+        return context
+
+
+_RECORD_FIELDS = [field.name for field in fields(ReportRecord)]
+
+
+# ============================================================================
+# TEMPLATES
+# ============================================================================
+
+Section = namedtuple('Section', ['title', 'findings', 'insight', 'recommendations'])
+
+INSIGHTS = (
+    Section(
+        'INSIGHT 1: Service Demand Pattern',
+        ('Total Enrolments: {total_enrolments:,.0f}',
+         'Total Biometric Updates: {total_biometric:,.0f}',
+         'Total Demographic Updates: {total_demographic:,.0f}',
+         'Average monthly enrolments: {avg_enrolments:,.0f}',
+         'Average monthly biometric updates: {avg_biometric:,.0f}',
+         'Average monthly demographic updates: {avg_demographic:,.0f}'),
+        ('Update services (biometric and demographic) show {update_volume}',
+         'total volume compared to fresh enrolments, indicating {update_awareness}',
+         'awareness about Aadhaar maintenance among existing holders in {region}.'),
+        ('Expand update service counters at existing enrolment centers',
+         'Train enrolment operators to handle both enrolments and updates efficiently',
+         'Implement a fast-track queue system for simple updates vs fresh enrolments',
+         'Launch awareness campaigns explaining the importance of keeping Aadhaar updated'),
+    ),
+    Section(
+        'INSIGHT 2: Peak Load Management',
+        ('Peak month: {peak_month_name}',
+         'Peak load: {peak_load:,.0f} total services',
+         'Average monthly load: {avg_load:,.0f} total services',
+         'Peak exceeds average by: {peak_vs_avg:.1f}%'),
+        ('Specific months show significantly higher service demand, creating potential',
+         'bottlenecks and longer waiting times for residents. This seasonal pattern',
+         'requires proactive resource planning.'),
+        ('Deploy mobile Aadhaar enrolment units during peak months',
+         'Hire temporary staff 2-3 weeks before anticipated peak periods',
+         'Extend service hours (early morning/evening slots) during high-demand months',
+         'Implement online appointment booking to distribute load throughout the day',
+         'Partner with local community centers to set up temporary service points'),
+    ),
+    Section(
+        'INSIGHT 3: Service Efficiency Opportunity',
+        ('Monthly service variance indicates fluctuating demand patterns',
+         'Biometric updates show {biometric_trend} monthly trends',
+         'Demographic updates show {demographic_trend} monthly trends'),
+        ('The variability in update requests suggests that many residents are reactive',
+         'rather than proactive about Aadhaar maintenance. Predictable update cycles',
+         'can improve service planning and reduce rush periods.'),
+        ('Send SMS/email reminders to residents when their Aadhaar is 5+ years old',
+         'Introduce a "renewal month" concept based on birth month or enrolment month',
+         'Offer incentives (priority service, shorter queues) for off-peak updates',
+         'Partner with employers/schools to conduct on-site Aadhaar update camps',
+         'Create a WhatsApp chatbot for checking update eligibility and booking slots'),
+    ),
+    Section(
+        'INSIGHT 4: Capacity Planning and Infrastructure',
+        ('Number of service months analyzed: {months_analyzed}',
+         'Consistent service delivery indicates established infrastructure',
+         'Combined monthly average: {combined_avg:,.0f} services'),
+        ('While {region} has established Aadhaar infrastructure, the steady volume',
+         'of all three service types indicates sustained demand that requires ongoing',
+         'investment in technology and personnel.'),
+        ('Upgrade biometric devices to faster, multi-modal capture systems',
+         'Implement digital queue management systems with real-time wait time displays',
+         'Create dedicated "update-only" centers in high-density residential areas',
+         'Establish a district-level service dashboard for monitoring daily loads',
+         'Conduct quarterly audits of center performance (avg time per service, uptime)',
+         'Invest in staff training programs focusing on speed and accuracy'),
+    ),
+)
+
+SUMMARY_COLUMNS = ('Service Type', 'Total Count', 'Monthly Average', 'Std Deviation')
+SUMMARY_ROWS = (
+    ('Enrolments', '{total_enrolments:,.0f}', '{avg_enrolments:,.0f}', '{std_enrolments:,.0f}'),
+    ('Biometric Updates', '{total_biometric:,.0f}', '{avg_biometric:,.0f}', '{std_biometric:,.0f}'),
+    ('Demographic Updates', '{total_demographic:,.0f}', '{avg_demographic:,.0f}', '{std_demographic:,.0f}'),
+)
+
+_TEXT_SECTION = '{title}\n' + RULE + '\n📊 Finding:\n{findings}\n\n💡 Insight:\n{insight}\n\n✅ RECOMMENDATION:\n{recommendations}\n'
+_MARKDOWN_SECTION = '## {title}\n\n**📊 Finding:**\n\n{findings}\n\n**💡 Insight:** {insight}\n\n**✅ Recommendation:**\n\n{recommendations}\n'
+_HTML_SECTION = ('<section>\n<h2>{title}</h2>\n<h3>📊 Finding</h3>\n<ul>\n{findings}\n</ul>\n'
+                 '<h3>💡 Insight</h3>\n<p>{insight}</p>\n<h3>✅ Recommendation</h3>\n<ul>\n{recommendations}\n</ul>\n</section>\n')
+_HTML_PAGE = ('<!DOCTYPE html>\n<html lang="en">\n<head>\n<meta charset="utf-8">\n<title>{title}</title>\n</head>\n'
+              '<body>\n<h1>{header}</h1>\n<p>{subtitle}</p>\n{table}\n{sections}</body>\n</html>\n')
+
+
+def _fill(template, context):
+    return template.format_map(context)
+
+
+def insight_sections(record):
+    """
+    The insights of a record as plain dicts with the templates filled in.
+    """
+    context = record.context
+    return [{
+        'title': section.title,
+        'findings': [_fill(line, context) for line in section.findings],
+        'insight': [_fill(line, context) for line in section.insight],
+        'recommendations': list(section.recommendations),
+    } for section in INSIGHTS]
+
+
+def summary_rows(record):
+    """
+    The summary statistics table as a list of row dicts.
+    """
+    context = record.context
+    return [dict(zip(SUMMARY_COLUMNS, (name, *(_fill(cell, context) for cell in cells))))
+            for name, *cells in SUMMARY_ROWS]
+
+
+def build_summary_table(stats):
+    """
+    Summary statistics table (totals, monthly averages, std deviation).
+    """
+    return pd.DataFrame(summary_rows(ReportRecord.from_stats(stats)), columns=list(SUMMARY_COLUMNS))
+
+
+# ============================================================================
+# RENDERERS
+# ============================================================================
+
+def _render_text_insights(sections):
+    blocks = [_TEXT_SECTION.format(
+        title=section['title'],
+        findings='\n'.join(f'   • {line}' for line in section['findings']),
+        # Paragraph lines keep the trailing space of the original layout
+        insight='   ' + ' \n   '.join(section['insight']),
+        recommendations='\n'.join(f'   • {line}' for line in section['recommendations']),
+    ) for section in sections]
+    return '\n' + '\n'.join(blocks)
+
+
+def _render_text(record, sections, rows):
+    return (f"{HEADER} - {record.title.upper()}\n{SUBTITLE}\n" + "=" * 80 + "\n\n"
+            + _render_text_insights(sections))
+
+
+def _render_markdown(record, sections, rows):
+    table = [f"| {' | '.join(SUMMARY_COLUMNS)} |", '|' + '---|' + '---:|' * (len(SUMMARY_COLUMNS) - 1)]
+    table += [f"| {' | '.join(row.values())} |" for row in rows]
+    blocks = [_MARKDOWN_SECTION.format(
+        title=section['title'],
+        findings='\n'.join(f'- {line}' for line in section['findings']),
+        insight=' '.join(section['insight']),
+        recommendations='\n'.join(f'- {line}' for line in section['recommendations']),
+    ) for section in sections]
+    return (f"# {HEADER} - {record.title}\n\n{SUBTITLE.capitalize()}\n\n" + '\n'.join(table) + '\n\n'
+            + '\n'.join(blocks))
+
+
+def _render_html(record, sections, rows):
+    escape = html.escape
+    head = ''.join(f'<th>{escape(col)}</th>' for col in SUMMARY_COLUMNS)
+    body = '\n'.join('<tr>' + ''.join(f'<td>{escape(value)}</td>' for value in row.values()) + '</tr>'
+                     for row in rows)
+    table = f'<table>\n<tr>{head}</tr>\n{body}\n</table>'
+    blocks = ''.join(_HTML_SECTION.format(
+        title=escape(section['title']),
+        findings='\n'.join(f'<li>{escape(line)}</li>' for line in section['findings']),
+        insight=escape(' '.join(section['insight'])),
+        recommendations='\n'.join(f'<li>{escape(line)}</li>' for line in section['recommendations']),
+    ) for section in sections)
+    title = escape(f'{HEADER} - {record.title}')
+    return _HTML_PAGE.format(title=title, header=title, subtitle=escape(SUBTITLE), table=table, sections=blocks)
+
+
+def _render_json(record, sections, rows):
+    document = {
+        'region': record.region,
+        'title': record.title,
+        # NaN (e.g. the std of a single month) is not valid JSON
+        'stats': {name: None if value != value else value
+                  for name, value in record.values().items() if name not in ('region', 'title')},
+        'summary': rows,
+        'insights': [dict(section, insight=' '.join(section['insight'])) for section in sections],
+    }
+    return json.dumps(document, ensure_ascii=False) + '\n'
+
+
+_RENDERERS = {'text': _render_text, 'markdown': _render_markdown, 'html': _render_html, 'json': _render_json}
+
+
+def _check_formats(formats):
+    unknown = [fmt for fmt in formats if fmt not in FORMATS]
+    if unknown:
+        raise ValueError(f"Unknown report format '{unknown[0]}'. Expected one of: {', '.join(FORMATS)}")
+    return tuple(formats)
+
+
+def render_insights(record):
+    """
+    The insights part of the text report, without the header.
+    """
+    return _render_text_insights(insight_sections(record))
+
+
+def render_report(record, fmt='text'):
+    """
+    The full report document of a record in one of FORMATS.
+    """
+    _check_formats([fmt])
+    return _RENDERERS[fmt](record, insight_sections(record), summary_rows(record))
+
+
+# ============================================================================
+# WRITER
+# ============================================================================
+
+def _read_index(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_file(item):
+    path, content = item
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(content)
+
+
+class ReportWriter:
+    """
+    Renders and writes reports for many regions.
+
+    add() queues a record's reports; every batch_size queued files are
+    rendered and then written together on a small thread pool. Reports
+    whose record fingerprint matches the index, and whose file still
+    exists, are skipped. The index is kept at index_path (default:
+    report_index.json in index_dir); its entries are relative to
+    index_dir. Use as a context manager (or call flush) so the last
+    batch is written.
+    """
+
+    def __init__(self, index_dir, formats=('text',), batch_size=DEFAULT_BATCH_SIZE, workers=WRITE_WORKERS,
+                 index_path=None):
+        self.index_dir = index_dir
+        self.formats = _check_formats(formats)
+        self.batch_size = batch_size
+        self.workers = workers
+        self._index_path = index_path or os.path.join(index_dir, REPORT_INDEX_NAME)
+        os.makedirs(index_dir, exist_ok=True)
+        os.makedirs(os.path.dirname(self._index_path) or '.', exist_ok=True)
+        self.index = _read_index(self._index_path)
+        self.pending = []
+        self.written = 0
+        self.skipped = 0
+
+    def add(self, target_dir, record):
+        """
+        Queue the reports of record for target_dir. Returns the number of
+        files queued (0 when all are up to date).
+        """
+        fingerprint = record.fingerprint()
+        queued = 0
+        for fmt in self.formats:
+            path = os.path.join(target_dir, REPORT_FILENAMES[fmt])
+            entry = os.path.relpath(path, self.index_dir)
+            if self.index.get(entry) == fingerprint and os.path.exists(path):
+                self.skipped += 1
+                continue
+            self.pending.append((path, entry, fmt, record, fingerprint))
+            queued += 1
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+        return queued
+
+    def flush(self):
+        """
+        Render and write the queued reports, then save the index.
+        """
+        if not self.pending:
+            return 0
+        rendered = {}
+        items = []
+        for path, _, fmt, record, _ in self.pending:
+            # Sections and table are filled once per record, not per format
+            key = id(record)
+            if key not in rendered:
+                rendered[key] = (insight_sections(record), summary_rows(record))
+            items.append((path, _RENDERERS[fmt](record, *rendered[key])))
+
+        for directory in {os.path.dirname(path) for path, _ in items}:
+            os.makedirs(directory, exist_ok=True)
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(items))) as executor:
+            list(executor.map(_write_file, items))
+
+        for _, entry, _, _, fingerprint in self.pending:
+            self.index[entry] = fingerprint
+        tmp_path = self._index_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            # dumps, unlike dump, runs in the C encoder
+            f.write(json.dumps(self.index, sort_keys=True))
+        os.replace(tmp_path, self._index_path)
+
+        count = len(self.pending)
+        self.written += count
+        self.pending = []
+        return count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.flush()
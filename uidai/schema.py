@@ -0,0 +1,115 @@
+"""
+Declared schemas for the three Aadhaar feeds.
+
+Every extract shares the same key columns (date, state, district, pincode)
+followed by a feed-specific set of age-bucket count columns. Each count
+column is also mapped to one of the age cohorts shared by all feeds.
+"""
+
+from dataclasses import dataclass
+
+DATE_FORMAT = '%d-%m-%Y'
+KEY_COLUMNS = ('date', 'state', 'district', 'pincode')
+
+# state/district repeat on every row, so categories keep them to one copy each
+CATEGORY_DTYPE = 'category'
+# Nullable integer types so blank cells survive as missing values.
+# Pincode and count columns are read as text and converted by the loader,
+# so a malformed value ('5000x2', '-4') also becomes missing instead of
+# failing the read. Missing counts add nothing to the totals.
+PINCODE_DTYPE = 'Int32'
+COUNT_DTYPE = 'UInt32'
+
+# Age cohorts common to the three feeds. The update feeds split at 17
+# rather than 18, so their adult bucket is counted as '18+'.
+COHORTS = ('0-5', '5-17', '18+')
+
+
+@dataclass(frozen=True)
+class FeedSchema:
+    """
+    Column layout and dtypes of one Aadhaar feed.
+    """
+    name: str
+    label: str
+    title: str
+    filename: str
+    count_columns: tuple
+    cohorts: tuple
+
+    @property
+    def columns(self):
+        return KEY_COLUMNS + self.count_columns
+
+    @property
+    def numeric_columns(self):
+        return ('pincode',) + self.count_columns
+
+    @property
+    def csv_dtypes(self):
+        """
+        dtype mapping for pd.read_csv: date and numeric columns as text
+        (parsed per chunk by uidai.loader), state/district as categories.
+        """
+        dtypes = {col: 'string' for col in self.columns}
+        dtypes.update(state=CATEGORY_DTYPE, district=CATEGORY_DTYPE)
+        return dtypes
+
+    @property
+    def dtypes(self):
+        """
+        dtypes of the typed frames produced by uidai.loader (the date
+        column becomes datetime64).
+        """
+        dtypes = {
+            'date': 'string',
+            'state': CATEGORY_DTYPE,
+            'district': CATEGORY_DTYPE,
+            'pincode': PINCODE_DTYPE,
+        }
+        for col in self.count_columns:
+            dtypes[col] = COUNT_DTYPE
+        return dtypes
+
+
+ENROLMENT = FeedSchema(
+    name='enrolment',
+    label='Enrolments',
+    title='Enrolment',
+    filename='aadhaar_monthly_enrolment.csv',
+    count_columns=('age_0_5', 'age_5_17', 'age_18_greater'),
+    cohorts=('0-5', '5-17', '18+'),
+)
+
+BIOMETRIC = FeedSchema(
+    name='biometric',
+    label='Biometric_Updates',
+    title='Biometric Update',
+    filename='aadhaar_biometric_update.csv',
+    count_columns=('bio_age_5_17', 'bio_age_17_'),
+    cohorts=('5-17', '18+'),
+)
+
+DEMOGRAPHIC = FeedSchema(
+    name='demographic',
+    label='Demographic_Updates',
+    title='Demographic Update',
+    filename='aadhaar_demographic_update.csv',
+    count_columns=('demo_age_5_17', 'demo_age_17_'),
+    cohorts=('5-17', '18+'),
+)
+
+FEEDS = {schema.name: schema for schema in (ENROLMENT, BIOMETRIC, DEMOGRAPHIC)}
+
+
+def get_schema(feed):
+    """
+    Look up a feed schema by name ('enrolment', 'biometric', 'demographic').
+    A FeedSchema instance is passed through unchanged.
+    """
+    if isinstance(feed, FeedSchema):
+        return feed
+    try:
+        return FEEDS[feed]
+    except KeyError:
+        raise ValueError(f"Unknown feed '{feed}'. Expected one of: {', '.join(FEEDS)}")
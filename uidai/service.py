@@ -0,0 +1,480 @@
+"""
+Local HTTP query service over the precomputed batch aggregates.
+
+The per-district monthly tables written by uidai.batch are loaded into
+memory once, as plain Python lists with every query-independent value
+(peak ordering, summary statistics) computed up front. A request is then
+a dictionary lookup plus a bisect over at most a few dozen months, so
+answers take well under a millisecond.
+
+Endpoints (all return JSON):
+
+    GET  /health                       snapshot version, load time, region count
+    GET  /regions                      every state/district that can be queried
+    GET  /monthly?district=&state=&service=&start=&end=
+                                       monthly load, optionally one service and a date range
+    GET  /peaks?district=&state=&n=    top n months by total load
+    GET  /summary?district=&state=     totals, averages and peak statistics
+    POST /reload                       load the aggregates again now
+
+district defaults to the national rollup. state is only needed when a
+district name exists in more than one state; 'State/District' keys from
+/regions work as well.
+
+Hot reload: the service polls the batch manifest and, when a run has
+finished (its 'completed' timestamp changed), builds a new snapshot in a
+worker thread and swaps it in with a single assignment. Requests already
+being answered keep the snapshot they started with, so none are dropped
+or see half-loaded data. SIGHUP and POST /reload force a reload.
+
+Only the standard library is used (asyncio streams with a minimal
+HTTP/1.1 parser with keep-alive), so nothing beyond the pipeline's own
+dependencies is needed.
+
+Usage:
+    python -m uidai.service --data batch_output --port 8080
+    curl 'http://127.0.0.1:8080/monthly?district=Hyderabad&service=biometric&start=2025-03&end=2025-06'
+"""
+
+import argparse
+import asyncio
+import bisect
+import json
+import os
+import re
+import signal
+import sys
+import time
+from datetime import datetime
+from urllib.parse import parse_qsl, urlsplit
+
+import numpy as np
+import pandas as pd
+
+from uidai.aggregate import SERVICE_COLUMNS
+from uidai.analysis import summarize
+from uidai.batch import MANIFEST_NAME, NATIONAL_DIR, load_manifest
+from uidai.schema import FEEDS
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8080
+DEFAULT_RELOAD_INTERVAL = 5.0
+MONTHLY_FILENAME = 'monthly.csv'
+NATIONAL_KEY = 'national'
+MAX_HEADER_LINES = 100
+MAX_BODY_BYTES = 1 << 20
+
+_DATE = re.compile(r'^\d{4}-\d{2}(-\d{2})?$')
+_REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+            413: 'Payload Too Large', 500: 'Internal Server Error', 503: 'Service Unavailable'}
+
+
+class QueryError(Exception):
+    """
+    A request that cannot be answered; carries the HTTP status to send.
+    """
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+# ============================================================================
+# SNAPSHOT
+# ============================================================================
+
+def _to_python(value):
+    """
+    numpy scalars -> plain int/float, so results serialize as JSON. NaN
+    (e.g. the std of a single month) is not valid JSON and becomes None.
+    """
+    if isinstance(value, np.integer):
+        return int(value)
+    if isinstance(value, (float, np.floating)):
+        return None if np.isnan(value) else float(value)
+    return value
+
+
+class Region:
+    """
+    The monthly table of one district (or the national rollup), held as
+    Python lists ready to be sliced into responses.
+
+    summary is the region's report statistics as stored by the batch run.
+    Without it they are computed from the table, leaving out each
+    service's zero months: monthly.csv fills the months a service has no
+    data for with 0, and the reports average only the months with data.
+    """
+
+    def __init__(self, key, state, district, merged_data, summary=None):
+        self.key = key
+        self.state = state
+        self.district = district
+        self.months = merged_data['Month'].dt.strftime('%Y-%m').tolist()
+        self.services = [col for col in SERVICE_COLUMNS if col in merged_data.columns]
+        self.columns = {col: merged_data[col].astype('int64').tolist()
+                        for col in [*self.services, 'Total_Load']}
+        # Descending by load, ties in month order, like find_peak_months
+        self.peak_order = np.argsort(-merged_data['Total_Load'].to_numpy(), kind='stable').tolist()
+
+        if summary is None:
+            monthly = {col: merged_data.loc[merged_data[col] != 0, ['Month', col]] for col in self.services}
+            empty = pd.DataFrame()
+            top_months = merged_data.iloc[self.peak_order[:5]]
+            summary = summarize(*(monthly.get(col, empty) for col in SERVICE_COLUMNS), merged_data, top_months)
+        self.summary = {name: _to_python(value) for name, value in summary.items()
+                        if name not in ('region', 'title')}
+
+    def describe(self):
+        return {'key': self.key, 'state': self.state, 'district': self.district}
+
+    def rows(self, columns, start=None, end=None):
+        """
+        One dict per month between start and end ('YYYY-MM', inclusive).
+        """
+        lo = bisect.bisect_left(self.months, start) if start else 0
+        hi = bisect.bisect_right(self.months, end) if end else len(self.months)
+        return [dict(Month=self.months[i], **{col: self.columns[col][i] for col in columns})
+                for i in range(lo, hi)]
+
+    def peaks(self, n):
+        return [dict(Month=self.months[i], **{col: self.columns[col][i] for col in [*self.services, 'Total_Load']})
+                for i in self.peak_order[:n]]
+
+
+def _read_monthly(path):
+    frame = pd.read_csv(path, parse_dates=['Month'])
+    if 'Total_Load' not in frame.columns:
+        frame['Total_Load'] = frame[[col for col in SERVICE_COLUMNS if col in frame.columns]].sum(axis=1)
+    return frame.sort_values('Month', kind='stable').reset_index(drop=True)
+
+
+def data_version(data_dir):
+    """
+    Marker that changes when a new aggregation run has finished: the
+    manifest's 'completed' timestamp for batch output, otherwise the
+    modification time of monthly.csv. None while a batch run is in
+    progress or nothing has been written yet.
+    """
+    if os.path.exists(os.path.join(data_dir, MANIFEST_NAME)):
+        try:
+            return load_manifest(data_dir).get('completed')
+        except (OSError, ValueError):
+            # Caught between writes; the next poll will see the file
+            return None
+    path = os.path.join(data_dir, MONTHLY_FILENAME)
+    return datetime.fromtimestamp(os.path.getmtime(path)).isoformat() if os.path.exists(path) else None
+
+
+class Snapshot:
+    """
+    Immutable view of one aggregation run. A reload builds a new Snapshot
+    instead of changing this one.
+    """
+
+    def __init__(self, data_dir, regions, version):
+        self.data_dir = data_dir
+        self.regions = regions
+        self.version = version
+        self.loaded_at = datetime.now().isoformat(timespec='seconds')
+        self._by_name = {}
+        for key, region in regions.items():
+            self._by_name.setdefault(region.district.lower(), []).append(key)
+
+    @classmethod
+    def load(cls, data_dir):
+        """
+        Read the national rollup and every finished district of a batch
+        output directory, or the monthly.csv of a single output directory.
+        """
+        version = data_version(data_dir)
+        regions = {}
+        manifest_path = os.path.join(data_dir, MANIFEST_NAME)
+        if os.path.exists(manifest_path):
+            manifest = load_manifest(data_dir)
+            national = os.path.join(data_dir, NATIONAL_DIR, MONTHLY_FILENAME)
+            if os.path.exists(national):
+                regions[NATIONAL_KEY] = Region(NATIONAL_KEY, None, 'India', _read_monthly(national),
+                                               manifest.get('national'))
+            for key, job in manifest['jobs'].items():
+                path = os.path.join(data_dir, key, MONTHLY_FILENAME)
+                if job['status'] == 'done' and os.path.exists(path) and os.path.getsize(path) > 1:
+                    regions[key] = Region(key, job['state'], job['district'], _read_monthly(path),
+                                          job.get('report'))
+        else:
+            path = os.path.join(data_dir, MONTHLY_FILENAME)
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"No {MANIFEST_NAME} or {MONTHLY_FILENAME} in '{data_dir}'")
+            name = os.path.basename(os.path.abspath(data_dir))
+            regions[NATIONAL_KEY] = Region(NATIONAL_KEY, None, name, _read_monthly(path))
+        return cls(data_dir, regions, version)
+
+    def region(self, district=None, state=None):
+        """
+        Look a region up by 'State/District' key or by district name.
+        """
+        if not district:
+            district = NATIONAL_KEY
+        if district in self.regions:
+            return self.regions[district]
+        keys = self._by_name.get(district.lower(), [])
+        if state:
+            keys = [key for key in keys if (self.regions[key].state or '').lower() == state.lower()]
+        if not keys:
+            raise QueryError(404, f"Unknown district '{district}'" + (f" in state '{state}'" if state else ''))
+        if len(keys) > 1:
+            states = ', '.join(sorted(self.regions[key].state for key in keys))
+            raise QueryError(400, f"District '{district}' exists in several states ({states}); add state=")
+        return self.regions[keys[0]]
+
+
+# ============================================================================
+# QUERIES
+# ============================================================================
+
+def _service_column(region, service):
+    if service is None:
+        return None
+    if service.lower() in ('total', 'total_load'):
+        return 'Total_Load'
+    feed = FEEDS.get(service.lower())
+    label = feed.label if feed is not None else service
+    if label not in region.services:
+        raise QueryError(400, f"Unknown service '{service}'. Expected one of: {', '.join(FEEDS)}, total")
+    return label
+
+
+def _month(value, name):
+    if value is None:
+        return None
+    if not _DATE.match(value):
+        raise QueryError(400, f"{name} must be YYYY-MM or YYYY-MM-DD, got '{value}'")
+    return value[:7]
+
+
+def _count(value, default):
+    if value is None:
+        return default
+    try:
+        n = int(value)
+    except ValueError:
+        raise QueryError(400, f"n must be an integer, got '{value}'")
+    if n < 1:
+        raise QueryError(400, 'n must be at least 1')
+    return n
+
+
+def query_health(snapshot, params):
+    return {'status': 'ok', 'version': snapshot.version, 'loaded_at': snapshot.loaded_at,
+            'regions': len(snapshot.regions)}
+
+
+def query_regions(snapshot, params):
+    return {'regions': [region.describe() for region in snapshot.regions.values()]}
+
+
+def query_monthly(snapshot, params):
+    """
+    Monthly load of a region. A date range selects the months it touches.
+    """
+    region = snapshot.region(params.get('district'), params.get('state'))
+    column = _service_column(region, params.get('service'))
+    start, end = _month(params.get('start'), 'start'), _month(params.get('end'), 'end')
+    columns = [column] if column else [*region.services, 'Total_Load']
+    rows = region.rows(columns, start, end)
+    return {'region': region.describe(), 'start': start, 'end': end,
+            'total': {col: sum(row[col] for row in rows) for col in columns}, 'months': rows}
+
+
+def query_peaks(snapshot, params):
+    region = snapshot.region(params.get('district'), params.get('state'))
+    return {'region': region.describe(), 'peaks': region.peaks(_count(params.get('n'), 5))}
+
+
+def query_summary(snapshot, params):
+    region = snapshot.region(params.get('district'), params.get('state'))
+    return {'region': region.describe(), 'summary': region.summary}
+
+
+ROUTES = {
+    '/health': query_health,
+    '/regions': query_regions,
+    '/monthly': query_monthly,
+    '/peaks': query_peaks,
+    '/summary': query_summary,
+}
+
+
+# ============================================================================
+# SERVER
+# ============================================================================
+
+class QueryService:
+    """
+    asyncio HTTP server answering ROUTES from the current Snapshot.
+    """
+
+    def __init__(self, data_dir, reload_interval=DEFAULT_RELOAD_INTERVAL, verbose=True):
+        self.data_dir = data_dir
+        self.reload_interval = reload_interval
+        self.verbose = verbose
+        self.snapshot = None
+        self._reload_lock = None
+
+    def log(self, message):
+        if self.verbose:
+            print(message, flush=True)
+
+    async def reload(self):
+        """
+        Build a new snapshot in a worker thread and swap it in. Requests
+        keep answering from the old one until the swap.
+        """
+        async with self._reload_lock:
+            started = time.perf_counter()
+            loop = asyncio.get_running_loop()
+            snapshot = await loop.run_in_executor(None, Snapshot.load, self.data_dir)
+            self.snapshot = snapshot
+            self.log(f"✓ Loaded {len(snapshot.regions)} region(s), version {snapshot.version} "
+                     f"({time.perf_counter() - started:.2f}s)")
+            return snapshot
+
+    async def _watch(self):
+        while True:
+            await asyncio.sleep(self.reload_interval)
+            version = data_version(self.data_dir)
+            if version is not None and version != self.snapshot.version and not self._reload_lock.locked():
+                try:
+                    await self.reload()
+                except Exception as e:
+                    self.log(f"⚠ Reload failed, still serving version {self.snapshot.version}: {e}")
+
+    def dispatch(self, method, target):
+        """
+        Answer one request; returns (status, body bytes).
+        """
+        url = urlsplit(target)
+        handler = ROUTES.get(url.path.rstrip('/') or '/')
+        try:
+            if handler is None:
+                raise QueryError(404, f"Unknown path '{url.path}'. Expected one of: {', '.join(ROUTES)}, /reload")
+            if method not in ('GET', 'HEAD'):
+                raise QueryError(405, f'{url.path} only answers GET')
+            # Read the reference once: a reload swapping it mid-request
+            # does not affect this answer
+            snapshot = self.snapshot
+            status, payload = 200, handler(snapshot, dict(parse_qsl(url.query)))
+        except QueryError as e:
+            status, payload = e.status, {'error': str(e)}
+        except Exception as e:
+            status, payload = 500, {'error': repr(e)}
+        return status, json.dumps(payload).encode('utf-8')
+
+    async def _respond(self, method, target):
+        if urlsplit(target).path.rstrip('/') == '/reload':
+            if method != 'POST':
+                return 405, json.dumps({'error': '/reload only answers POST'}).encode('utf-8')
+            try:
+                snapshot = await self.reload()
+            except Exception as e:
+                return 503, json.dumps({'error': f'Reload failed: {e}'}).encode('utf-8')
+            return 200, json.dumps(query_health(snapshot, {})).encode('utf-8')
+        return self.dispatch(method, target)
+
+    async def handle(self, reader, writer):
+        """
+        Serve the requests of one connection (HTTP/1.1 keep-alive).
+        """
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                headers = {}
+                for _ in range(MAX_HEADER_LINES):
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                started = time.perf_counter()
+                parts = request_line.decode('latin-1').split()
+                length = int(headers.get('content-length') or 0) if len(parts) == 3 else 0
+                if len(parts) != 3:
+                    status, body, version = 400, b'{"error": "Malformed request line"}', 'HTTP/1.0'
+                elif length > MAX_BODY_BYTES:
+                    status, body, version = 413, b'{"error": "Request body too large"}', 'HTTP/1.0'
+                else:
+                    method, target, version = parts
+                    if length:
+                        await reader.readexactly(length)
+                    status, body = await self._respond(method, target)
+                elapsed_ms = (time.perf_counter() - started) * 1000
+
+                keep_alive = (version == 'HTTP/1.1' and status not in (400, 413)
+                              and headers.get('connection', '').lower() != 'close')
+                head = (f'HTTP/1.1 {status} {_REASONS.get(status, "")}\r\n'
+                        f'Content-Type: application/json\r\n'
+                        f'Content-Length: {len(body)}\r\n'
+                        f'Server-Timing: query;dur={elapsed_ms:.3f}\r\n'
+                        f'Connection: {"keep-alive" if keep_alive else "close"}\r\n\r\n')
+                writer.write(head.encode('latin-1') + (body if parts[:1] != ['HEAD'] else b''))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host=DEFAULT_HOST, port=DEFAULT_PORT, ready=None):
+        """
+        Load the aggregates, then serve until cancelled. ready, if given,
+        is an asyncio.Event set once the server is listening.
+        """
+        self._reload_lock = asyncio.Lock()
+        await self.reload()
+        loop = asyncio.get_running_loop()
+        try:
+            loop.add_signal_handler(signal.SIGHUP, lambda: asyncio.ensure_future(self.reload()))
+        except (AttributeError, NotImplementedError, RuntimeError):
+            # No SIGHUP on Windows, and no signal handlers outside the main thread
+            pass
+
+        server = await asyncio.start_server(self.handle, host, port)
+        watcher = asyncio.ensure_future(self._watch()) if self.reload_interval else None
+        self.log(f"📍 Serving '{self.data_dir}' on http://{host}:{port}")
+        if ready is not None:
+            ready.set()
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            if watcher is not None:
+                watcher.cancel()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Serve the precomputed batch aggregates over local HTTP.')
+    parser.add_argument('--data', default='batch_output',
+                        help='Batch output directory (or a directory with monthly.csv)')
+    parser.add_argument('--host', default=DEFAULT_HOST, help=f'Bind address (default: {DEFAULT_HOST})')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f'Port (default: {DEFAULT_PORT})')
+    parser.add_argument('--reload-interval', type=float, default=DEFAULT_RELOAD_INTERVAL,
+                        help='Seconds between checks for a finished run; 0 disables hot reload')
+    args = parser.parse_args(argv)
+
+    service = QueryService(args.data, args.reload_interval)
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except FileNotFoundError as e:
+        print(f"❌ {e}")
+        return 1
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
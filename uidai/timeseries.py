@@ -0,0 +1,166 @@
+"""
+Multi-resolution load series at full date resolution.
+
+The source rows are dated per day. The monthly aggregation throws that
+away, and with it the weekly and day-of-week patterns that staffing
+depends on. TimeSeriesStore keeps one dense (days x services) array,
+built in a single pass over the rows from one shared day-code array.
+Weekly, day-of-week and monthly series are reductions of that daily
+array, so no resolution re-groups the raw frames.
+
+The extracts carry a date but no time of day, so a day is the finest
+resolution available.
+"""
+
+import numpy as np
+import pandas as pd
+
+from uidai.cleaning import clean_frame
+from uidai.loader import DEFAULT_CHUNKSIZE, month_code, month_start, read_feed, row_totals
+from uidai.schema import FEEDS, get_schema
+
+SERVICES = tuple(FEEDS)
+RESOLUTIONS = ('daily', 'weekly', 'day_of_week', 'monthly')
+DAY_NAMES = ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday')
+# 1970-01-01 (day code 0) was a Thursday
+_EPOCH_WEEKDAY = 3
+
+
+def day_code(dates):
+    """
+    Encode datetimes as integer days since 1970-01-01 (NaT becomes -1).
+    """
+    values = dates.to_numpy(dtype='datetime64[ns]').astype('datetime64[D]')
+    codes = values.astype('int64')
+    codes[np.isnat(values)] = -1
+    return codes
+
+
+def _to_day(value):
+    return int(pd.Timestamp(value).to_datetime64().astype('datetime64[D]').astype('int64'))
+
+
+class TimeSeriesStore:
+    """
+    Service counts per calendar day as a dense int64 array of shape
+    (days, services), starting at first_day (a day code).
+    """
+
+    def __init__(self, values, first_day):
+        self.values = values
+        self.first_day = int(first_day)
+        self.day_codes = np.arange(self.first_day, self.first_day + len(values))
+        self.dates = pd.to_datetime(self.day_codes.astype('datetime64[D]'))
+
+    # ------------------------------------------------------------------
+    # Construction
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def from_clean(cls, clean_frames):
+        """
+        Build from {feed: cleaned DataFrame} in one pass per feed.
+        """
+        codes, totals, services = [], [], []
+        for feed, df in clean_frames.items():
+            schema = get_schema(feed)
+            feed_codes = day_code(df['date'])
+            valid = feed_codes >= 0
+            codes.append(feed_codes[valid])
+            totals.append(row_totals(df, schema)[valid])
+            services.append(np.full(valid.sum(), SERVICES.index(schema.name)))
+        codes = np.concatenate(codes) if codes else np.empty(0, dtype='int64')
+        if not len(codes):
+            return cls(np.zeros((0, len(SERVICES)), dtype='int64'), 0)
+
+        first_day = codes.min()
+        n_days = codes.max() - first_day + 1
+        flat = np.bincount((codes - first_day) * len(SERVICES) + np.concatenate(services),
+                           weights=np.concatenate(totals), minlength=n_days * len(SERVICES))
+        return cls(flat.astype('int64').reshape(n_days, len(SERVICES)), first_day)
+
+    @classmethod
+    def from_files(cls, feed_files, chunksize=DEFAULT_CHUNKSIZE):
+        """
+        Build from {feed: csv_path}, loading and cleaning the feeds first.
+        """
+        return cls.from_clean({feed: clean_frame(read_feed(path, feed, chunksize))[0]
+                               for feed, path in feed_files.items()})
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def _frame(self, index_name, index, values, services=None):
+        """
+        One column per service label plus Total_Load over those services.
+        Without services named, every service with data is included.
+        """
+        present = services or [feed for i, feed in enumerate(SERVICES) if self.values[:, i].any()]
+        columns = [SERVICES.index(feed) for feed in present]
+        frame = pd.DataFrame({index_name: index})
+        for feed, column in zip(present, columns):
+            frame[FEEDS[feed].label] = values[:, column]
+        frame['Total_Load'] = values[:, columns].sum(axis=1)
+        return frame
+
+    def _services(self, service):
+        return [get_schema(service).name] if service is not None else None
+
+    def daily(self, service=None, start=None, end=None):
+        """
+        Load per calendar day, optionally between start and end (inclusive).
+        Days without any rows are included with zero load.
+        """
+        lo = _to_day(start) - self.first_day if start is not None else 0
+        hi = _to_day(end) - self.first_day + 1 if end is not None else len(self.values)
+        days = slice(max(lo, 0), max(hi, 0))
+        return self._frame('Date', self.dates[days], self.values[days], self._services(service))
+
+    def _group(self, codes):
+        """
+        Sum the daily rows by an integer code per day.
+        """
+        groups, position = np.unique(codes, return_inverse=True)
+        values = np.zeros((len(groups), len(SERVICES)), dtype='int64')
+        np.add.at(values, position, self.values)
+        return groups, values
+
+    def weekly(self, service=None):
+        """
+        Load per week, labelled by the Monday that starts it.
+        """
+        weekday = (self.day_codes + _EPOCH_WEEKDAY) % 7
+        weeks, values = self._group(self.day_codes - weekday)
+        return self._frame('Week', pd.to_datetime(weeks.astype('datetime64[D]')), values, self._services(service))
+
+    def day_of_week(self, service=None):
+        """
+        Load by weekday: the total over the covered range and the average
+        per calendar day of that weekday, Monday first.
+        """
+        weekday = (self.day_codes + _EPOCH_WEEKDAY) % 7
+        totals = np.zeros((7, len(SERVICES)), dtype='int64')
+        np.add.at(totals, weekday, self.values)
+        days = np.bincount(weekday, minlength=7)
+        frame = self._frame('Day', list(DAY_NAMES), totals, self._services(service))
+        frame['Days'] = days
+        frame['Average_Load'] = np.divide(frame['Total_Load'].to_numpy(), days,
+                                          out=np.zeros(7), where=days > 0)
+        return frame
+
+    def monthly(self, service=None):
+        """
+        Load per month. Totals match combine_monthly; months inside the
+        covered range without any rows appear with zero load.
+        """
+        months, values = self._group(month_code(pd.Series(self.dates)).to_numpy())
+        return self._frame('Month', month_start(months), values, self._services(service))
+
+    def series(self, resolution='daily', service=None):
+        """
+        Load series at one of RESOLUTIONS.
+        """
+        if resolution not in RESOLUTIONS:
+            raise ValueError(f"Unknown resolution '{resolution}'. Expected one of: {', '.join(RESOLUTIONS)}")
+        return getattr(self, resolution)(service)
@@ -0,0 +1,315 @@
+"""
+Row-level data-quality rules with a quarantine file for failing rows.
+
+The loader turns malformed values into missing ones and cleaning drops
+rows without a valid date, without saying why. This stage reads every column as text,
+evaluates a declarative list of rules as vectorized masks over each
+chunk, and splits the chunk in one pass:
+
+- rows passing every rule continue, typed like uidai.loader's output;
+- failing rows go to a quarantine CSV as read, with their source file,
+  row number and the names of the rules they failed.
+
+Per-rule failure counts are kept for the report. A row failing several
+rules is counted once under each of them.
+
+Default rules: a valid dd-mm-yyyy date within the Aadhaar era, a
+6-digit Indian pincode, non-negative bounded counts, and a state that
+matches the pincode's postal region. With a pincode directory (for
+example India Post's all-India pincode CSV), the district must match it
+as well.
+"""
+
+import csv
+import re
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from uidai.cleaning import parse_dates
+from uidai.loader import DEFAULT_CHUNKSIZE, parse_numbers, to_nullable_int
+from uidai.schema import CATEGORY_DTYPE, COUNT_DTYPE, DATE_FORMAT, PINCODE_DTYPE, get_schema
+
+Rule = namedtuple('Rule', ['name', 'description', 'check'])
+
+EARLIEST_DATE = pd.Timestamp('2010-01-01')
+# Delivery pincodes start at 110001; 9xxxxx belong to the Army Postal Service
+PINCODE_RANGE = (110000, 899999)
+# Largest plausible count for one age bucket, pincode and day
+MAX_COUNT = 100_000
+QUARANTINE_COLUMNS = ('source', 'row', 'failed_rules')
+
+# States served by each range of 2-digit pincode prefixes (postal circles)
+PINCODE_STATES = {
+    (11, 11): ('Delhi',),
+    (12, 13): ('Haryana', 'Punjab', 'Chandigarh'),
+    (14, 16): ('Punjab', 'Chandigarh', 'Haryana', 'Himachal Pradesh'),
+    (17, 17): ('Himachal Pradesh',),
+    (18, 19): ('Jammu and Kashmir', 'Ladakh'),
+    (20, 28): ('Uttar Pradesh', 'Uttarakhand'),
+    (30, 34): ('Rajasthan',),
+    (36, 39): ('Gujarat', 'Dadra and Nagar Haveli and Daman and Diu', 'Dadra and Nagar Haveli', 'Daman and Diu'),
+    (40, 44): ('Maharashtra', 'Goa'),
+    (45, 48): ('Madhya Pradesh',),
+    (49, 49): ('Chhattisgarh',),
+    (50, 50): ('Telangana', 'Andhra Pradesh'),
+    (51, 53): ('Andhra Pradesh', 'Telangana', 'Puducherry', 'Pondicherry'),
+    (56, 59): ('Karnataka',),
+    (60, 64): ('Tamil Nadu', 'Puducherry', 'Pondicherry'),
+    (67, 69): ('Kerala', 'Lakshadweep', 'Puducherry', 'Pondicherry'),
+    (70, 74): ('West Bengal', 'Sikkim', 'Andaman and Nicobar Islands'),
+    (75, 77): ('Odisha', 'Orissa'),
+    (78, 78): ('Assam',),
+    (79, 79): ('Arunachal Pradesh', 'Manipur', 'Meghalaya', 'Mizoram', 'Nagaland', 'Tripura', 'Assam'),
+    (80, 85): ('Bihar', 'Jharkhand'),
+}
+
+
+def normalize_name(name):
+    """
+    'Jammu & Kashmir' -> 'jammuandkashmir': case, spacing and punctuation
+    are ignored when comparing place names.
+    """
+    return re.sub(r'[^a-z]', '', str(name).lower().replace('&', 'and'))
+
+
+def _category_codes(values, lookup):
+    """
+    Map a categorical column to integer codes through lookup (normalized
+    name -> code, -1 when absent). Each category is looked up once.
+    """
+    values = values.astype(CATEGORY_DTYPE)
+    per_category = np.array([lookup.get(normalize_name(name), -1) for name in values.cat.categories] + [-1])
+    # Missing values have code -1, which picks the trailing -1
+    return per_category[values.cat.codes.to_numpy()]
+
+
+class ParsedChunk:
+    """
+    The typed values of a raw (all-text) chunk, parsed once and shared by
+    every rule.
+    """
+
+    def __init__(self, chunk, schema, date_format=DATE_FORMAT):
+        self.chunk = chunk
+        self.schema = schema
+        self.date = parse_dates(chunk['date'], date_format)
+        self.pincode = parse_numbers(chunk['pincode'])
+        self.counts = {col: parse_numbers(chunk[col]) for col in schema.count_columns}
+
+    def typed(self, keep):
+        """
+        The rows selected by keep with the dtypes of uidai.loader.
+        """
+        frame = self.chunk[keep].copy()
+        frame['date'] = self.date[keep]
+        frame['pincode'] = to_nullable_int(self.pincode[keep], PINCODE_DTYPE)
+        for col, values in self.counts.items():
+            frame[col] = to_nullable_int(values[keep], COUNT_DTYPE)
+        return frame
+
+
+def date_format_rule(date_format=DATE_FORMAT):
+    return Rule('date_format', f'date matches {date_format}',
+                lambda parsed: parsed.date.notna().to_numpy())
+
+
+def date_range_rule(earliest=EARLIEST_DATE, latest=None):
+    def check(parsed):
+        dates = parsed.date
+        upper = pd.Timestamp.today().normalize() if latest is None else pd.Timestamp(latest)
+        # Unparseable dates are reported by date_format only
+        return (dates.isna() | ((dates >= earliest) & (dates <= upper))).to_numpy()
+    return Rule('date_range', f'date between {earliest:%d-%m-%Y} and today', check)
+
+
+def pincode_rule(pincode_range=PINCODE_RANGE):
+    low, high = pincode_range
+    return Rule('pincode', f'pincode is a 6-digit Indian pincode ({low}-{high})',
+                lambda parsed: (parsed.pincode >= low) & (parsed.pincode <= high)
+                & (parsed.pincode == np.floor(parsed.pincode)))
+
+
+def counts_rule(max_count=MAX_COUNT):
+    def check(parsed):
+        ok = np.ones(len(parsed.chunk), dtype=bool)
+        for col, values in parsed.counts.items():
+            # Blank counts are allowed (they count as 0); text that is not
+            # a whole number, negative or above max_count is not
+            blank = parsed.chunk[col].isna().to_numpy()
+            ok &= blank | ((values >= 0) & (values <= max_count) & (values == np.floor(values)))
+        return ok
+    return Rule('counts', f'counts are whole numbers from 0 to {max_count:,}', check)
+
+
+def state_pincode_rule(pincode_states=PINCODE_STATES):
+    states = sorted({normalize_name(state) for names in pincode_states.values() for state in names})
+    state_ids = {state: i for i, state in enumerate(states)}
+    # allowed[prefix, state] for every 2-digit prefix
+    allowed = np.zeros((100, len(states)), dtype=bool)
+    for (first, last), names in pincode_states.items():
+        for name in names:
+            allowed[first:last + 1, state_ids[normalize_name(name)]] = True
+
+    def check(parsed):
+        state = _category_codes(parsed.chunk['state'], state_ids)
+        prefix = np.nan_to_num(parsed.pincode // 10_000, nan=0).clip(0, 99).astype('int64')
+        ok = allowed[prefix, np.maximum(state, 0)] & (state >= 0)
+        # Pincodes out of range are reported by the pincode rule only
+        return ok | ~((parsed.pincode >= PINCODE_RANGE[0]) & (parsed.pincode <= PINCODE_RANGE[1]))
+    return Rule('state_pincode', 'state matches the pincode\'s postal region', check)
+
+
+class PincodeDirectory:
+    """
+    Known (pincode, district) pairs, e.g. from India Post's pincode
+    directory, packed as sorted integers for vectorized lookups.
+    """
+
+    def __init__(self, pincodes, districts):
+        names = sorted({normalize_name(district) for district in districts})
+        self.district_ids = {name: i for i, name in enumerate(names)}
+        codes = np.array([self.district_ids[normalize_name(district)] for district in districts], dtype='int64')
+        self.pairs = np.unique(np.asarray(pincodes, dtype='int64') * len(names) + codes)
+        self.pincodes = np.unique(np.asarray(pincodes, dtype='int64'))
+
+    @classmethod
+    def load(cls, path):
+        """
+        Read a directory CSV with a pincode column and a district column
+        ('district' or 'districtname', any case).
+        """
+        frame = pd.read_csv(path, dtype=str)
+        columns = {col.lower().replace('_', ''): col for col in frame.columns}
+        pincode_col = columns.get('pincode')
+        district_col = columns.get('district') or columns.get('districtname')
+        if pincode_col is None or district_col is None:
+            raise ValueError(f"Pincode directory '{path}' needs a pincode and a district column")
+        frame = frame[[pincode_col, district_col]].dropna()
+        pincodes = pd.to_numeric(frame[pincode_col], errors='coerce')
+        frame = frame[pincodes.notna()]
+        return cls(pincodes[pincodes.notna()].astype('int64').to_numpy(), frame[district_col].tolist())
+
+    def contains(self, pincodes, district_codes):
+        """
+        Mask: is (pincode, district) listed? Pincodes missing from the
+        directory are not judged (True).
+        """
+        known = np.isin(pincodes, self.pincodes)
+        pairs = pincodes * len(self.district_ids) + district_codes
+        listed = np.isin(pairs, self.pairs) & (district_codes >= 0)
+        return ~known | listed
+
+
+def district_pincode_rule(directory):
+    def check(parsed):
+        district = _category_codes(parsed.chunk['district'], directory.district_ids)
+        pincodes = np.nan_to_num(parsed.pincode, nan=-1).astype('int64')
+        return directory.contains(pincodes, district)
+    return Rule('district_pincode', 'district matches the pincode directory', check)
+
+
+def default_rules(directory=None, max_count=MAX_COUNT):
+    """
+    The standard rule set; the district rule needs a PincodeDirectory.
+    """
+    rules = [date_format_rule(), date_range_rule(), pincode_rule(), counts_rule(max_count), state_pincode_rule()]
+    if directory is not None:
+        rules.append(district_pincode_rule(directory))
+    return rules
+
+
+class QuarantineSink:
+    """
+    CSV of failing rows as read, plus source, row number and failed rules.
+    Rows are appended chunk by chunk; nothing is held in memory.
+    """
+
+    def __init__(self, path, schema):
+        self.path = path
+        self.rows = 0
+        self._file = open(path, 'w', newline='', encoding='utf-8')
+        csv.writer(self._file).writerow([*schema.columns, *QUARANTINE_COLUMNS])
+
+    def write(self, rows):
+        rows.to_csv(self._file, index=False, header=False)
+        self.rows += len(rows)
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class Validator:
+    """
+    Applies rules to raw chunks of one feed. Passing rows are returned
+    typed, failing rows go to the optional QuarantineSink.
+    """
+
+    def __init__(self, feed, rules=None, sink=None):
+        self.schema = get_schema(feed)
+        self.rules = default_rules() if rules is None else list(rules)
+        self.sink = sink
+        self.failed = np.zeros(len(self.rules), dtype='int64')
+        self.rows_in = 0
+        self.rows_out = 0
+
+    def validate(self, chunk, source='', first_row=1):
+        """
+        Check one raw chunk; first_row is the file row number of its first
+        row (for the quarantine file). Returns the passing rows, typed.
+        """
+        parsed = ParsedChunk(chunk, self.schema)
+        passed = np.vstack([rule.check(parsed) for rule in self.rules]) if self.rules \
+            else np.ones((0, len(chunk)), dtype=bool)
+        keep = passed.all(axis=0)
+        self.failed += (~passed).sum(axis=1)
+        self.rows_in += len(chunk)
+        self.rows_out += int(keep.sum())
+
+        if self.sink is not None and not keep.all():
+            bad = ~keep
+            failed_rules = pd.Series('', index=chunk.index[bad], dtype=object)
+            for rule, rule_passed in zip(self.rules, passed[:, bad]):
+                failed_rules[~rule_passed] += rule.name + ';'
+            rows = chunk[bad].assign(source=source, row=np.flatnonzero(bad) + first_row,
+                                     failed_rules=failed_rules.str.rstrip(';'))
+            self.sink.write(rows)
+        return parsed.typed(keep)
+
+    def report(self):
+        """
+        Failures per rule as a DataFrame.
+        """
+        return pd.DataFrame({
+            'Rule': [rule.name for rule in self.rules],
+            'Description': [rule.description for rule in self.rules],
+            'Failed': self.failed,
+        })
+
+
+def iter_raw_chunks(path, feed, chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Yield chunks of a feed CSV with every value as read: text, except the
+    categorical state/district. Nothing can fail to parse here.
+    """
+    schema = get_schema(feed)
+    with pd.read_csv(path, usecols=list(schema.columns), dtype=schema.csv_dtypes, chunksize=chunksize) as reader:
+        yield from reader
+
+
+def iter_validated_chunks(path, feed, validator, chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Yield the typed, passing rows of a feed CSV chunk by chunk. Row
+    numbers count data rows from 1 (the header is row 0).
+    """
+    first_row = 1
+    for chunk in iter_raw_chunks(path, feed, chunksize):
+        yield validator.validate(chunk, path, first_row)
+        first_row += len(chunk)